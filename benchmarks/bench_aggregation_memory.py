@@ -0,0 +1,96 @@
+"""Pico de memória (RSS) da agregação: dicionários por arquivo x AggregationStore x despejo em SQLite.
+
+Cada variante roda em um subprocesso novo, para que o pico de uma não
+contamine a outra. O histórico sintético é gerado na hora, sem git. A
+variante `spill` usa o limite de `--max-memory` (SPILL_MB) e inclui o
+cálculo da dominância no SQLite.
+
+Uso (na raiz do projeto): python -m benchmarks.bench_aggregation_memory [arquivos] [autores] [modificações]
+"""
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from busfactor.models.data_models import FileAnalysis
+from busfactor.service.aggregation import AggregationStore
+from busfactor.service.spill_aggregation import SpillingAggregationStore
+
+SPILL_MB = 16
+
+
+def synthetic_events(files: int, authors: int, modifications: int, seed: int = 7):
+    rng = random.Random(seed)
+    paths = [f"pkg{i % 97}/mod{i % 13}/file_{i}.py" for i in range(files)]
+    names = [f"Author Number {i}" for i in range(authors)]
+    for _ in range(modifications):
+        # Poucos autores concentram a maior parte das mudanças, como em repos reais
+        author = names[min(int(rng.paretovariate(1.2)) - 1, authors - 1)]
+        yield rng.choice(paths), author, rng.randint(1, 40)
+
+
+def aggregate_dicts(events):
+    """Implementação anterior: dois Dict[str, int] por FileAnalysis, criados no laço."""
+    file_stats = {}
+    for path, author, lines in events:
+        analysis = file_stats.get(path)
+        if analysis is None:
+            analysis = file_stats[path] = FileAnalysis(path, "repo", 0, 0, {}, {})
+        analysis.total_commits += 1
+        analysis.total_lines_changed += lines
+        analysis.commits_by_author[author] = analysis.commits_by_author.get(author, 0) + 1
+        analysis.lines_by_author[author] = analysis.lines_by_author.get(author, 0) + lines
+    return file_stats
+
+
+def aggregate_store(events):
+    store = AggregationStore()
+    for path, author, lines in events:
+        store.add(path, store.intern_author(author), lines)
+    return store
+
+
+def aggregate_spill(events):
+    store = SpillingAggregationStore(SPILL_MB * 1024 * 1024)
+    for path, author, lines in events:
+        store.add(path, store.intern_author(author), lines)
+    sum(1 for _ in store.risky_files(0.6))
+    return store
+
+
+VARIANTS = {"dicts": aggregate_dicts, "store": aggregate_store, "spill": aggregate_spill}
+
+
+def measure(variant: str, files: int, authors: int, modifications: int) -> dict:
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    events = synthetic_events(files, authors, modifications)
+    result = VARIANTS[variant](events)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    assert len(result) > 0
+    # ru_maxrss é em KiB no Linux
+    return {"variant": variant, "seconds": round(elapsed, 2),
+            "peak_rss_mb": round(peak / 1024, 1), "delta_rss_mb": round((peak - baseline) / 1024, 1)}
+
+
+def run(files: int, authors: int, modifications: int):
+    print(f"{files} arquivos, {authors} autores, {modifications} modificações")
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_aggregation_memory", "--child", variant,
+             str(files), str(authors), str(modifications)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        print(json.dumps(json.loads(output)))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        variant, *sizes = sys.argv[2:]
+        print(json.dumps(measure(variant, *map(int, sizes))))
+    else:
+        sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 5_000, 2_000_000]
+        run(*sizes)
@@ -0,0 +1,51 @@
+"""Benchmark do `--metric commits`: percurso do histórico com e sem estatísticas de linhas.
+
+Compara, sobre o mesmo repositório sintético, o `git log --numstat` (diff de
+cada arquivo de cada commit) com o `git log --name-status` (só os caminhos
+tocados) e confere que os commits por arquivo/autor são os mesmos.
+
+Uso (na raiz do projeto): python -m benchmarks.bench_commit_metric [commits] [arquivos] [linhas_mu]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_repo import SyntheticRepoSpec, generate_repository
+from busfactor.models import AnalysisConfig
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+
+
+def _traverse(repo: str, metric: str):
+    config = AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], metric=metric)
+    started = time.perf_counter()
+    aggregates = BusFactorAnalyzer(config).collect_aggregates(repo)
+    aggregates.flush()
+    seconds = time.perf_counter() - started
+    files, authors, commits, _ = aggregates.pairs_in_history_order()
+    pairs = sorted(zip(
+        (aggregates.file_paths[f] for f in files.tolist()),
+        (aggregates.author_names[a] for a in authors.tolist()),
+        commits.tolist(),
+    ))
+    return seconds, pairs
+
+
+def run(spec: SyntheticRepoSpec):
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = os.path.join(tmp, "metric.git")
+        generate_repository(repo, spec)
+        print(f"Repositório sintético: {spec.commits} commits, {spec.files} arquivos")
+
+        all_seconds, all_pairs = _traverse(repo, "all")
+        commit_seconds, commit_pairs = _traverse(repo, "commits")
+
+    assert all_pairs == commit_pairs, "os commits por arquivo/autor divergem entre os modos"
+    print(f"{'--metric all (numstat)':<30} {all_seconds:>8.2f} s")
+    print(f"{'--metric commits (name-status)':<30} {commit_seconds:>8.2f} s  ({all_seconds / commit_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    fields = ("commits", "files", "lines_mu")
+    values = dict(zip(fields, (cast(arg) for cast, arg in zip((int, int, float), sys.argv[1:]))))
+    run(SyntheticRepoSpec(**{"commits": 5_000, "files": 2_000, "lines_mu": 4.0, **values}))
@@ -0,0 +1,53 @@
+"""Tempo de geração e tamanho do relatório HTML com 1k/10k/100k arquivos de risco.
+
+Uso (na raiz do projeto): python -m benchmarks.bench_html_report
+"""
+import os
+import random
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from busfactor.models import RiskAnalysisResult
+from busfactor.reportGenerator.html_report_generator import HTMLReportGenerator
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def make_results(count: int, authors: int = 300, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    names = [f"Autor {i}" for i in range(authors)]
+    results = []
+    for i in range(count):
+        file_authors = rng.sample(names, rng.randint(1, 6))
+        total_commits = rng.randint(1, 200)
+        results.append(RiskAnalysisResult(
+            file_path=f"src/module{i % 500}/sub{i % 37}/file_{i}.py",
+            repository=f"https://github.com/org/repo{i % 5}",
+            dominant_author_commits=file_authors[0],
+            dominant_author_lines=rng.choice(file_authors),
+            commits_dominance=rng.uniform(0.5, 1.0),
+            lines_dominance=rng.uniform(0.0, 1.0),
+            total_commits=total_commits,
+            total_lines_changed=rng.randint(0, 20_000),
+            all_authors=file_authors,
+        ))
+    return results
+
+
+def run():
+    generator = HTMLReportGenerator()
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "report.html")
+        for size in SIZES:
+            results = make_results(size)
+            start = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                generator.generate_html(results, output_path=output)
+            seconds = time.perf_counter() - start
+            print(f"{size:>8} linhas  {seconds:7.2f} s  {os.path.getsize(output) / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    run()
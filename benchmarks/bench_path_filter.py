@@ -0,0 +1,57 @@
+"""Microbenchmark de `should_include_file`: fnmatch em laço x PathFilter compilado.
+
+Uso (na raiz do projeto): python -m benchmarks.bench_path_filter
+"""
+import random
+import timeit
+from fnmatch import fnmatch
+
+from busfactor.service.path_filter import PathFilter
+
+INCLUDE = ["src/**", "lib/**", "**/*.py", "**/*.js", "Makefile"]
+EXCLUDE = ["docs/**", ".github/**", "vendor/**", "**/*.min.js", "build/**"]
+CALLS = 200_000
+
+
+def fnmatch_filter(file_path: str) -> bool:
+    for pattern in EXCLUDE:
+        if fnmatch(file_path, pattern):
+            return False
+    for pattern in INCLUDE:
+        if fnmatch(file_path, pattern):
+            return True
+    return False
+
+
+def make_paths(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    roots = ["src", "lib", "docs", "vendor", "build", "tests", ".github"]
+    extensions = ["py", "js", "min.js", "md", "c"]
+    paths = []
+    for i in range(count):
+        depth = rng.randint(0, 4)
+        parts = [rng.choice(roots)] + [f"d{rng.randint(0, 9)}" for _ in range(depth)]
+        paths.append("/".join(parts + [f"f{i}.{rng.choice(extensions)}"]))
+    return paths
+
+
+def run():
+    # ~2k caminhos distintos, repetidos como em um histórico real
+    paths = make_paths(2_000)
+    workload = [random.Random(1).choice(paths) for _ in range(CALLS)]
+
+    def bench(label, func):
+        seconds = min(timeit.repeat(lambda: [func(p) for p in workload], number=1, repeat=3))
+        print(f"{label:<28} {seconds * 1e9 / CALLS:8.1f} ns/chamada")
+
+    bench("fnmatch (original)", fnmatch_filter)
+
+    cold = PathFilter(INCLUDE, EXCLUDE, cache_size=0)
+    bench("PathFilter sem cache", cold.matches)
+
+    warm = PathFilter(INCLUDE, EXCLUDE)
+    bench("PathFilter com cache", warm.matches)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,194 @@
+"""Benchmark do pipeline completo sobre um repositório sintético.
+
+Mede separadamente cada estágio: clone (`file://`), `analyze_repository`,
+`_identify_risky_files` e cada formato de relatório. Cada estágio roda em um
+subprocesso novo; a preparação (clone, coleta) fica fora do tempo medido e
+o pico de RSS do subprocesso é registrado junto com a vazão.
+
+O resultado é gravado em JSON (`--output`/`--save-baseline`) e pode ser
+comparado com um baseline anterior (`--baseline`), desde que gerado com a
+mesma especificação de repositório.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_pipeline --commits 5000 --save-baseline baseline.json
+    python -m benchmarks.bench_pipeline --commits 5000 --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from dataclasses import fields
+
+from benchmarks.synthetic_repo import SyntheticRepoSpec, generate_repository
+
+STAGES = ("clone", "analyze", "identify", "report-table", "report-html", "report-json", "report-csv")
+REPORT_SUFFIXES = {"table": None, "html": ".html", "json": ".jsonl", "csv": ".csv"}
+DEFAULT_TOLERANCE = 0.2
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss é em KiB no Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _clone(url: str, config):
+    from busfactor.service.repository_manager import RepositoryManager
+
+    manager = RepositoryManager()
+    return manager, manager.clone_repository(url, config)
+
+
+def run_stage(stage: str, repo: str, days: int, threshold: float) -> dict:
+    """Executa um estágio (no subprocesso) e devolve tempo, vazão e memória."""
+    from busfactor.models import AnalysisConfig
+    from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+
+    url = f"file://{repo}"
+    config = AnalysisConfig(days=days, dominance_threshold=threshold)
+    commits = int(subprocess.run(["git", "-C", repo, "rev-list", "--count", "HEAD"],
+                                 check=True, capture_output=True, text=True).stdout)
+
+    if stage == "clone":
+        started = time.perf_counter()
+        manager, path = _clone(url, config)
+        seconds = time.perf_counter() - started
+        peak = _peak_rss_mb()
+        manager.release_repository(path)
+        return {"seconds": seconds, "peak_rss_mb": peak, "commits_per_s": commits / seconds}
+
+    manager, path = _clone(url, config)
+    analyzer = BusFactorAnalyzer(config)
+    try:
+        if stage == "analyze":
+            started = time.perf_counter()
+            results = analyzer.analyze_repository(path, url)
+            seconds = time.perf_counter() - started
+            peak = _peak_rss_mb()
+            files = len(analyzer.collect_aggregates(path))
+            return {"seconds": seconds, "peak_rss_mb": peak, "commits_per_s": commits / seconds,
+                    "files_per_s": files / seconds, "risky_files": len(results)}
+
+        if stage == "identify":
+            file_analyses = analyzer.collect_aggregates(path).to_file_analyses(url)
+            before = _peak_rss_mb()
+            started = time.perf_counter()
+            analyzer._identify_risky_files(file_analyses)
+            seconds = time.perf_counter() - started
+            return {"seconds": seconds, "peak_rss_mb": _peak_rss_mb(), "setup_peak_rss_mb": before,
+                    "files_per_s": len(file_analyses) / seconds}
+
+        from busfactor.reportGenerator.file_report_generator import ReportGenerator
+
+        format = stage.split("-", 1)[1]
+        results = analyzer.analyze_repository(path, url)
+        before = _peak_rss_mb()
+        with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            suffix = REPORT_SUFFIXES[format]
+            output = os.path.join(tmp, f"report{suffix}") if suffix else None
+            started = time.perf_counter()
+            ReportGenerator().generate_report(results, format, output=output)
+            seconds = time.perf_counter() - started
+            size = os.path.getsize(output) if output else 0
+        return {"seconds": seconds, "peak_rss_mb": _peak_rss_mb(), "setup_peak_rss_mb": before,
+                "rows_per_s": len(results) / seconds, "bytes": size}
+    finally:
+        manager.release_repository(path)
+
+
+def _environment() -> dict:
+    git = subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip()
+    return {"python": platform.python_version(), "git": git, "platform": platform.platform(),
+            "cpus": os.cpu_count()}
+
+
+def run(spec: SyntheticRepoSpec, days: int, threshold: float, stages=STAGES) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = os.path.join(tmp, "synthetic.git")
+        started = time.perf_counter()
+        generate_repository(repo, spec)
+        print(f"Repositório sintético gerado em {time.perf_counter() - started:.1f} s ({spec.commits} commits)")
+
+        results = {}
+        for stage in stages:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pipeline", "--child", stage,
+                 "--repo", repo, "--days", str(days), "--threshold", str(threshold)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[stage] = {key: round(value, 3) if isinstance(value, float) else value
+                              for key, value in json.loads(output).items()}
+            print(f"{stage:<14} {json.dumps(results[stage])}")
+
+    return {"spec": spec.to_dict(), "days": days, "threshold": threshold,
+            "environment": _environment(), "stages": results}
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Estágios em que tempo ou memória pioraram mais que `tolerance` em relação ao baseline."""
+    if (current["spec"], current["days"], current["threshold"]) != \
+            (baseline["spec"], baseline["days"], baseline["threshold"]):
+        print("Aviso: baseline gerado com outra especificação; os números não são comparáveis")
+
+    regressions = []
+    for stage, metrics in current["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            ratio = metrics[metric] / previous[metric] if previous[metric] else 1.0
+            flag = " <- regressão" if ratio > 1 + tolerance else ""
+            print(f"{stage:<14} {metric:<12} {previous[metric]:>10} -> {metrics[metric]:>10} ({ratio:.2f}x){flag}")
+            if flag:
+                regressions.append((stage, metric, ratio))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    defaults = SyntheticRepoSpec()
+    for field in fields(SyntheticRepoSpec):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=type(getattr(defaults, field.name)),
+                            default=getattr(defaults, field.name))
+    parser.add_argument("--days", type=int, default=9000)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--output", help="Grava o resultado desta execução em JSON")
+    parser.add_argument("--save-baseline", help="Grava o resultado como baseline")
+    parser.add_argument("--baseline", help="Compara com um baseline salvo anteriormente")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Piora relativa aceita antes de acusar regressão (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    spec = SyntheticRepoSpec(**{field.name: getattr(args, field.name) for field in fields(SyntheticRepoSpec)})
+    current = run(spec, args.days, args.threshold, args.stages)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child = argparse.ArgumentParser()
+        child.add_argument("stage", choices=STAGES)
+        child.add_argument("--repo", required=True)
+        child.add_argument("--days", type=int, required=True)
+        child.add_argument("--threshold", type=float, required=True)
+        options = child.parse_args(sys.argv[2:])
+        print(json.dumps(run_stage(options.stage, options.repo, options.days, options.threshold)))
+    else:
+        sys.exit(main())
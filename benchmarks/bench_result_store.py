@@ -0,0 +1,73 @@
+"""Benchmark do `query`: consultas sobre o `--results-db` sem voltar ao git.
+
+Grava snapshots sintéticos (resultados e contadores por arquivo/autor) de
+vários repositórios e mede as consultas típicas do `query`: por autor, por
+glob de caminho, por repositório e os agregados por autor e por repositório.
+
+Uso (na raiz do projeto): python -m benchmarks.bench_result_store [repositórios] [arquivos] [autores]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from busfactor.models import RiskAnalysisResult
+from busfactor.service.result_store import ResultStore
+
+RISKY_SHARE = 0.3
+
+
+def _populate(store: ResultStore, repos: int, files: int, authors: int, rng: np.random.Generator):
+    author_names = [f"author{i}" for i in range(authors)]
+    for repo in range(repos):
+        repository = f"repo{repo}"
+        file_paths = [f"src/pkg{i % 50}/file{i}.py" for i in range(files)]
+        pair_files = np.repeat(np.arange(files), 3)
+        pair_authors = rng.integers(authors, size=len(pair_files))
+        commits = rng.integers(1, 50, size=len(pair_files))
+        lines = rng.integers(1, 500, size=len(pair_files))
+        results = [
+            RiskAnalysisResult(
+                file_path=file_paths[file_id],
+                repository=repository,
+                dominant_author_commits=author_names[int(pair_authors[3 * file_id])],
+                dominant_author_lines=author_names[int(pair_authors[3 * file_id])],
+                commits_dominance=float(rng.uniform(0.5, 1.0)),
+                lines_dominance=float(rng.uniform(0.0, 1.0)),
+                total_commits=int(commits[3 * file_id:3 * file_id + 3].sum()),
+                total_lines_changed=int(lines[3 * file_id:3 * file_id + 3].sum()),
+                all_authors=[],
+            )
+            for file_id in np.flatnonzero(rng.random(files) < RISKY_SHARE).tolist()
+        ]
+        store.save_snapshot(repository, results, file_paths, author_names,
+                            (pair_files, pair_authors, commits, lines))
+
+
+def _timed(label: str, run):
+    started = time.perf_counter()
+    rows = run()
+    print(f"{label:<34} {(time.perf_counter() - started) * 1000:>8.1f} ms  ({len(rows)} linhas)")
+
+
+def run(repos: int, files: int, authors: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        with ResultStore(os.path.join(tmp, "results.sqlite")) as store:
+            started = time.perf_counter()
+            _populate(store, repos, files, authors, np.random.default_rng(0))
+            print(f"{repos} repositórios x {files} arquivos gravados em {time.perf_counter() - started:.1f} s")
+
+            _timed("--author author7", lambda: store.query(author="author7"))
+            _timed("--path 'src/pkg3/*' --limit 100", lambda: store.query(path="src/pkg3/*", limit=100))
+            _timed("--repo repo0 --min-dominance 0.9",
+                   lambda: store.query(repositories=["repo0"], min_dominance=0.9))
+            _timed("--group-by author", lambda: store.aggregate("author"))
+            _timed("--group-by repository", lambda: store.aggregate("repository"))
+            _timed("contadores de author7", lambda: store.files_touched_by("author7"))
+
+
+if __name__ == "__main__":
+    values = [int(arg) for arg in sys.argv[1:4]]
+    run(*values, *(50, 5_000, 500)[len(values):])
@@ -0,0 +1,138 @@
+"""Gerador de repositórios git sintéticos para os benchmarks.
+
+O histórico é escrito de uma vez com `git fast-import` (milhares de commits
+por segundo), num repositório bare que pode ser clonado via `file://`.
+
+Uso (na raiz do projeto): python -m benchmarks.synthetic_repo DESTINO [commits] [arquivos] [autores] [renomeações]
+"""
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+MAX_FILE_LINES = 400
+
+
+@dataclass
+class SyntheticRepoSpec:
+    commits: int = 2_000
+    files: int = 1_000
+    authors: int = 30
+    renames: int = 50
+    # Arquivos por commit ~ Pareto(size_alpha): a maioria pequena, com cauda longa
+    size_alpha: float = 1.3
+    max_files_per_commit: int = 100
+    # Linhas alteradas por arquivo ~ lognormal(lines_mu, lines_sigma)
+    lines_mu: float = 2.0
+    lines_sigma: float = 1.0
+    # Concentração da autoria: poucos autores fazem a maior parte dos commits
+    author_alpha: float = 1.2
+    seed: int = 42
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _HistoryWriter:
+    def __init__(self, spec: SyntheticRepoSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.authors = [f"Autor {i}" for i in range(spec.authors)]
+        self.paths: List[str] = []
+        self.contents: Dict[str, List[str]] = {}
+        self.next_token = 0
+        self.renamed = 0
+
+    def _pareto_index(self, alpha: float, limit: int) -> int:
+        return min(int(self.rng.paretovariate(alpha)) - 1, limit - 1)
+
+    def _token(self) -> str:
+        self.next_token += 1
+        return f"valor_{self.next_token} = {self.rng.random():.6f}"
+
+    def _pick_path(self) -> str:
+        # Arquivos nascem na primeira vez em que são tocados
+        index = self.rng.randrange(self.spec.files)
+        if index >= len(self.paths):
+            index = len(self.paths)
+            self.paths.append(f"src/pkg{index % 50}/mod{index % 7}/file_{index}.py")
+        return self.paths[index]
+
+    def _modify(self, path: str) -> bytes:
+        lines = self.contents.setdefault(path, [])
+        changed = max(1, int(self.rng.lognormvariate(self.spec.lines_mu, self.spec.lines_sigma)))
+        replaced = min(changed // 2, len(lines))
+        for position in self.rng.sample(range(len(lines)), replaced):
+            lines[position] = self._token()
+        for _ in range(changed - replaced):
+            if len(lines) >= MAX_FILE_LINES:
+                del lines[self.rng.randrange(len(lines))]
+            else:
+                lines.append(self._token())
+        return ("\n".join(lines) + "\n").encode()
+
+    def _rename(self) -> List[bytes]:
+        existing = [path for path in self.paths if path in self.contents]
+        if not existing:
+            return []
+        old = self.rng.choice(existing)
+        directory, _, name = old.rpartition("/")
+        self.renamed += 1
+        new = f"{directory}/renamed_{self.renamed}_{name}"
+        self.paths[self.paths.index(old)] = new
+        self.contents[new] = self.contents.pop(old)
+        return [f"R {old} {new}\n".encode()]
+
+    def commits(self):
+        spec = self.spec
+        rename_at = set(self.rng.sample(range(1, spec.commits), min(spec.renames, spec.commits - 1))) \
+            if spec.commits > 1 else set()
+        # Um commit a cada 10 minutos, terminando agora (dentro de qualquer janela --days razoável)
+        start = int(time.time()) - spec.commits * 600
+
+        for number in range(spec.commits):
+            author = self.authors[self._pareto_index(spec.author_alpha, spec.authors)]
+            email = author.lower().replace(" ", ".") + "@example.com"
+            stamp = f"{author} <{email}> {start + number * 600} +0000"
+            message = f"commit {number}\n".encode()
+
+            chunks = [
+                b"commit refs/heads/main\n",
+                f"author {stamp}\ncommitter {stamp}\n".encode(),
+                f"data {len(message)}\n".encode(), message,
+            ]
+            if number in rename_at:
+                chunks.extend(self._rename())
+
+            size = self._pareto_index(spec.size_alpha, spec.max_files_per_commit) + 1
+            for path in dict.fromkeys(self._pick_path() for _ in range(size)):
+                content = self._modify(path)
+                chunks.append(f"M 100644 inline {path}\ndata {len(content)}\n".encode())
+                chunks.append(content)
+            chunks.append(b"\n")
+            yield b"".join(chunks)
+
+
+def generate_repository(path: str, spec: SyntheticRepoSpec = None) -> str:
+    """Cria em `path` um repositório bare com o histórico descrito por `spec`."""
+    spec = spec or SyntheticRepoSpec()
+    subprocess.run(["git", "init", "-q", "--bare", "-b", "main", path], check=True)
+
+    process = subprocess.Popen(["git", "-C", path, "fast-import", "--quiet"], stdin=subprocess.PIPE)
+    try:
+        for chunk in _HistoryWriter(spec).commits():
+            process.stdin.write(chunk)
+    finally:
+        process.stdin.close()
+    if process.wait() != 0:
+        raise RuntimeError(f"git fast-import falhou ({process.returncode})")
+    return path
+
+
+if __name__ == "__main__":
+    destination, *sizes = sys.argv[1:]
+    fields = ("commits", "files", "authors", "renames")
+    generate_repository(destination, SyntheticRepoSpec(**dict(zip(fields, map(int, sizes)))))
+    print(destination)
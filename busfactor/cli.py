@@ -1,19 +1,32 @@
+import os
+import shutil
+import tempfile
+
 import typer
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple, Union
 
 from rich.console import Console
 
-from busfactor.models import AnalysisConfig
+from busfactor.models import AnalysisConfig, RiskAnalysisResult, TruckFactorResult
 from busfactor.reportGenerator.file_report_generator import ReportGenerator
-from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.reportGenerator.stream_report_generator import is_stream_format, write_cumulative_distribution
+from busfactor.service.clone_pipeline import ClonePrefetcher
+from busfactor.service.metrics import MetricsRecorder
 from busfactor.service.repository_manager import RepositoryManager
 
+if TYPE_CHECKING:
+    from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+    from busfactor.service.dominance_index import DominanceIndex
+
 app = typer.Typer(
     help="Detecta risco de monopólio de conhecimento (bus factor baixo) por arquivo.",
     no_args_is_help=True,
 )
 
 console = Console()
+# Mensagens de progresso vão para stderr quando o relatório é escrito no stdout
+err_console = Console(stderr=True)
 
 # Comando 1: hello (sanity check)
 @app.command("hello")
@@ -27,73 +40,463 @@ def version():
     """Mostra a versão da ferramenta."""
     typer.echo("bus-factor-analyzer 0.1.0")
 
+def _parse_days(values: List[str]) -> List[int]:
+    """Janelas de `--days`: a opção pode ser repetida e aceita listas separadas por vírgula."""
+    days = []
+    for value in values:
+        for item in value.split(","):
+            item = item.strip()
+            if not item.isdigit() or int(item) <= 0:
+                raise typer.BadParameter(f"Janela inválida: {item!r} (use dias inteiros positivos)")
+            days.append(int(item))
+    return days
+
+def _parse_thresholds(values: List[str]) -> List[float]:
+    """Limiares de `--thresholds` (0–1), repetidos ou separados por vírgula, em ordem crescente."""
+    thresholds = []
+    for value in values:
+        for item in value.split(","):
+            try:
+                threshold = float(item)
+            except ValueError:
+                threshold = -1.0
+            if not 0 <= threshold <= 1:
+                raise typer.BadParameter(f"Limiar inválido: {item.strip()!r} (use valores entre 0 e 1)")
+            thresholds.append(threshold)
+    return sorted(set(thresholds))
+
+def _max_memory_bypassed_by(config: AnalysisConfig) -> List[str]:
+    """Opções com as quais o --max-memory não limita o pico de memória (os pares ficam ou voltam à memória)."""
+    options = {
+        "--days com várias janelas": config.windows is not None,
+        "--truck-factor": config.truck_factor,
+        "--group-by-depth": config.group_by_depth is not None,
+        "--index-dir/--thresholds": config.index_dir is not None,
+        "--ownership blame": config.ownership == "blame",
+        "--results-db": config.results_db is not None,
+        "--cache-dir": config.cache_dir is not None,
+    }
+    return [option for option, enabled in options.items() if enabled]
+
+def _analyze_repository_task(
+        repo: str,
+        config: AnalysisConfig,
+        profile: bool = False
+) -> Tuple[List[RiskAnalysisResult], Optional[str], dict, Optional[TruckFactorResult]]:
+    """Clona e analisa um repositório dentro de um processo do pool.
+
+    Erros são devolvidos como texto em vez de propagados, para que a falha
+    de um repositório não interrompa os demais. As métricas do worker voltam
+    junto, para serem somadas às do processo principal, assim como o truck
+    factor (quando `config.truck_factor`).
+    """
+    from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+
+    metrics = MetricsRecorder(profile=profile)
+    repository_manager = RepositoryManager(metrics)
+    try:
+        repo_path = repository_manager.clone_repository(repo, config)
+        try:
+            analyzer = BusFactorAnalyzer(config, metrics=metrics)
+            results = analyzer.analyze_repository(repo_path, repo)
+            return results, None, metrics.to_dict(), analyzer.truck_factors.get(repo)
+        finally:
+            repository_manager.release_repository(repo_path)
+    except Exception as e:
+        return [], str(e), metrics.to_dict(), None
+
+
 class BusFactorCLI:
     """Interface de linha de comando para o Bus Factor Analyzer"""
 
     def __init__(self):
         self.repository_manager = RepositoryManager()
         self.report_generator = ReportGenerator()
+        self.console = console
+        self.metrics = MetricsRecorder()
 
     def analyze_repositories(
             self,
             repos: List[str],
-            days: int = 9000,
+            days: Union[int, List[int]] = 9000,
             dominance_threshold: float = 0.5,
             include: List[str] = None,
             exclude: List[str] = None,
-            format: str = "table"
+            format: str = "table",
+            backend: str = "git",
+            cache_dir: str = None,
+            jobs: int = 1,
+            shards: int = 1,
+            clone_mode: str = "auto",
+            mirror_dir: str = None,
+            mirror_max_mb: int = 10240,
+            pathspec_pushdown: bool = True,
+            glob_semantics: str = "fnmatch",
+            output: str = None,
+            metrics_out: str = None,
+            profile: str = None,
+            prefetch: int = 1,
+            prefetch_max_mb: int = None,
+            thresholds: List[float] = None,
+            index_dir: str = None,
+            cdf_out: str = None,
+            group_by_depth: int = None,
+            truck_factor: bool = False,
+            follow_renames: bool = True,
+            ownership: str = "history",
+            blame_jobs: int = None,
+            metric: str = "all",
+            max_memory: int = None,
+            results_db: str = None,
+            keep_snapshots: int = None
     ):
+        # Várias janelas são analisadas numa única passada pelo histórico
+        windows = [days] if isinstance(days, int) else sorted(set(days))
+        # Com vários limiares, o relatório detalhado usa o menor (superconjunto dos demais)
+        # e as contagens dos outros saem do índice de dominância salvo por repositório
+        sweep_dir = None
+        if thresholds:
+            dominance_threshold = min(thresholds)
+            if index_dir is None:
+                index_dir = sweep_dir = tempfile.mkdtemp(prefix="bus_factor_index_")
         config = AnalysisConfig(
-            days=days,
+            days=windows[-1],
+            windows=windows if len(windows) > 1 else None,
             dominance_threshold=dominance_threshold,
             include_patterns=include or None,
-            exclude_patterns=exclude or None
+            exclude_patterns=exclude or None,
+            backend=backend,
+            cache_dir=cache_dir,
+            shards=shards,
+            clone_mode=clone_mode,
+            mirror_dir=mirror_dir,
+            mirror_max_mb=mirror_max_mb,
+            pathspec_pushdown=pathspec_pushdown,
+            glob_semantics=glob_semantics,
+            index_dir=index_dir,
+            group_by_depth=group_by_depth,
+            truck_factor=truck_factor,
+            follow_renames=follow_renames,
+            ownership=ownership,
+            blame_jobs=blame_jobs,
+            metric=metric,
+            max_memory_mb=max_memory,
+            results_db=results_db,
+            results_keep=keep_snapshots
         )
 
-        analyzer = BusFactorAnalyzer(config)
+        bypassed = _max_memory_bypassed_by(config) if max_memory is not None else []
+        if bypassed:
+            err_console.print(
+                f"Aviso: com {', '.join(bypassed)}, o --max-memory não limita o pico de memória "
+                "(os contadores são mantidos ou trazidos de volta para a memória)")
+
+        # Métricas por execução, compartilhadas por clone, análise e relatório
+        self.metrics = MetricsRecorder(profile=profile is not None)
+        self.repository_manager.metrics = self.metrics
+        self.report_generator.metrics = self.metrics
+
+        # json/jsonl/csv são escritos repositório a repositório, sem acumular resultados
+        stream = None
+        self.console = console
+        if is_stream_format(format):
+            stream = self.report_generator.open_stream(format, output, config.windows)
+            if output is None or output == "-":
+                self.console = err_console
+
+        if jobs > 1 and len(repos) > 1:
+            self.console.print(f"Analisando {len(repos)} repositórios com {jobs} processos")
+            outcomes = self._analyze_in_pool(repos, config, jobs, self.metrics)
+        else:
+            from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+            analyzer = BusFactorAnalyzer(config, metrics=self.metrics)
+            max_bytes = prefetch_max_mb * 1024 * 1024 if prefetch_max_mb is not None else None
+            outcomes = self._analyze_with_prefetch(repos, analyzer, prefetch, max_bytes)
+
         all_results = []
+        analyzed = []
+        truck_factors = []
+        total_risky = 0
+
+        try:
+            # Os resultados são agregados na ordem de entrada, independente da ordem de término
+            for repo, (risky_files, error, repo_truck_factor) in zip(repos, outcomes):
+                if error is not None:
+                    self.console.print(f"Erro ao analisar {repo}: {error}")
+                    continue
+
+                analyzed.append(repo)
+                if truck_factor and repo_truck_factor is not None:
+                    truck_factors.append(repo_truck_factor)
+                total_risky += len(risky_files)
+                if stream is not None:
+                    with self.metrics.stage(f"report:{format}"):
+                        stream.write_all(risky_files)
+                else:
+                    all_results.extend(risky_files)
+                self.console.print(f"Análise concluída ({repo}): {len(risky_files)} arquivos de risco encontrados")
+        finally:
+            if stream is not None:
+                stream.close()
+
+        if not total_risky:
+            self.console.print("Nenhum arquivo com risco de monopólio encontrado! Repo saúdavel")
+        else:
+            self.console.print(f"Relatório Final: {total_risky} arquivos com risco encontrados")
+            if stream is None:
+                self.report_generator.generate_report(all_results, format, output=output)
 
-        for repo in repos:
-            console.print(f"Analisando repositório: [bold]{repo}[/bold]")
+        if truck_factors:
+            self.report_generator.generate_truck_factor_report(truck_factors, console=self.console)
 
+        if thresholds:
+            from busfactor.service.dominance_index import DominanceIndexStore
             try:
-                repo_path = self.repository_manager.clone_repository(repo)
+                store = DominanceIndexStore(index_dir)
+                indexes = [index for index in map(store.load, analyzed) if index is not None]
+                self.report_threshold_sweep(indexes, thresholds, cdf_out)
+            finally:
+                if sweep_dir is not None:
+                    shutil.rmtree(sweep_dir, ignore_errors=True)
+
+        if metrics_out:
+            self.metrics.write(metrics_out)
+            self.console.print(f"Métricas salvas em {metrics_out}")
+        if profile and self.metrics.dump_profile(profile):
+            self.console.print(f"Perfil do percurso salvo em {profile} (python -m pstats {profile})")
+
+    def report_threshold_sweep(self, indexes: List["DominanceIndex"], thresholds: List[float], cdf_out: str = None):
+        """Arquivos em risco por limiar (todos os repositórios) e, com `cdf_out`, a curva completa."""
+        from busfactor.service.dominance_index import cumulative_distribution, merged_sorted_scores, risky_counts
 
-                risky_files = analyzer.analyze_repository(repo_path, repo)
-                all_results.extend(risky_files)
+        scores = merged_sorted_scores(indexes)
+        self.report_generator.generate_threshold_sweep(
+            thresholds, risky_counts(scores, thresholds), len(scores), console=self.console)
+        if cdf_out:
+            write_cumulative_distribution(cdf_out, *cumulative_distribution(scores))
+            if cdf_out != "-":
+                self.console.print(f"Distribuição cumulativa salva em {cdf_out}")
 
-                console.print(f"Análise concluída: {len(risky_files)} arquivos de risco encontrados")
+    def _analyze_with_prefetch(
+            self,
+            repos: List[str],
+            analyzer: "BusFactorAnalyzer",
+            prefetch: int,
+            max_bytes: Optional[int]
+    ) -> Iterator[Tuple[List[RiskAnalysisResult], Optional[str], Optional[TruckFactorResult]]]:
+        # O clone dos próximos repositórios corre em threads enquanto o atual é analisado
+        prefetcher = ClonePrefetcher(self.repository_manager, analyzer.config, prefetch, max_bytes)
 
+        for repo, repo_path, error in prefetcher.iterate(repos):
+            self.console.print(f"Analisando repositório: [bold]{repo}[/bold]")
+            if error is not None:
+                yield [], error, None
+                continue
+
+            try:
+                results = analyzer.analyze_repository(repo_path, repo)
             except Exception as e:
-                console.print(f"Erro ao analisar {repo}: {e}")
+                yield [], str(e), None
                 continue
+            yield results, None, analyzer.truck_factors.pop(repo, None)
 
-        if not all_results:
-            console.print("Nenhum arquivo com risco de monopólio encontrado! Repo saúdavel")
-        else:
-            console.print(f"Relatório Final: {len(all_results)} arquivos com risco encontrados")
-            self.report_generator.generate_report(all_results, format)
+    @staticmethod
+    def _analyze_in_pool(repos: List[str], config: AnalysisConfig, jobs: int, metrics: MetricsRecorder):
+        profile = [metrics.profiler is not None] * len(repos)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # map devolve os resultados na ordem de entrada, à medida que ficam prontos
+            for results, error, worker_metrics, repo_truck_factor in executor.map(
+                    _analyze_repository_task, repos, [config] * len(repos), profile):
+                metrics.merge(worker_metrics)
+                yield results, error, repo_truck_factor
 
 cli = BusFactorCLI()
 @app.command("analyze")
 def analyze(
-    repos: List[str] = typer.Argument(..., metavar="REPO...", help="Um ou mais repositórios (URL, owner/repo ou caminho local)"),
-    days: int = typer.Option(9000, "--days", help="Janela temporal (dias)"),
+    repos: List[str] = typer.Argument(..., metavar="REPO...", help="Um ou mais repositórios (URL do GitHub ou file:// local)"),
+    days: List[str] = typer.Option(
+        ["9000"], "--days",
+        help="Janela temporal (dias); repita ou separe por vírgula (30,90,365) para várias janelas numa passada"),
     dominance_threshold: float = typer.Option(0.5, "--dominance-threshold", help="Limiar de dominância (0–1)"),
     include: List[str] = typer.Option(None, "--include", help="Globs para incluir (pode repetir)"),
     exclude: List[str] = typer.Option(None, "--exclude", help="Globs para excluir (pode repetir)"),
-    format: str = typer.Option("table", "--format", help="table|json|csv|html"),
+    format: str = typer.Option("table", "--format", help="table|json|jsonl|csv|html"),
+    output: str = typer.Option(
+        None, "--output", "-o",
+        help="Destino do relatório (json/csv: stdout por padrão; .gz comprime)"),
+    backend: str = typer.Option("git", "--backend", help="Backend de histórico: git|pydriller"),
+    cache_dir: str = typer.Option(None, "--cache-dir", help="Diretório do cache incremental de análises"),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Repositórios analisados em paralelo (processos)"),
+    shards: int = typer.Option(1, "--shards", min=1, help="Faixas do histórico de um repositório percorridas em paralelo"),
+    clone_mode: str = typer.Option("auto", "--clone-mode", help="auto|full|shallow|blobless"),
+    mirror_dir: str = typer.Option(None, "--mirror-dir", help="Diretório de mirrors reutilizados entre execuções"),
+    mirror_max_mb: int = typer.Option(10240, "--mirror-max-mb", help="Orçamento de disco dos mirrors (MB, LRU)"),
+    pathspec_pushdown: bool = typer.Option(
+        True, "--pathspec-pushdown/--no-pathspec-pushdown",
+        help="Envia --include/--exclude ao git como pathspecs"),
+    glob_semantics: str = typer.Option(
+        "fnmatch", "--glob-semantics",
+        help="fnmatch (caminho inteiro, * atravessa /) ou git (pathspec :(glob), * fica no diretório)"),
+    metrics_out: str = typer.Option(
+        None, "--metrics-out",
+        help="Grava em JSON tempo de parede/CPU por estágio, contadores e pico de memória"),
+    profile: str = typer.Option(
+        None, "--profile", help="Grava um perfil cProfile (pstats) do laço de percurso do histórico"),
+    prefetch: int = typer.Option(
+        1, "--prefetch", min=0, help="Clones adiantados enquanto o repositório atual é analisado (0 desliga)"),
+    prefetch_max_mb: int = typer.Option(
+        None, "--prefetch-max-mb", help="Disco máximo (MB) ocupado por clones aguardando análise"),
+    thresholds: List[str] = typer.Option(
+        None, "--thresholds",
+        help="Vários limiares de dominância de uma vez (0.5,0.6,0.8); o relatório usa o menor"),
+    index_dir: str = typer.Option(
+        None, "--index-dir", help="Salva o índice de dominância por arquivo (consultável com `sweep`)"),
+    cdf_out: str = typer.Option(
+        None, "--cdf-out", help="Grava em CSV a curva de arquivos em risco por limiar (com --thresholds)"),
+    group_by_depth: int = typer.Option(
+        None, "--group-by-depth", min=0,
+        help="Relata diretórios em vez de arquivos, agregando até essa profundidade (0 = repositório)"),
+    truck_factor: bool = typer.Option(
+        False, "--truck-factor", help="Calcula o truck factor de cada repositório (autores até orfanar >50% dos arquivos)"),
+    follow_renames: bool = typer.Option(
+        True, "--follow-renames/--no-follow-renames",
+        help="Junta o histórico de arquivos renomeados sob o caminho atual"),
+    ownership: str = typer.Option(
+        "history", "--ownership",
+        help="Linhas por autor: history (alteradas na janela) ou blame (sobreviventes no HEAD)"),
+    blame_jobs: int = typer.Option(
+        None, "--blame-jobs", min=1, help="Processos de git blame em paralelo (com --ownership blame)"),
+    metric: str = typer.Option(
+        "all", "--metric",
+        help="all (commits e linhas) ou commits (só arquivos tocados, sem diff; campos de linhas vazios)"),
+    max_memory: int = typer.Option(
+        None, "--max-memory", min=16,
+        help="Limite (MB) dos contadores em memória por repositório; o excedente vai para um SQLite temporário"),
+    results_db: str = typer.Option(
+        None, "--results-db", help="Salva resultados e contadores num banco SQLite (consultável com `query`)"),
+    keep_snapshots: int = typer.Option(
+        None, "--keep-snapshots", min=1,
+        help="Snapshots mantidos por repositório no --results-db; os mais antigos são apagados"),
 ):
 
     cli.analyze_repositories(
         repos=repos,
-        days=days,
+        days=_parse_days(days),
         dominance_threshold=dominance_threshold,
         include=include,
         exclude=exclude,
-        format=format
+        format=format,
+        backend=backend,
+        cache_dir=cache_dir,
+        jobs=jobs,
+        shards=shards,
+        clone_mode=clone_mode,
+        mirror_dir=mirror_dir,
+        mirror_max_mb=mirror_max_mb,
+        pathspec_pushdown=pathspec_pushdown,
+        glob_semantics=glob_semantics,
+        output=output,
+        metrics_out=metrics_out,
+        profile=profile,
+        prefetch=prefetch,
+        prefetch_max_mb=prefetch_max_mb,
+        thresholds=_parse_thresholds(thresholds) if thresholds else None,
+        index_dir=index_dir,
+        cdf_out=cdf_out,
+        group_by_depth=group_by_depth,
+        truck_factor=truck_factor,
+        follow_renames=follow_renames,
+        ownership=ownership,
+        blame_jobs=blame_jobs,
+        metric=metric,
+        max_memory=max_memory,
+        results_db=results_db,
+        keep_snapshots=keep_snapshots
     )
 
+@app.command("sweep")
+def sweep(
+    index_dir: str = typer.Option(..., "--index-dir", help="Diretório de índices salvo por `analyze --index-dir`"),
+    thresholds: List[str] = typer.Option(
+        ["0.5,0.6,0.7,0.8,0.9,1.0"], "--thresholds", help="Limiares a consultar (0–1)"),
+    cdf_out: str = typer.Option(None, "--cdf-out", help="Grava em CSV a curva de arquivos em risco por limiar"),
+):
+    """Arquivos em risco por limiar a partir dos índices salvos, sem reanalisar o histórico."""
+    from busfactor.service.dominance_index import DominanceIndexStore
+
+    indexes = DominanceIndexStore(index_dir).load_all()
+    if not indexes:
+        typer.echo(f"Nenhum índice de dominância encontrado em {index_dir}", err=True)
+        raise typer.Exit(1)
+    cli.report_threshold_sweep(indexes, _parse_thresholds(thresholds), cdf_out)
+
+@app.command("query")
+def query(
+    results_db: str = typer.Option(..., "--results-db", help="Banco salvo por `analyze --results-db`"),
+    repos: List[str] = typer.Option(None, "--repo", help="Só esses repositórios (pode repetir)"),
+    author: str = typer.Option(None, "--author", help="Só arquivos em que esse autor é o dominante"),
+    path: str = typer.Option(None, "--path", help="Glob do caminho do arquivo (ex.: 'src/*'), como no --include"),
+    glob_semantics: str = typer.Option(
+        "fnmatch", "--glob-semantics", help="Semântica do glob de --path: fnmatch ou git (como no analyze)"),
+    min_dominance: float = typer.Option(
+        None, "--min-dominance", min=0.0, max=1.0, help="Dominância mínima (commits ou linhas, 0–1)"),
+    all_snapshots: bool = typer.Option(
+        False, "--all-snapshots",
+        help="Consulta todas as análises salvas, não só a mais recente de cada repositório"),
+    sort: str = typer.Option(
+        "commits_dominance", "--sort",
+        help="commits_dominance|lines_dominance|total_commits|total_lines_changed|file_path|repository"),
+    descending: bool = typer.Option(True, "--desc/--asc", help="Ordem decrescente ou crescente"),
+    limit: int = typer.Option(None, "--limit", min=1, help="Número máximo de linhas"),
+    group_by: str = typer.Option(
+        None, "--group-by", help="Agrega os arquivos em risco por author ou repository"),
+    touched_by: str = typer.Option(
+        None, "--touched-by",
+        help="Lista todos os arquivos com contadores do autor (não só os em risco), com commits e linhas"),
+    format: str = typer.Option(
+        "table", "--format", help="table|json|jsonl|csv|html (agregados e --touched-by: table|json|csv)"),
+    output: str = typer.Option(None, "--output", "-o", help="Destino do relatório (stdout por padrão)"),
+):
+    """Filtra, ordena e agrega os resultados salvos com `--results-db`, sem reanalisar o histórico."""
+    from busfactor.reportGenerator.stream_report_generator import write_aggregates
+    from busfactor.service.result_store import ResultStore
+
+    if not os.path.exists(results_db):
+        typer.echo(f"Banco de resultados não encontrado: {results_db}", err=True)
+        raise typer.Exit(1)
+    filters = dict(repositories=repos or None, author=author, path=path, min_dominance=min_dominance,
+                   all_snapshots=all_snapshots, limit=limit, glob_semantics=glob_semantics)
+    with ResultStore(results_db) as store:
+        try:
+            if touched_by is not None:
+                rows = [dict(zip(("repository", "file_path", "commits", "lines"), row))
+                        for row in store.files_touched_by(touched_by, repos or None, all_snapshots, limit)]
+            elif group_by is not None:
+                rows = store.aggregate(group_by, **filters)
+            else:
+                results = store.query(sort=sort, descending=descending, **filters)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+
+    if touched_by is not None:
+        if format == "table":
+            cli.report_generator.generate_touched_report(rows, touched_by)
+        elif format in ("json", "csv"):
+            write_aggregates(output, format, rows)
+        else:
+            raise typer.BadParameter(f"Formato não suportado para --touched-by: {format}")
+    elif group_by is not None:
+        if format == "table":
+            cli.report_generator.generate_aggregate_report(rows, group_by)
+        elif format in ("json", "csv"):
+            write_aggregates(output, format, rows)
+        else:
+            raise typer.BadParameter(f"Formato não suportado para agregados: {format}")
+    elif not results:
+        err_console.print("Nenhum resultado salvo corresponde aos filtros")
+    else:
+        cli.report_generator.generate_report(results, format, output=output)
+
 def main():
     app(prog_name="bus-factor-analyzer")
 
@@ -1,3 +1,3 @@
-from .data_models import AnalysisConfig, FileAnalysis, RiskAnalysisResult
+from .data_models import AnalysisConfig, CommitRecord, FileAnalysis, FileModification, RiskAnalysisResult, TruckFactorResult, WindowDominance
 
-__all__ = ['AnalysisConfig', 'FileAnalysis', 'RiskAnalysisResult']
\ No newline at end of file
+__all__ = ['AnalysisConfig', 'CommitRecord', 'FileAnalysis', 'FileModification', 'RiskAnalysisResult', 'TruckFactorResult', 'WindowDominance']
\ No newline at end of file
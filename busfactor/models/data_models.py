@@ -1,7 +1,7 @@
-from dataclasses import dataclass
-from typing import List, Dict
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
 
-@dataclass
+@dataclass(slots=True)
 class FileAnalysis:
     file_path: str
     repository: str
@@ -11,17 +11,51 @@ class FileAnalysis:
     lines_by_author: Dict[str, int]
 
 
-@dataclass
+@dataclass(slots=True)
+class WindowDominance:
+    """Dominância de um arquivo numa das janelas de uma análise multi-janela."""
+    days: int
+    dominant_author_commits: str
+    dominant_author_lines: Optional[str]
+    commits_dominance: float
+    lines_dominance: Optional[float]
+    total_commits: int
+    total_lines_changed: Optional[int]
+    at_risk: bool
+
+    @property
+    def commits_dominance_percentage(self) -> str:
+        return f"{self.commits_dominance:.1%}"
+
+
+@dataclass(slots=True)
+class TruckFactorResult:
+    """Truck factor de um repositório: autores que precisam sair para orfanar a maioria dos arquivos."""
+    repository: str
+    truck_factor: int
+    total_files: int
+    orphaned_files: int
+    removed_authors: List[str]
+
+    @property
+    def orphaned_percentage(self) -> str:
+        return f"{self.orphaned_files / self.total_files:.1%}" if self.total_files else "-"
+
+
+@dataclass(slots=True)
 class RiskAnalysisResult:
     file_path: str
     repository: str
     dominant_author_commits: str
-    dominant_author_lines: str
+    # Campos de linhas ficam None com --metric commits (sem estatísticas de diff)
+    dominant_author_lines: Optional[str]
     commits_dominance: float
-    lines_dominance: float
+    lines_dominance: Optional[float]
     total_commits: int
-    total_lines_changed: int
+    total_lines_changed: Optional[int]
     all_authors: List[str]
+    # Preenchido só com várias janelas (--days); os campos acima são os da maior janela
+    windows: List[WindowDominance] = field(default_factory=list)
 
     @property
     def commits_dominance_percentage(self) -> str:
@@ -29,7 +63,7 @@ class RiskAnalysisResult:
 
     @property
     def lines_dominance_percentage(self) -> str:
-        return f"{self.lines_dominance:.1%}"
+        return f"{self.lines_dominance:.1%}" if self.lines_dominance is not None else "-"
 
     @property
     def authors_preview(self) -> str:
@@ -39,16 +73,75 @@ class RiskAnalysisResult:
         return preview
 
 
-@dataclass
+@dataclass(slots=True)
+class FileModification:
+    new_path: Optional[str]
+    old_path: Optional[str]
+    added_lines: int
+    deleted_lines: int
+
+    @property
+    def path(self) -> Optional[str]:
+        return self.new_path or self.old_path
+
+
+@dataclass(slots=True)
+class CommitRecord:
+    sha: str
+    author: str
+    timestamp: int
+    modifications: List[FileModification]
+
+
+@dataclass(slots=True)
 class AnalysisConfig:
     days: int = 9000
+    # Várias janelas (em dias) analisadas numa única passada; `days` vira a maior delas
+    windows: Optional[List[int]] = None
     dominance_threshold: float = 0.6 # default
     include_patterns: List[str] = None
     exclude_patterns: List[str] = None
+    backend: str = "git" # git | pydriller
+    cache_dir: Optional[str] = None
+    shards: int = 1
+    clone_mode: str = "auto" # auto | full | shallow | blobless
+    mirror_dir: Optional[str] = None
+    mirror_max_mb: int = 10240
+    pathspec_pushdown: bool = True
+    # Semântica de --include/--exclude: fnmatch (caminho inteiro, `*` atravessa `/`) | git (pathspec `:(glob)`)
+    glob_semantics: str = "fnmatch"
+    # Junta o histórico de um arquivo renomeado sob o caminho mais recente
+    follow_renames: bool = True
+    # Diretório onde o índice de dominância por arquivo é salvo (consultas por limiar sem reanálise)
+    index_dir: Optional[str] = None
+    # Agrega os arquivos por diretório até essa profundidade (0 = repositório inteiro)
+    group_by_depth: Optional[int] = None
+    # Calcula o truck factor do repositório junto com a análise por arquivo
+    truck_factor: bool = False
+    # Linhas por autor: alteradas no histórico ou sobreviventes no HEAD (git blame)
+    ownership: str = "history" # history | blame
+    # Processos de `git blame` em paralelo (None = padrão do ThreadPoolExecutor)
+    blame_jobs: Optional[int] = None
+    # Métricas do histórico: all (commits e linhas) | commits (sem diff, bem mais rápido)
+    metric: str = "all"
+    # Teto (MB) para os pares arquivo/autor em memória; acima dele vão para um SQLite temporário
+    max_memory_mb: Optional[int] = None
+    # Banco SQLite onde resultados e contadores de cada análise ficam salvos (consultas com `query`)
+    results_db: Optional[str] = None
+    # Snapshots mantidos por repositório no --results-db (None mantém todos)
+    results_keep: Optional[int] = None
 
     def __post_init__(self):
         if self.include_patterns is None:
             self.include_patterns = ["**/*"]
         if self.exclude_patterns is None:
             self.exclude_patterns = ["docs/**", ".github/**"]
-            #todo should we exclude tests ?? "tests/**",
\ No newline at end of file
+            #todo should we exclude tests ?? "tests/**",
+        if self.windows:
+            self.windows = sorted(set(self.windows))
+            self.days = self.windows[-1]
+
+    @property
+    def needs_line_stats(self) -> bool:
+        # Linhas alteradas exigem o conteúdo dos arquivos (blobs) no clone
+        return self.metric != "commits"
\ No newline at end of file
@@ -1,22 +1,49 @@
-import json
-import csv
-import sys
-from typing import List
+from typing import List, Optional
 from rich.console import Console
 from rich.table import Table
-from busfactor.reportGenerator.html_report_generator import HTMLReportGenerator
-from busfactor.models import RiskAnalysisResult
+from busfactor.reportGenerator.stream_report_generator import (
+    StreamReportWriter,
+    is_stream_format,
+    open_report_stream,
+)
+from busfactor.models import RiskAnalysisResult, TruckFactorResult
+from busfactor.service.metrics import MetricsRecorder
+
+TRUCK_FACTOR_PREVIEW = 5
 
 
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, metrics: MetricsRecorder = None):
         self.console = Console()
+        self.metrics = metrics or MetricsRecorder()
+
+    def open_stream(self, format: str, output: Optional[str] = None,
+                    windows: Optional[List[int]] = None) -> StreamReportWriter:
+        """Writer incremental para formatos de máquina (json/jsonl/csv); saída padrão é stdout."""
+        return open_report_stream(format, output, windows)
+
+    def generate_report(self, results: List[RiskAnalysisResult], format: str, output: Optional[str] = None):
+        with self.metrics.stage(f"report:{format}"):
+            self._generate_report(results, format, output)
 
-    def generate_report(self, results: List[RiskAnalysisResult], format: str):
-        self._generate_table_report(results)
-        if format == "html":
+    def _generate_report(self, results: List[RiskAnalysisResult], format: str, output: Optional[str]):
+        if is_stream_format(format):
+            # Sem tabela no terminal: os resultados vão direto para o destino
+            windows = [window.days for window in results[0].windows] if results else None
+            with self.open_stream(format, output, windows) as writer:
+                writer.write_all(results)
+            return
+
+        if format == "table":
+            self._generate_table_report(results)
+        elif format == "html":
+            self._generate_table_report(results)
+            from busfactor.reportGenerator.html_report_generator import HTMLReportGenerator
             html_gen = HTMLReportGenerator()
-            html_gen.generate_html(results)
+            if output is None:
+                html_gen.generate_html(results)
+            else:
+                html_gen.generate_html(results, output_path=output)
         else:
             raise ValueError(f"Formato não suportado: {format}")
 
@@ -31,6 +58,10 @@ class ReportGenerator:
         table.add_column("Total Commits")
         table.add_column("Total Linhas")
         table.add_column("Autores")
+        # Análise multi-janela: dominância por commits em cada janela
+        windows = [window.days for window in results[0].windows] if results else []
+        for days in windows:
+            table.add_column(f"Commits {days}d")
 
         for result in results:
             table.add_row(
@@ -40,8 +71,87 @@ class ReportGenerator:
                 result.commits_dominance_percentage,
                 result.lines_dominance_percentage,
                 str(result.total_commits),
-                str(result.total_lines_changed),
-                result.authors_preview
+                str(result.total_lines_changed) if result.total_lines_changed is not None else "-",
+                result.authors_preview,
+                *(window.commits_dominance_percentage if window.total_commits else "-"
+                  for window in result.windows)
             )
 
         self.console.print(table)
+
+    def generate_threshold_sweep(self, thresholds: List[float], counts: List[int], total_files: int,
+                                 console: Optional[Console] = None):
+        """Tabela de arquivos em risco para cada limiar de dominância."""
+        table = Table(title="Arquivos em risco por limiar")
+
+        table.add_column("Limiar")
+        table.add_column("Arquivos em risco")
+        table.add_column("% dos arquivos")
+
+        for threshold, count in zip(thresholds, counts):
+            share = f"{count / total_files:.1%}" if total_files else "-"
+            table.add_row(f"{threshold:g}", str(count), share)
+
+        (console or self.console).print(table)
+
+    def generate_truck_factor_report(self, results: List[TruckFactorResult], console: Optional[Console] = None):
+        """Tabela com o truck factor de cada repositório e os autores removidos até orfanar a maioria."""
+        table = Table(title="Truck Factor")
+
+        table.add_column("Repositório")
+        table.add_column("Truck Factor")
+        table.add_column("Arquivos Órfãos")
+        table.add_column("Autores Removidos")
+
+        for result in results:
+            authors = ", ".join(result.removed_authors[:TRUCK_FACTOR_PREVIEW])
+            if len(result.removed_authors) > TRUCK_FACTOR_PREVIEW:
+                authors += f" (+{len(result.removed_authors) - TRUCK_FACTOR_PREVIEW})"
+            table.add_row(
+                result.repository,
+                str(result.truck_factor),
+                f"{result.orphaned_files}/{result.total_files} ({result.orphaned_percentage})",
+                authors
+            )
+
+        (console or self.console).print(table)
+
+    def generate_aggregate_report(self, rows: List[dict], group_by: str, console: Optional[Console] = None):
+        """Tabela do `query --group-by`: arquivos em risco e dominância média por grupo."""
+        table = Table(title=f"Arquivos em risco por {'autor' if group_by == 'author' else 'repositório'}")
+
+        table.add_column("Autor Dominante" if group_by == "author" else "Repositório")
+        table.add_column("Arquivos em risco")
+        table.add_column("Repositórios")
+        table.add_column("Commits (média)")
+        table.add_column("Linhas (média)")
+
+        for row in rows:
+            table.add_row(
+                row[group_by],
+                str(row["risky_files"]),
+                str(row["repositories"]),
+                f"{row['commits_dominance']:.1%}",
+                f"{row['lines_dominance']:.1%}" if row["lines_dominance"] is not None else "-",
+            )
+
+        (console or self.console).print(table)
+
+    def generate_touched_report(self, rows: List[dict], author: str, console: Optional[Console] = None):
+        """Tabela do `query --touched-by`: commits e linhas do autor em cada arquivo."""
+        table = Table(title=f"Arquivos com contribuições de {author}")
+
+        table.add_column("Repositório")
+        table.add_column("Arquivo")
+        table.add_column("Commits")
+        table.add_column("Linhas")
+
+        for row in rows:
+            table.add_row(
+                row["repository"],
+                row["file_path"],
+                str(row["commits"]),
+                str(row["lines"]) if row["lines"] is not None else "-",
+            )
+
+        (console or self.console).print(table)
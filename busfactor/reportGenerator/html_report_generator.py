@@ -1,161 +1,328 @@
-import pandas as pd
-import plotly.express as px
+import json
 from pathlib import Path
-from typing import List
+from typing import Dict, IO, Iterable, List, Tuple
 from busfactor.models import RiskAnalysisResult
 
+# Limites das séries dos gráficos: o tamanho do HTML não cresce com o número de autores
+TOP_AUTHORS = 15
+TOP_AUTHORS_PIE = 5
+HISTOGRAM_BINS = 20
+OTHERS_LABEL = "Outros"
+PAGE_SIZE = 100
+
+COLUMNS = [
+    "Repositório",
+    "Arquivo",
+    "Autor Dominante (Commits)",
+    "Autor Dominante (Linhas)",
+    "Dominância (Commits)",
+    "Dominância (Linhas)",
+    "Total Commits",
+    "Total Linhas",
+    "Autores",
+]
+
+
+def _to_json(value) -> str:
+    # Seguro dentro de <script>: nenhum "<" literal chega ao HTML
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+
+
+class _ReportSummary:
+    """Agregados por autor calculados numa única passada sobre os resultados."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.files = 0
+        self.files_by_author: List[int] = []
+        self.commits_dominance_sum: List[float] = []
+        self.lines_dominance_sum: List[float] = []
+        # Falso com --metric commits: o gráfico de dominância fica só com commits
+        self.has_lines = False
+        self.histogram = [0] * HISTOGRAM_BINS
+
+    def intern(self, name: str) -> int:
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.files_by_author.append(0)
+            self.commits_dominance_sum.append(0.0)
+            self.lines_dominance_sum.append(0.0)
+        return name_id
+
+    def add(self, result: RiskAnalysisResult) -> list:
+        """Contabiliza o resultado e devolve a linha compacta da tabela."""
+        commits_dominance = round(result.commits_dominance * 100, 2)
+        lines_dominance = round(result.lines_dominance * 100, 2) if result.lines_dominance is not None else None
+        author_id = self.intern(result.dominant_author_commits)
+
+        self.files += 1
+        self.files_by_author[author_id] += 1
+        self.commits_dominance_sum[author_id] += commits_dominance
+        if lines_dominance is not None:
+            self.has_lines = True
+            self.lines_dominance_sum[author_id] += lines_dominance
+        if result.total_commits > 1:
+            self.histogram[min(int(result.commits_dominance * HISTOGRAM_BINS), HISTOGRAM_BINS - 1)] += 1
+
+        # Nomes (repositórios e autores) viram índices de uma tabela compartilhada
+        return [
+            self.intern(result.repository),
+            result.file_path,
+            author_id,
+            self.intern(result.dominant_author_lines) if result.dominant_author_lines is not None else None,
+            commits_dominance,
+            lines_dominance,
+            result.total_commits,
+            result.total_lines_changed,
+            [self.intern(author) for author in result.all_authors],
+            # Análise multi-janela: dominância por commits em cada janela (null sem commits)
+            *(round(window.commits_dominance * 100, 2) if window.total_commits else None
+              for window in result.windows),
+        ]
+
+    def ranked_authors(self, limit: int) -> Tuple[List[int], List[int]]:
+        """IDs dos `limit` autores com mais arquivos em risco e os IDs restantes."""
+        authors = [i for i, count in enumerate(self.files_by_author) if count]
+        authors.sort(key=lambda i: -self.files_by_author[i])
+        return authors[:limit], authors[limit:]
+
+    def figures(self) -> List[dict]:
+        top, rest = self.ranked_authors(TOP_AUTHORS)
+        labels = [self.names[i] for i in top]
+        counts = [self.files_by_author[i] for i in top]
+        commits_avg = [round(self.commits_dominance_sum[i] / self.files_by_author[i], 2) for i in top]
+        lines_avg = [round(self.lines_dominance_sum[i] / self.files_by_author[i], 2) for i in top]
+
+        if rest:
+            rest_files = sum(self.files_by_author[i] for i in rest)
+            labels.append(f"{OTHERS_LABEL} ({len(rest)})")
+            counts.append(rest_files)
+            commits_avg.append(round(sum(self.commits_dominance_sum[i] for i in rest) / rest_files, 2))
+            lines_avg.append(round(sum(self.lines_dominance_sum[i] for i in rest) / rest_files, 2))
+
+        pie_top, pie_rest = self.ranked_authors(TOP_AUTHORS_PIE)
+        pie_labels = [self.names[i] for i in pie_top]
+        pie_values = [self.files_by_author[i] for i in pie_top]
+        if pie_rest:
+            pie_labels.append(OTHERS_LABEL)
+            pie_values.append(sum(self.files_by_author[i] for i in pie_rest))
+
+        dominance = [{"type": "bar", "name": "Dominância (Commits)", "x": labels, "y": commits_avg}]
+        if self.has_lines:
+            dominance.append({"type": "bar", "name": "Dominância (Linhas)", "x": labels, "y": lines_avg})
+
+        bin_width = 100 / HISTOGRAM_BINS
+        layout = {"height": 600, "font": {"size": 13}}
+        return [
+            {
+                "id": "fig-authors",
+                "data": [{"type": "bar", "x": labels, "y": counts, "text": counts, "textposition": "outside"}],
+                "layout": dict(layout, title="Arquivos em risco por autor dominante (Commits)",
+                               xaxis={"title": "Autor"}, yaxis={"title": "Arquivos em Risco"}),
+            },
+            {
+                "id": "fig-dominance",
+                "data": dominance,
+                "layout": dict(layout, title="Média de Dominância por Autor", barmode="group",
+                               xaxis={"title": "Autor"}, yaxis={"title": "Média (%)"}),
+            },
+            {
+                "id": "fig-histogram",
+                "data": [{
+                    "type": "bar",
+                    "x": [round((i + 0.5) * bin_width, 2) for i in range(HISTOGRAM_BINS)],
+                    "y": self.histogram,
+                    "width": bin_width,
+                    "marker": {"color": "#073769"},
+                }],
+                "layout": dict(layout, height=500, font={"size": 12},
+                               title="Distribuição de Dominância (Commits) em arquivos com mais de 1 commit",
+                               xaxis={"title": "Dominância (Commits)", "range": [0, 105]},
+                               yaxis={"title": "Quantidade de Arquivos"}),
+            },
+            {
+                "id": "fig-top",
+                "data": [{"type": "pie", "labels": pie_labels, "values": pie_values}],
+                "layout": dict(layout, title=f"Top {TOP_AUTHORS_PIE} Autores Dominantes (por número de arquivos)"),
+            },
+        ]
+
 
 class HTMLReportGenerator:
+    """Relatório HTML autocontido que escala para centenas de milhares de arquivos.
+
+    Os resultados são percorridos uma única vez: cada linha é gravada direto
+    no arquivo como JSON compacto (nomes repetidos viram índices) enquanto
+    os agregados por autor são acumulados. Os gráficos usam só os top-N
+    autores mais um grupo "Outros", e a tabela é paginada no navegador.
+    """
+
     def __init__(self):
         pass
 
-    def generate_html(self, results: List[RiskAnalysisResult], output_path: str = "report.html"):
-        if not results:
+    def generate_html(self, results: Iterable[RiskAnalysisResult], output_path: str = "report.html"):
+        results = iter(results)
+        first = next(results, None)
+        if first is None:
             print("Nenhum resultado disponível para gerar HTML.")
             return
 
-        data = [{
-            "Repositório": r.repository,
-            "Arquivo": r.file_path,
-            "Autor Dominante (Commits)": r.dominant_author_commits,
-            "Autor Dominante (Linhas)": r.dominant_author_lines,
-            "Dominância (Commits)": round(r.commits_dominance * 100, 2),
-            "Dominância (Linhas)": round(r.lines_dominance * 100, 2),
-            "Total Commits": r.total_commits,
-            "Total Linhas": r.total_lines_changed,
-            "Autores": ", ".join(r.all_authors)
-        } for r in results]
-
-        df = pd.DataFrame(data)
-
-        fig1_data = df["Autor Dominante (Commits)"].value_counts().reset_index()
-        fig1_data.columns = ["Autor", "Arquivos em Risco"]
-
-        fig1 = px.bar(
-            fig1_data,
-            x="Autor",
-            y="Arquivos em Risco",
-            title="Arquivos em risco por autor dominante (Commits)",
-            color="Autor",
-            text="Arquivos em Risco"
-        )
-        fig1.update_traces(textposition="outside")
-        fig1.update_layout(width=1100, height=600, font=dict(size=13))
-
-        dominance_avg = (
-            df.groupby("Autor Dominante (Commits)")[["Dominância (Commits)", "Dominância (Linhas)"]]
-            .mean()
-            .reset_index()
-            .rename(columns={"Autor Dominante (Commits)": "Autor"})
-        )
-
-        fig2 = px.bar(
-            dominance_avg.melt(id_vars="Autor", var_name="Tipo", value_name="Média (%)"),
-            x="Autor",
-            y="Média (%)",
-            color="Tipo",
-            barmode="group",
-            title="Média de Dominância por Autor"
-        )
-        fig2.update_layout(width=1100, height=600, font=dict(size=13))
-
-        top_authors = fig1_data.head(5)
-        fig3 = px.pie(
-            top_authors,
-            names="Autor",
-            values="Arquivos em Risco",
-            title="Top 5 Autores Dominantes (por número de arquivos)"
-        )
-        fig3.update_layout(width=1100, height=600, font=dict(size=13))
-
-    
-        fig4 = px.histogram(
-            df[df["Total Commits"] > 1],
-            x="Dominância (Commits)",
-            nbins=20,  
-            range_x=[0, 105],  
-            title="Distribuição de Dominância (Commits) em arquivos com mais de 1 commit",
-            color_discrete_sequence=["#073769"]
-        )
-        fig4.update_layout(
-            width=1100,  
-            height=500,  
-            font=dict(size=12),
-            xaxis_title="Dominância (Commits)",
-            yaxis_title="Quantidade de Arquivos"
-        )
-
-
-
-        html_content = f"""
-        <html>
-         <head>
-            <meta charset="utf-8">
-            <title>Relatório Bus Factor</title>
-            <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css">
-            <style>
-                body {{ font-size: 14px; }}
-                h3 {{ margins-top: 40px; font-size: 20px; }}
-                .small-table {{
-                    font-size: 12px;
-                    width: 95%;
-                    margin: auto;
-                }}
-                .small-table th, .small-table td {{
-                    padding: 6px 8px;
-                    text-align: left;
-                }}
-                .container {{
-                    max-width: 1200px;
-                }}
-            </style>
-        </head>
-        <body class="bg-light">
-            <div class="container mt-4">
-                <h1 class="mb-4 text-center">Relatório de Análise de Bus Factor</h1>
-                <p>Foram encontrados <b>{len(df)}</b> arquivos de risco.</p>
-
-                <h3>Arquivos em risco por autor</h3>
-                <p>Este gráfico mostra quantos arquivos estão sob o domínio de cada autor,
-                considerando o autor dominante baseado no número de commits.</p>
-                {fig1.to_html(full_html=False, include_plotlyjs='cdn')}
-                <p></p>
-
-                <h3>Dispersão de dominância</h3>
-                <p>Este gráfico mostra o quanto cada autor domina, em média, 
-                os arquivos em que ele aparece como o autor dominante, 
-                sob duas perspectivas diferentes:</p>
-                <p>• <b>Dominância por Commits:</b> Percentual de commits feitos por esse autor em relação ao total de commits dos outros autores nos arquivos em que ele é dominante.</p>
-                <p>• <b>Dominância por Linhas:</b> Percentual de linhas modificadas (adições/remoções) por esse autor em seus arquivos.</p>
-                {fig2.to_html(full_html=False, include_plotlyjs=False)}
-                <p></p>
-
-                <h3>Distribuição de dominância (Commits)</h3>
-                <p>Este histograma mostra como a dominância por commits está distribuída entre os arquivos 
-                que possuem mais de um commit. Cada barra representa quantos arquivos têm um determinado nível de dominância, ou seja, 
-                a porcentagem de commits feitos pelo autor principal.</p>
-                <p>Valores próximos de 100% indicam arquivos praticamente controlados por um único autor, 
-                enquanto valores intermediários (40 a 60%) sugerem colaboração maior entre desenvolvedores.</p>
-                <p>Uma concentração alta em 100% pode indicar alto risco de bus factor, pois poucos autores 
-                detêm conhecimento sobre muitos arquivos.</p>
-                {fig4.to_html(full_html=False, include_plotlyjs=False)}
-                <p></p>
-
-                <h3>Top 5 autores dominantes</h3>
-                <p>Este gráfico exibe os 5 autores que dominam o maior número de arquivos em risco
-                e a divisão da quantidade entre eles.</p>
-                {fig3.to_html(full_html=False, include_plotlyjs=False)}
-                <p></p>
-
-                <h3>Tabela de Arquivos de Risco</h3>
-                <p>A tabela abaixo lista todos os arquivos identificados como de risco,
-                juntamente com suas métricas associadas.</p>
-                {df.to_html(classes="table table-striped table-bordered small-table", index=False)}
-            </div>
-        </body>
-        </html>
-        """
-
-        Path(output_path).write_text(html_content, encoding="utf-8")
+        summary = _ReportSummary()
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(_HEAD)
+            f.write('<script type="application/json" id="bf-rows">[')
+            f.write(_to_json(summary.add(first)))
+            for result in results:
+                f.write(",")
+                f.write(_to_json(summary.add(result)))
+            f.write("]</script>\n")
+            self._write_footer(f, summary, [window.days for window in first.windows])
+
         print(f"Relatório HTML gerado com sucesso: {output_path}")
         print(f"Abra o arquivo no navegador: file://{Path(output_path).resolve()}")
+
+    @staticmethod
+    def _write_footer(f: IO[str], summary: _ReportSummary, windows: List[int]):
+        meta = {
+            "columns": COLUMNS + [f"Dominância {days}d (Commits)" for days in windows],
+            "names": summary.names,
+            "files": summary.files,
+            "pageSize": PAGE_SIZE,
+            "figures": summary.figures(),
+        }
+        f.write(f'<script type="application/json" id="bf-meta">{_to_json(meta)}</script>\n')
+        f.write(_SCRIPT)
+
+
+_HEAD = """<html>
+<head>
+    <meta charset="utf-8">
+    <title>Relatório Bus Factor</title>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css">
+    <script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+    <style>
+        body { font-size: 14px; }
+        h3 { margin-top: 40px; font-size: 20px; }
+        .small-table { font-size: 12px; width: 95%; margin: auto; }
+        .small-table th, .small-table td { padding: 6px 8px; text-align: left; }
+        .container { max-width: 1200px; }
+    </style>
+</head>
+<body class="bg-light">
+    <div class="container mt-4">
+        <h1 class="mb-4 text-center">Relatório de Análise de Bus Factor</h1>
+        <p>Foram encontrados <b id="bf-count"></b> arquivos de risco.</p>
+
+        <h3>Arquivos em risco por autor</h3>
+        <p>Este gráfico mostra quantos arquivos estão sob o domínio de cada autor,
+        considerando o autor dominante baseado no número de commits.</p>
+        <div id="fig-authors"></div>
+
+        <h3>Dispersão de dominância</h3>
+        <p>Este gráfico mostra o quanto cada autor domina, em média,
+        os arquivos em que ele aparece como o autor dominante,
+        sob duas perspectivas diferentes:</p>
+        <p>• <b>Dominância por Commits:</b> Percentual de commits feitos por esse autor em relação ao total de commits dos outros autores nos arquivos em que ele é dominante.</p>
+        <p>• <b>Dominância por Linhas:</b> Percentual de linhas modificadas (adições/remoções) por esse autor em seus arquivos.</p>
+        <div id="fig-dominance"></div>
+
+        <h3>Distribuição de dominância (Commits)</h3>
+        <p>Este histograma mostra como a dominância por commits está distribuída entre os arquivos
+        que possuem mais de um commit. Cada barra representa quantos arquivos têm um determinado nível de dominância, ou seja,
+        a porcentagem de commits feitos pelo autor principal.</p>
+        <p>Valores próximos de 100% indicam arquivos praticamente controlados por um único autor,
+        enquanto valores intermediários (40 a 60%) sugerem colaboração maior entre desenvolvedores.</p>
+        <p>Uma concentração alta em 100% pode indicar alto risco de bus factor, pois poucos autores
+        detêm conhecimento sobre muitos arquivos.</p>
+        <div id="fig-histogram"></div>
+
+        <h3>Top 5 autores dominantes</h3>
+        <p>Este gráfico exibe os 5 autores que dominam o maior número de arquivos em risco
+        e a divisão da quantidade entre eles.</p>
+        <div id="fig-top"></div>
+
+        <h3>Tabela de Arquivos de Risco</h3>
+        <p>A tabela abaixo lista todos os arquivos identificados como de risco,
+        juntamente com suas métricas associadas.</p>
+        <div class="d-flex gap-2 mb-2 align-items-center">
+            <input id="bf-filter" class="form-control form-control-sm" placeholder="Filtrar por arquivo ou autor">
+            <button id="bf-prev" class="btn btn-sm btn-outline-secondary">&laquo;</button>
+            <span id="bf-page" class="text-nowrap"></span>
+            <button id="bf-next" class="btn btn-sm btn-outline-secondary">&raquo;</button>
+        </div>
+        <table class="table table-striped table-bordered small-table">
+            <thead><tr id="bf-header"></tr></thead>
+            <tbody id="bf-body"></tbody>
+        </table>
+    </div>
+"""
+
+_SCRIPT = """<script>
+(function () {
+    var rows = JSON.parse(document.getElementById("bf-rows").textContent);
+    var meta = JSON.parse(document.getElementById("bf-meta").textContent);
+    var names = meta.names;
+    var visible = rows;
+    var page = 0;
+
+    document.getElementById("bf-count").textContent = meta.files;
+    if (window.Plotly) {
+        meta.figures.forEach(function (fig) { Plotly.newPlot(fig.id, fig.data, fig.layout); });
+    }
+
+    var header = document.getElementById("bf-header");
+    meta.columns.forEach(function (column) {
+        var th = document.createElement("th");
+        th.textContent = column;
+        header.appendChild(th);
+    });
+
+    // Campos ausentes (null) aparecem como "-": linhas com --metric commits, janelas sem commits
+    function shown(value) { return value === null ? "-" : value; }
+
+    function cells(row) {
+        return [
+            names[row[0]], row[1], names[row[2]], row[3] === null ? null : names[row[3]],
+            row[4], row[5], row[6], row[7],
+            row[8].map(function (id) { return names[id]; }).join(", ")
+        ].concat(row.slice(9)).map(shown);
+    }
+
+    function render() {
+        var pages = Math.max(1, Math.ceil(visible.length / meta.pageSize));
+        page = Math.min(page, pages - 1);
+        var body = document.createElement("tbody");
+        body.id = "bf-body";
+        visible.slice(page * meta.pageSize, (page + 1) * meta.pageSize).forEach(function (row) {
+            var tr = document.createElement("tr");
+            cells(row).forEach(function (value) {
+                var td = document.createElement("td");
+                td.textContent = value;
+                tr.appendChild(td);
+            });
+            body.appendChild(tr);
+        });
+        document.getElementById("bf-body").replaceWith(body);
+        document.getElementById("bf-page").textContent =
+            (page + 1) + " / " + pages + " (" + visible.length + " arquivos)";
+    }
+
+    document.getElementById("bf-prev").onclick = function () { page = Math.max(0, page - 1); render(); };
+    document.getElementById("bf-next").onclick = function () { page += 1; render(); };
+    document.getElementById("bf-filter").oninput = function (event) {
+        var term = event.target.value.toLowerCase();
+        visible = !term ? rows : rows.filter(function (row) {
+            return cells(row).join(" ").toLowerCase().indexOf(term) !== -1;
+        });
+        page = 0;
+        render();
+    };
+    render();
+})();
+</script>
+</body>
+</html>
+"""
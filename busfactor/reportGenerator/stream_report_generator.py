@@ -0,0 +1,183 @@
+import csv
+import gzip
+import json
+import sys
+from dataclasses import asdict
+from typing import IO, Iterable, List, Optional
+
+from busfactor.models import RiskAnalysisResult
+
+REPORT_FIELDS = (
+    "repository",
+    "file_path",
+    "dominant_author_commits",
+    "dominant_author_lines",
+    "commits_dominance",
+    "lines_dominance",
+    "total_commits",
+    "total_lines_changed",
+    "all_authors",
+)
+# Colunas extras do CSV por janela numa análise multi-janela (sufixo `_<dias>d`)
+WINDOW_FIELDS = (
+    "dominant_author_commits",
+    "commits_dominance",
+    "lines_dominance",
+    "total_commits",
+    "at_risk",
+)
+STDOUT = "-"
+
+
+def open_output(output: Optional[str]) -> IO[str]:
+    """Abre o destino do relatório: stdout (None ou "-"), arquivo ou arquivo `.gz`."""
+    if output is None or output == STDOUT:
+        return sys.stdout
+    if output.endswith(".gz"):
+        return gzip.open(output, "wt", encoding="utf-8", newline="")
+    return open(output, "w", encoding="utf-8", newline="")
+
+
+class StreamReportWriter:
+    """Escreve cada resultado assim que é recebido, sem acumular a lista em memória."""
+
+    def __init__(self, output: Optional[str] = None, windows: Optional[List[int]] = None):
+        self.stream = open_output(output)
+        self.windows = windows or []
+        self.rows = 0
+
+    def write(self, result: RiskAnalysisResult):
+        self._write_row(result)
+        self.rows += 1
+
+    def write_all(self, results: Iterable[RiskAnalysisResult]) -> int:
+        for result in results:
+            self.write(result)
+        return self.rows
+
+    def close(self):
+        if self.stream is sys.stdout:
+            self.stream.flush()
+        else:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write_row(self, result: RiskAnalysisResult):
+        raise NotImplementedError
+
+
+def _json_row(result: RiskAnalysisResult) -> str:
+    row = {field: getattr(result, field) for field in REPORT_FIELDS}
+    if result.windows:
+        row["windows"] = [asdict(window) for window in result.windows]
+    return json.dumps(row, ensure_ascii=False)
+
+
+class JsonLinesReportWriter(StreamReportWriter):
+    """Um objeto JSON por linha (JSON Lines)."""
+
+    def _write_row(self, result: RiskAnalysisResult):
+        self.stream.write(_json_row(result))
+        self.stream.write("\n")
+
+
+class JsonReportWriter(StreamReportWriter):
+    """Um array JSON válido, escrito objeto a objeto (`[`, linhas separadas por vírgula, `]`)."""
+
+    def __init__(self, output: Optional[str] = None, windows: Optional[List[int]] = None):
+        super().__init__(output, windows)
+        self.stream.write("[")
+
+    def _write_row(self, result: RiskAnalysisResult):
+        self.stream.write(",\n" if self.rows else "\n")
+        self.stream.write(_json_row(result))
+
+    def close(self):
+        self.stream.write("\n]\n" if self.rows else "]\n")
+        super().close()
+
+
+class CsvReportWriter(StreamReportWriter):
+    """CSV com cabeçalho; `all_authors` vem separado por `;`."""
+
+    def __init__(self, output: Optional[str] = None, windows: Optional[List[int]] = None):
+        super().__init__(output, windows)
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(REPORT_FIELDS + tuple(
+            f"{field}_{days}d" for days in self.windows for field in WINDOW_FIELDS))
+
+    def _write_row(self, result: RiskAnalysisResult):
+        window_columns = [
+            getattr(window, field) for window in result.windows for field in WINDOW_FIELDS
+        ]
+        self.writer.writerow([
+            result.repository,
+            result.file_path,
+            result.dominant_author_commits,
+            result.dominant_author_lines,
+            result.commits_dominance,
+            result.lines_dominance,
+            result.total_commits,
+            result.total_lines_changed,
+            ";".join(result.all_authors),
+            *window_columns,
+        ])
+
+
+STREAM_WRITERS = {
+    "json": JsonReportWriter,
+    "jsonl": JsonLinesReportWriter,
+    "csv": CsvReportWriter,
+}
+
+
+def is_stream_format(format: str) -> bool:
+    return format in STREAM_WRITERS
+
+
+def open_report_stream(format: str, output: Optional[str] = None,
+                       windows: Optional[List[int]] = None) -> StreamReportWriter:
+    try:
+        writer_class = STREAM_WRITERS[format]
+    except KeyError:
+        raise ValueError(f"Formato não suportado: {format}")
+    return writer_class(output, windows)
+
+
+def write_cumulative_distribution(output: Optional[str], thresholds: Iterable[float], counts: Iterable[int]):
+    """CSV `threshold,risky_files`: arquivos em risco para cada limiar em que a contagem muda."""
+    stream = open_output(output)
+    try:
+        writer = csv.writer(stream)
+        writer.writerow(("threshold", "risky_files"))
+        writer.writerows(zip(thresholds, counts))
+    finally:
+        if stream is sys.stdout:
+            stream.flush()
+        else:
+            stream.close()
+
+
+def write_aggregates(output: Optional[str], format: str, rows: List[dict]):
+    """Agregados do `query --group-by` (ou linhas do `--touched-by`) em json (lista de objetos) ou csv."""
+    if format not in ("json", "csv"):
+        raise ValueError(f"Formato não suportado para agregados: {format}")
+    stream = open_output(output)
+    try:
+        if format == "json":
+            json.dump(rows, stream, ensure_ascii=False, indent=2)
+            stream.write("\n")
+        else:
+            writer = csv.DictWriter(stream, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+    finally:
+        if stream is sys.stdout:
+            stream.flush()
+        else:
+            stream.close()
@@ -0,0 +1,312 @@
+from array import array
+from typing import Dict, List
+
+import numpy as np
+
+from busfactor.models.data_models import FileAnalysis
+
+AUTHOR_ID_BITS = 32
+AUTHOR_ID_MASK = (1 << AUTHOR_ID_BITS) - 1
+# Eventos acumulados antes de compactar; cresce com 1/4 do número de pares
+FLUSH_EVENTS = 1 << 18
+
+
+class AggregationStore:
+    """Contadores de commits/linhas por arquivo e autor em formato compacto.
+
+    Autores e caminhos são internados em IDs inteiros. Cada modificação vira
+    um evento `(arquivo << 32 | autor, commits, linhas)` em arrays tipados;
+    de tempos em tempos os eventos são compactados (ordenados e somados por
+    par) em arrays NumPy no formato COO ordenado pela chave do par. O custo
+    de memória fica em ~32 bytes por par (arquivo, autor), sem objetos
+    Python por par, e nenhum `FileAnalysis` é criado durante a coleta.
+
+    Cada par guarda o índice do primeiro evento em que apareceu. Ao
+    materializar, arquivos e autores saem na ordem em que surgiram no
+    histórico, reproduzindo a ordem de inserção dos dicionários da versão
+    anterior (e, com ela, o desempate do `max()` em `_identify_risky_files`).
+
+    Renomeações (`rename_file`) fazem do novo caminho um alias da mesma
+    identidade: `file_ids` é um índice dos caminhos vivos sobre uma
+    union-find (`file_parents`), e cada modificação custa um `find` (O(α)).
+    O caminho antigo deixa de ser roteado para a identidade renomeada (um
+    arquivo criado depois nele é outra identidade) e fica só em
+    `renamed_from`, usado por `merge` para ligar faixas do histórico.
+    Quando dois arquivos que já tinham contadores passam a ser o mesmo
+    (renomeação sobre um caminho existente, ou ao mesclar faixas do
+    histórico), o ID mais novo é absorvido pelo mais antigo e seus pares
+    são somados no próximo `flush`. IDs absorvidos continuam existindo, mas
+    sem pares; `file_paths[id]` de uma identidade é sempre o caminho mais recente.
+    """
+
+    __slots__ = (
+        "author_ids", "author_names", "file_ids", "file_paths", "file_parents", "renamed_from",
+        "events", "commits", "filtered",
+        "_pending_unions",
+        "_event_keys", "_event_commits", "_event_lines", "_flushed_events",
+        "pair_keys", "pair_commits", "pair_lines", "pair_first_seen",
+    )
+
+    def __init__(self):
+        self.author_ids: Dict[str, int] = {}
+        self.author_names: List[str] = []
+        self.file_ids: Dict[str, int] = {}
+        self.file_paths: List[str] = []
+        self.file_parents = array("q")
+        # Primeira identidade renomeada a partir de cada caminho (só para `merge`)
+        self.renamed_from: Dict[str, int] = {}
+        self._pending_unions = False
+        self.events = 0
+        # Commits percorridos e modificações descartadas pelo filtro de caminhos
+        self.commits = 0
+        self.filtered = 0
+        self._event_keys = array("q")
+        self._event_commits = array("q")
+        self._event_lines = array("q")
+        self._flushed_events = 0
+        self.pair_keys = np.empty(0, dtype=np.int64)
+        self.pair_commits = np.empty(0, dtype=np.int64)
+        self.pair_lines = np.empty(0, dtype=np.int64)
+        self.pair_first_seen = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.file_paths)
+
+    def intern_author(self, author: str) -> int:
+        author_id = self.author_ids.get(author)
+        if author_id is None:
+            author_id = self.author_ids[author] = len(self.author_names)
+            self.author_names.append(author)
+        return author_id
+
+    def intern_file(self, file_path: str) -> int:
+        file_id = self.file_ids.get(file_path)
+        if file_id is None:
+            file_id = self.file_ids[file_path] = self._new_file(file_path)
+        elif self.file_parents[file_id] != file_id:
+            file_id = self.find(file_id)
+        return file_id
+
+    def _new_file(self, file_path: str) -> int:
+        file_id = len(self.file_paths)
+        self.file_paths.append(file_path)
+        self.file_parents.append(file_id)
+        return file_id
+
+    def find(self, file_id: int) -> int:
+        """Identidade atual do arquivo (raiz da union-find, com compressão por halving)."""
+        parents = self.file_parents
+        while parents[file_id] != file_id:
+            parents[file_id] = parents[parents[file_id]]
+            file_id = parents[file_id]
+        return file_id
+
+    def _union(self, first: int, second: int) -> int:
+        # O mais antigo (menor ID) continua sendo a identidade, preservando a ordem do histórico
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return first
+        root, absorbed = min(first, second), max(first, second)
+        self.file_parents[absorbed] = root
+        self._pending_unions = True
+        return root
+
+    def rename_file(self, old_path: str, new_path: str):
+        """Torna `new_path` um alias da identidade de `old_path`.
+
+        Um `old_path` ainda desconhecido (ex.: numa faixa posterior do
+        histórico) ganha uma identidade sem pares, para que `merge` ligue os
+        dois lados. Depois da renomeação, `old_path` fica livre.
+        """
+        if old_path == new_path:
+            return
+        file_id = self.intern_file(old_path)
+        new_id = self.file_ids.get(new_path)
+        if new_id is not None:
+            file_id = self._union(file_id, new_id)
+        del self.file_ids[old_path]
+        self.renamed_from.setdefault(old_path, file_id)
+        self.file_ids[new_path] = file_id
+        self.file_paths[file_id] = new_path
+
+    def _file_roots(self) -> np.ndarray:
+        # find() de todos os IDs de uma vez: salta ponteiros até estabilizar
+        roots = np.frombuffer(self.file_parents, dtype=np.int64).copy()
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                return roots
+            roots = jumped
+
+    def is_alias_root(self) -> np.ndarray:
+        """Máscara dos IDs que são identidades (não absorvidos por uma união)."""
+        return self._file_roots() == np.arange(len(self.file_paths), dtype=np.int64)
+
+    def add(self, file_path: str, author_id: int, lines: int, commits: int = 1):
+        self._event_keys.append((self.intern_file(file_path) << AUTHOR_ID_BITS) | author_id)
+        self._event_commits.append(commits)
+        self._event_lines.append(lines)
+        self.events += 1
+        if len(self._event_keys) >= max(FLUSH_EVENTS, len(self.pair_keys) >> 2):
+            self.flush()
+
+    def flush(self):
+        """Compacta os eventos pendentes nos arrays de pares."""
+        if self._event_keys:
+            self._flush_events()
+        if self._pending_unions:
+            self._apply_unions()
+
+    def _apply_unions(self):
+        # Pares de IDs absorvidos passam para a identidade e são somados
+        roots = self._file_roots()
+        self.file_parents = array("q", roots.tobytes())
+        self._pending_unions = False
+        files = self.pair_keys >> AUTHOR_ID_BITS
+        if not len(files) or np.array_equal(roots[files], files):
+            return
+        keys = (roots[files] << AUTHOR_ID_BITS) | (self.pair_keys & AUTHOR_ID_MASK)
+        commits, lines, first_seen = self.pair_commits, self.pair_lines, self.pair_first_seen
+        self.pair_keys = np.empty(0, dtype=np.int64)
+        self.pair_commits = np.empty(0, dtype=np.int64)
+        self.pair_lines = np.empty(0, dtype=np.int64)
+        self.pair_first_seen = np.empty(0, dtype=np.int64)
+        self._combine(keys, commits, lines, first_seen)
+
+    def _flush_events(self):
+        pending = len(self._event_keys)
+        first_seen = np.arange(self._flushed_events, self._flushed_events + pending, dtype=np.int64)
+        self._combine(
+            np.frombuffer(self._event_keys, dtype=np.int64),
+            np.frombuffer(self._event_commits, dtype=np.int64),
+            np.frombuffer(self._event_lines, dtype=np.int64),
+            first_seen,
+        )
+        self._flushed_events += pending
+        self._event_keys = array("q")
+        self._event_commits = array("q")
+        self._event_lines = array("q")
+
+    def _combine(self, keys, commits, lines, first_seen):
+        # Soma os novos eventos por par e os intercala nos pares já ordenados,
+        # sem reordenar o que já foi compactado (memória extra ~ um array de pares).
+        if not len(keys):
+            return
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        keys = keys[starts]
+        commits = np.add.reduceat(commits[order], starts)
+        lines = np.add.reduceat(lines[order], starts)
+        first_seen = np.minimum.reduceat(first_seen[order], starts)
+
+        positions = np.searchsorted(self.pair_keys, keys)
+        found = positions < len(self.pair_keys)
+        found[found] = self.pair_keys[positions[found]] == keys[found]
+
+        existing = positions[found]
+        self.pair_commits[existing] += commits[found]
+        self.pair_lines[existing] += lines[found]
+        np.minimum.at(self.pair_first_seen, existing, first_seen[found])
+
+        new = ~found
+        if new.any():
+            positions = positions[new]
+            self.pair_keys = np.insert(self.pair_keys, positions, keys[new])
+            self.pair_commits = np.insert(self.pair_commits, positions, commits[new])
+            self.pair_lines = np.insert(self.pair_lines, positions, lines[new])
+            self.pair_first_seen = np.insert(self.pair_first_seen, positions, first_seen[new])
+
+    def merge(self, other: "AggregationStore") -> "AggregationStore":
+        """Soma `other` neste store, remapeando seus IDs (in-place).
+
+        Os eventos de `other` são tratados como posteriores aos deste store,
+        então mesclar parciais na ordem do histórico equivale a uma única passada.
+        """
+        self.flush()
+        other.flush()
+
+        author_map = np.array([self.intern_author(name) for name in other.author_names], dtype=np.int64)
+        file_map = self._map_files(other)
+        other_files = other.pair_keys >> AUTHOR_ID_BITS
+        other_authors = other.pair_keys & AUTHOR_ID_MASK
+        keys = (file_map[other_files] << AUTHOR_ID_BITS) | author_map[other_authors] \
+            if len(other.pair_keys) else other.pair_keys.copy()
+
+        self._combine(keys, other.pair_commits, other.pair_lines, other.pair_first_seen + self._flushed_events)
+        self._flushed_events += other._flushed_events
+        self.events += other.events
+        self.commits += other.commits
+        self.filtered += other.filtered
+        self.flush()
+        return self
+
+    def _map_files(self, other: "AggregationStore") -> np.ndarray:
+        """ID neste store de cada identidade de `other`, juntando as que continuam o mesmo arquivo.
+
+        A identidade de `other` que continua um caminho vivo aqui é a
+        primeira que `other` teve nesse caminho: a renomeada a partir dele
+        (`renamed_from`), se houver, senão a que ainda está nele. As demais
+        identidades de `other` são novas aqui.
+        """
+        other_roots = other._file_roots()
+        file_map = np.full(len(other.file_paths), -1, dtype=np.int64)
+        for path, other_id in {**other.file_ids, **other.renamed_from}.items():
+            file_id = self.file_ids.get(path)
+            if file_id is None:
+                continue
+            other_root = other_roots[other_id]
+            mapped = int(file_map[other_root])
+            file_map[other_root] = file_id if mapped < 0 else self._union(mapped, file_id)
+
+        other_identities = np.flatnonzero(other_roots == np.arange(len(other_roots))).tolist()
+        for other_root in other_identities:
+            if file_map[other_root] < 0:
+                file_map[other_root] = self._new_file(other.file_paths[other_root])
+
+        # Caminhos renomeados em `other` ficam livres aqui; os vivos lá passam a ser os daqui
+        for path, other_id in other.renamed_from.items():
+            self.file_ids.pop(path, None)
+            self.renamed_from.setdefault(path, self.find(int(file_map[other_roots[other_id]])))
+        for path, other_id in other.file_ids.items():
+            self.file_ids[path] = self.find(int(file_map[other_roots[other_id]]))
+        for other_root in other_identities:
+            # O caminho mais recente é o de `other`, que vem depois no histórico
+            self.file_paths[self.find(int(file_map[other_root]))] = other.file_paths[other_root]
+        return np.array([self.find(int(file_id)) for file_id in file_map[other_roots]], dtype=np.int64)
+
+    def pairs_in_history_order(self):
+        """Arrays (arquivo, autor, commits, linhas) dos pares, na ordem em que surgiram."""
+        self.flush()
+        order = np.argsort(self.pair_first_seen, kind="stable")
+        keys = self.pair_keys[order]
+        return (
+            keys >> AUTHOR_ID_BITS,
+            keys & AUTHOR_ID_MASK,
+            self.pair_commits[order],
+            self.pair_lines[order],
+        )
+
+    def to_file_analyses(self, repository: str) -> List[FileAnalysis]:
+        files, authors, commits, lines = self.pairs_in_history_order()
+        commits_by_file: List[Dict[str, int]] = [{} for _ in self.file_paths]
+        lines_by_file: List[Dict[str, int]] = [{} for _ in self.file_paths]
+        author_names = self.author_names
+
+        for file_id, author_id, author_commits, author_lines in zip(
+                files.tolist(), authors.tolist(), commits.tolist(), lines.tolist()):
+            author = author_names[author_id]
+            commits_by_file[file_id][author] = author_commits
+            lines_by_file[file_id][author] = author_lines
+
+        return [
+            FileAnalysis(
+                file_path=self.file_paths[file_id],
+                repository=repository,
+                total_commits=sum(commits_by_file[file_id].values()),
+                total_lines_changed=sum(lines_by_file[file_id].values()),
+                commits_by_author=commits_by_file[file_id],
+                lines_by_author=lines_by_file[file_id]
+            )
+            for file_id in np.flatnonzero(self.is_alias_root()).tolist()
+        ]
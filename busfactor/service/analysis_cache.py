@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from busfactor.models.data_models import CommitRecord, FileAnalysis
+
+CACHE_VERSION = 3
+SECONDS_PER_DAY = 86400
+
+
+def day_of(timestamp: int) -> int:
+    return timestamp // SECONDS_PER_DAY
+
+
+class CachedHistory:
+    """Agregados por arquivo/autor em buckets diários, sem filtro de caminho.
+
+    Os contadores ficam em `files[path][author][day] = [commits, linhas]`.
+    Como nenhum filtro é aplicado na coleta, o mesmo estado atende qualquer
+    combinação de --include/--exclude e qualquer janela que comece em
+    `since_day` ou depois dele. A ordem de inserção dos dicionários é a
+    ordem em que arquivos e autores aparecem no histórico, o que preserva o
+    desempate do `max()` em `_identify_risky_files`.
+
+    Com `follow_renames`, um arquivo renomeado continua sob a chave do
+    primeiro caminho em que apareceu: `aliases` leva cada caminho vivo
+    envolvido numa renomeação até essa chave e `paths` guarda o caminho
+    atual dela. O caminho antigo passa a apontar para uma chave nova
+    (`caminho\0n`), então um arquivo criado depois nele não herda o
+    histórico do renomeado.
+
+    `line_stats` indica se todos os commits vieram com linhas alteradas;
+    commits lidos com --metric commits deixam as linhas zeradas.
+    """
+
+    def __init__(self, repository: str, since_day: int, head: Optional[str] = None,
+                 files: Optional[Dict[str, Dict[str, Dict[int, List[int]]]]] = None,
+                 follow_renames: bool = True, aliases: Optional[Dict[str, str]] = None,
+                 paths: Optional[Dict[str, str]] = None, line_stats: bool = True):
+        self.repository = repository
+        self.since_day = since_day
+        self.head = head
+        self.files = files if files is not None else {}
+        self.follow_renames = follow_renames
+        self.aliases = aliases if aliases is not None else {}
+        self.paths = paths if paths is not None else {}
+        self.line_stats = line_stats
+
+    def add_commit(self, commit: CommitRecord):
+        day = day_of(commit.timestamp)
+        for modification in commit.modifications:
+            file_path = modification.path
+            if not file_path:
+                continue
+            if self.follow_renames and modification.old_path and modification.old_path != file_path:
+                self._rename(modification.old_path, file_path)
+
+            key = self.aliases.get(file_path, file_path)
+            buckets = self.files.setdefault(key, {}).setdefault(commit.author, {})
+            counters = buckets.get(day)
+            if counters is None:
+                counters = buckets[day] = [0, 0]
+            counters[0] += 1
+            counters[1] += modification.added_lines + modification.deleted_lines
+
+    def _rename(self, old_path: str, new_path: str):
+        key = self.aliases.get(old_path, old_path)
+        other = self.aliases.get(new_path, new_path)
+        if other != key and other in self.files:
+            if key in self.files:
+                self._absorb(key, other)
+            else:
+                key = other
+        self.aliases[new_path] = key
+        self.paths[key] = new_path
+        # O caminho antigo fica livre: um arquivo criado depois nele é outra identidade
+        fresh = self._fresh_key(old_path)
+        self.aliases[old_path] = fresh
+        self.paths[fresh] = old_path
+
+    def _fresh_key(self, path: str) -> str:
+        # "\0" não aparece em caminhos do git, então a chave não colide com um caminho real
+        n = 1
+        while f"{path}\0{n}" in self.paths:
+            n += 1
+        return f"{path}\0{n}"
+
+    def _absorb(self, key: str, other: str):
+        # Renomeação sobre um caminho que já tinha histórico: os contadores são somados
+        authors = self.files[key]
+        for author, buckets in self.files.pop(other).items():
+            target = authors.setdefault(author, {})
+            for day, (commits, lines) in buckets.items():
+                counters = target.setdefault(day, [0, 0])
+                counters[0] += commits
+                counters[1] += lines
+        self.paths.pop(other, None)
+        for alias, alias_key in self.aliases.items():
+            if alias_key == other:
+                self.aliases[alias] = key
+
+    def iter_files(self):
+        """Pares (caminho atual, contadores por autor) na ordem do histórico."""
+        paths = self.paths
+        for key, authors in self.files.items():
+            yield paths.get(key, key), authors
+
+    def to_file_analyses(self, include_file: Callable[[str], bool], since_day: int) -> List[FileAnalysis]:
+        analyses = []
+        for file_path, authors in self.iter_files():
+            if not include_file(file_path):
+                continue
+
+            commits_by_author: Dict[str, int] = {}
+            lines_by_author: Dict[str, int] = {}
+            for author, buckets in authors.items():
+                commits = lines = 0
+                for day, (day_commits, day_lines) in buckets.items():
+                    if day >= since_day:
+                        commits += day_commits
+                        lines += day_lines
+                if commits:
+                    commits_by_author[author] = commits
+                    lines_by_author[author] = lines
+
+            if commits_by_author:
+                analyses.append(FileAnalysis(
+                    file_path=file_path,
+                    repository=self.repository,
+                    total_commits=sum(commits_by_author.values()),
+                    total_lines_changed=sum(lines_by_author.values()),
+                    commits_by_author=commits_by_author,
+                    lines_by_author=lines_by_author
+                ))
+        return analyses
+
+    def to_dict(self) -> dict:
+        return {
+            "version": CACHE_VERSION,
+            "repository": self.repository,
+            "head": self.head,
+            "since_day": self.since_day,
+            "follow_renames": self.follow_renames,
+            "line_stats": self.line_stats,
+            "aliases": self.aliases,
+            "paths": self.paths,
+            "files": {
+                file_path: {
+                    author: [[day, commits, lines] for day, (commits, lines) in buckets.items()]
+                    for author, buckets in authors.items()
+                }
+                for file_path, authors in self.files.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CachedHistory":
+        return cls(
+            repository=data["repository"],
+            since_day=data["since_day"],
+            head=data["head"],
+            follow_renames=data["follow_renames"],
+            aliases=data["aliases"],
+            paths=data["paths"],
+            line_stats=data.get("line_stats", True),
+            files={
+                file_path: {
+                    author: {day: [commits, lines] for day, commits, lines in buckets}
+                    for author, buckets in authors.items()
+                }
+                for file_path, authors in data["files"].items()
+            },
+        )
+
+
+class AnalysisCache:
+    """Cache em disco de `CachedHistory`, um arquivo JSON por repositório."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+
+    def path_for(self, repo_identifier: str) -> Path:
+        key = hashlib.sha1(repo_identifier.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def load(self, repo_identifier: str) -> Optional[CachedHistory]:
+        path = self.path_for(repo_identifier)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != CACHE_VERSION or data.get("repository") != repo_identifier:
+            return None
+        return CachedHistory.from_dict(data)
+
+    def save(self, history: CachedHistory):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(history.repository)
+
+        # Escrita atômica: um processo interrompido não deixa cache corrompido
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(history.to_dict(), f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from busfactor.service.aggregation import AUTHOR_ID_BITS, AUTHOR_ID_MASK
+from busfactor.service.history_backend import list_blobs, list_root_commits
+from busfactor.service.metrics import MetricsRecorder
+from busfactor.service.mirror_cache import FileLock
+
+BLAME_CACHE_VERSION = 1
+OWNERSHIP_MODES = ("history", "blame")
+
+# Linhas sobreviventes por autor de cada arquivo: {caminho: {autor: linhas}}
+SurvivingLines = Dict[str, Dict[str, int]]
+
+
+def lineage_of(repo_path: str) -> str:
+    """Identifica a linhagem do repositório pelos commits raiz (iguais em forks e mirrors)."""
+    return hashlib.sha1(" ".join(list_root_commits(repo_path)).encode("ascii")).hexdigest()
+
+
+def parse_blame_porcelain(output: str) -> Dict[str, int]:
+    """Linhas por autor a partir da saída de `git blame --porcelain`.
+
+    O cabeçalho de um commit (com `author`) só aparece na primeira vez em
+    que ele surge; as linhas seguintes do mesmo commit trazem apenas o SHA.
+    Os autores ficam na ordem da primeira linha atribuída a cada um.
+    """
+    author_of: Dict[str, str] = {}
+    lines_by_author: Dict[str, int] = {}
+    sha = None
+    for line in output.split("\n"):
+        if line.startswith("\t"):
+            author = author_of[sha]
+            lines_by_author[author] = lines_by_author.get(author, 0) + 1
+        elif line.startswith("author "):
+            author_of[sha] = line[7:]
+        else:
+            fields = line.split(" ")
+            if len(fields) in (3, 4) and len(fields[0]) >= 40:
+                sha = fields[0]
+    return lines_by_author
+
+
+def blame_file(repo_path: str, path: str) -> Dict[str, int]:
+    result = subprocess.run(
+        ["git", "-C", repo_path, "blame", "--porcelain", "HEAD", "--", path],
+        check=True,
+        capture_output=True,
+        text=True,
+        errors="replace",
+    )
+    return parse_blame_porcelain(result.stdout)
+
+
+class BlameCache:
+    """Resultados de blame em disco, indexados por (SHA do blob, caminho).
+
+    Um blob que não mudou no mesmo caminho tem o mesmo blame em qualquer
+    HEAD posterior, então o resultado vale entre execuções. Há um arquivo
+    JSON por linhagem (commits raiz): forks e mirrors do mesmo projeto
+    compartilham as entradas, e repositórios sem relação não se misturam
+    mesmo com arquivos idênticos (ex.: LICENSE).
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+
+    def path_for(self, lineage: str) -> Path:
+        return self.cache_dir / f"{lineage}.json"
+
+    @staticmethod
+    def key(blob: str, path: str) -> str:
+        return f"{blob} {path}"
+
+    def load(self, lineage: str) -> Dict[str, Dict[str, int]]:
+        try:
+            data = json.loads(self.path_for(lineage).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != BLAME_CACHE_VERSION:
+            return {}
+        return data["entries"]
+
+    def save(self, lineage: str, entries: Dict[str, Dict[str, int]]):
+        """Acrescenta `entries` ao arquivo da linhagem (outros processos podem estar gravando)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(lineage)
+        with FileLock(str(path) + ".lock"):
+            merged = self.load(lineage)
+            merged.update(entries)
+            # Escrita atômica: um processo interrompido não deixa cache corrompido
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"version": BLAME_CACHE_VERSION, "entries": merged}, f, separators=(",", ":"))
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+
+class BlameOwnership:
+    """Linhas sobreviventes por autor no HEAD (`--ownership blame`).
+
+    Só os arquivos ainda não vistos (blob + caminho) passam pelo `git blame`,
+    um processo por arquivo distribuído num pool de threads (o trabalho
+    pesado fica no git, fora do GIL).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, jobs: Optional[int] = None):
+        self.cache = BlameCache(cache_dir) if cache_dir else None
+        self.jobs = jobs
+
+    def surviving_lines(self, repo_path: str, paths: Iterable[str],
+                        metrics: Optional[MetricsRecorder] = None) -> SurvivingLines:
+        blobs = list_blobs(repo_path)
+        wanted = [(path, blobs[path]) for path in dict.fromkeys(paths) if path in blobs]
+        lineage = lineage_of(repo_path) if self.cache is not None else None
+        cached = self.cache.load(lineage) if self.cache is not None else {}
+
+        surviving: SurvivingLines = {}
+        missing: List[Tuple[str, str]] = []
+        for path, blob in wanted:
+            entry = cached.get(BlameCache.key(blob, path))
+            if entry is None:
+                missing.append((path, blob))
+            else:
+                surviving[path] = entry
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                blamed = list(pool.map(lambda item: blame_file(repo_path, item[0]), missing))
+            for (path, _), lines_by_author in zip(missing, blamed):
+                surviving[path] = lines_by_author
+            if self.cache is not None:
+                self.cache.save(lineage, {
+                    BlameCache.key(blob, path): lines_by_author
+                    for (path, blob), lines_by_author in zip(missing, blamed)
+                })
+
+        if metrics is not None:
+            metrics.count("blame_files", len(missing))
+            metrics.count("blame_cache_hits", len(wanted) - len(missing))
+        return surviving
+
+
+def with_surviving_lines(pair_sets: List[Tuple[np.ndarray, ...]], file_paths: List[str],
+                         author_names: List[str], surviving: SurvivingLines
+                         ) -> Tuple[List[Tuple[np.ndarray, ...]], List[str]]:
+    """Troca as linhas alteradas dos pares (arquivo, autor, commits, linhas) pelas linhas sobreviventes.
+
+    Os commits continuam vindo do histórico; autores que só aparecem no
+    blame entram com zero commits, depois dos pares do histórico (que
+    mantêm a ordem e o desempate). Cada conjunto de pares (um por janela)
+    só recebe linhas dos arquivos que já tem. Devolve os pares novos e a
+    lista de autores, estendida com os que só aparecem no blame.
+    """
+    author_ids = {name: author_id for author_id, name in enumerate(author_names)}
+    names = list(author_names)
+    blame_files, blame_authors, blame_lines = [], [], []
+    present = np.unique(pair_sets[-1][0]).tolist() if pair_sets else []
+    for file_id in present:
+        for author, lines in surviving.get(file_paths[file_id], {}).items():
+            author_id = author_ids.get(author)
+            if author_id is None:
+                author_id = author_ids[author] = len(names)
+                names.append(author)
+            blame_files.append(file_id)
+            blame_authors.append(author_id)
+            blame_lines.append(lines)
+
+    blame_keys = (np.array(blame_files, dtype=np.int64) << AUTHOR_ID_BITS) | np.array(blame_authors, dtype=np.int64)
+    blame_lines = np.array(blame_lines, dtype=np.int64)
+
+    result = []
+    for files, authors, commits, _ in pair_sets:
+        in_set = np.isin(blame_keys >> AUTHOR_ID_BITS, files)
+        keys = np.concatenate(((files << AUTHOR_ID_BITS) | authors, blame_keys[in_set]))
+        unique_keys, first_seen, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        n_history = len(files)
+        summed_commits = np.bincount(inverse[:n_history], weights=commits, minlength=len(unique_keys))
+        summed_lines = np.bincount(inverse[n_history:], weights=blame_lines[in_set], minlength=len(unique_keys))
+        order = np.argsort(first_seen, kind="stable")
+        unique_keys = unique_keys[order]
+        result.append((
+            unique_keys >> AUTHOR_ID_BITS,
+            unique_keys & AUTHOR_ID_MASK,
+            summed_commits[order].astype(np.int64),
+            summed_lines[order].astype(np.int64),
+        ))
+    return result, names
@@ -1,121 +1,486 @@
 import json
+import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from fnmatch import fnmatch
-from pydriller import Repository
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
 
 from busfactor.models.data_models import *
+from busfactor.service.aggregation import AggregationStore
+from busfactor.service.blame_ownership import OWNERSHIP_MODES, BlameOwnership, SurvivingLines, with_surviving_lines
+from busfactor.service.dominance import DominanceTable, authors_by_file
+from busfactor.service.dominance_index import DominanceIndex, DominanceIndexStore
+from busfactor.service.analysis_cache import SECONDS_PER_DAY, AnalysisCache, CachedHistory, day_of
+from busfactor.service.history_backend import (
+    HistoryBackend,
+    get_history_backend,
+    is_ancestor,
+    list_revisions,
+    resolve_head,
+)
+from busfactor.service.metrics import MetricsRecorder
+from busfactor.service.path_filter import PathFilter, to_pathspecs
+from busfactor.service.path_rollup import PathTrie
+from busfactor.service.result_store import ResultStore
+from busfactor.service.sharded_analysis import collect_sharded_aggregates, split_into_shards
+from busfactor.service.spill_aggregation import SpillingAggregationStore
+from busfactor.service.time_windows import AUTHOR_MASK, BUCKET_SHIFT, TimeWindows, window_pairs
+from busfactor.service.truck_factor import truck_factor, truck_factor_from_analyses
+
+METRICS = ("all", "commits")
 
 
 class BusFactorAnalyzer:
-    def __init__(self, config: AnalysisConfig):
+    def __init__(self, config: AnalysisConfig, history_backend: HistoryBackend = None,
+                 metrics: MetricsRecorder = None):
         self.config = config
-        self.since_date = datetime.now() - timedelta(days=config.days)
+        self.metrics = metrics or MetricsRecorder()
+        now = datetime.now()
+        self.since_date = now - timedelta(days=config.days)
+        self.windows = TimeWindows(config.windows, now) if config.windows and len(config.windows) > 1 else None
+        if config.metric not in METRICS:
+            raise ValueError(f"Métrica não suportada: {config.metric}")
+        self.history_backend = history_backend or get_history_backend(
+            config.backend, line_stats=config.needs_line_stats)
+        self.cache = AnalysisCache(config.cache_dir) if config.cache_dir else None
+        self.index_store = DominanceIndexStore(config.index_dir) if config.index_dir else None
+        if config.ownership not in OWNERSHIP_MODES:
+            raise ValueError(f"Modo de autoria não suportado: {config.ownership}")
+        # Com --ownership blame, o blame de cada blob fica salvo junto do cache de histórico
+        self.blame = BlameOwnership(
+            os.path.join(config.cache_dir, "blame") if config.cache_dir else None, config.blame_jobs
+        ) if config.ownership == "blame" else None
+        # Com --metric commits (e sem blame) os campos de linhas saem como None
+        self.reports_lines = config.needs_line_stats or self.blame is not None
+        # Truck factor por repositório analisado (com config.truck_factor)
+        self.truck_factors: Dict[str, TruckFactorResult] = {}
+        # Pares (arquivo, autor) da última análise, salvos no --results-db junto dos resultados
+        self._counters: Optional[Tuple[Tuple[np.ndarray, ...], List[str], List[str]]] = None
+        self.path_filter = PathFilter(config.include_patterns, config.exclude_patterns,
+                                      semantics=config.glob_semantics)
+        self.pathspecs = (
+            to_pathspecs(config.include_patterns, config.exclude_patterns, config.glob_semantics)
+            if config.pathspec_pushdown else None
+        )
 
     def should_include_file(self, file_path: str) -> bool:
-        # Primeiro verifica se está na lista de exclusão
-        for pattern in self.config.exclude_patterns:
-            if fnmatch(file_path, pattern):
-                return False
+        # Exclusão tem precedência; semântica dos globs (fnmatch ou git) documentada em path_filter
+        return self.path_filter.matches(file_path)
+
+    def analyze_repository(self, repo_path: str, repo_identifier: str = "repo_identifier") -> List[RiskAnalysisResult]:
+        try:
+            with self.metrics.repository(repo_identifier):
+                self._counters = None
+                risky_files = self._analyze(repo_path, repo_identifier)
+                self.metrics.count("risky_files", len(risky_files))
+                self._save_results(repo_identifier, risky_files)
+                self.metrics.set_peak_rss()
+                return risky_files
+
+        except Exception as e:
+            raise Exception(f"Erro ao analisar repositório {repo_identifier}: {str(e)}")
 
-        # Depois verifica se está na lista de inclusão
-        for pattern in self.config.include_patterns:
-            if fnmatch(file_path, pattern):
-                return True
+    def _analyze(self, repo_path: str, repo_identifier: str) -> List[RiskAnalysisResult]:
+        metrics = self.metrics
 
-        return False
+        if self.cache is not None and self.windows is not None:
+            with metrics.stage("traverse"):
+                history, _ = self._update_cached_history(repo_path, repo_identifier)
+                aggregates = self._cached_window_aggregates(history)
+            metrics.count("files_tracked", len(aggregates))
+            surviving = self._surviving_lines(repo_path, aggregates.file_paths)
+            with metrics.stage("dominance"):
+                return self._identify_risky_windows(aggregates, repo_identifier, surviving)
+
+        if self.cache is not None:
+            with metrics.stage("traverse"):
+                file_analyses = self._collect_cached_file_analyses(repo_path, repo_identifier)
+            metrics.count("files_tracked", len(file_analyses))
+            surviving = self._surviving_lines(repo_path, [analysis.file_path for analysis in file_analyses])
+            with metrics.stage("dominance"):
+                return self._identify_risky_files(file_analyses, repo_identifier, surviving)
+
+        with metrics.stage("traverse"):
+            # Com --max-memory os pares vão para o disco, então não há faixas paralelas para mesclar
+            if self.config.shards > 1 and self.config.max_memory_mb is None:
+                aggregates = self._collect_sharded_aggregates(repo_path)
+            else:
+                aggregates = self.collect_aggregates(repo_path)
 
-    def analyze_repository(self, repo_path: str, repo_identifier: str = "repo_identifier") -> List[RiskAnalysisResult]:
-        file_stats: Dict[str, FileAnalysis] = {}
         try:
-            for commit in Repository(repo_path, since=self.since_date).traverse_commits():
-                for modification in commit.modified_files:
-                    file_path = modification.new_path or modification.old_path
+            with metrics.stage("aggregate"):
+                aggregates.flush()
+            metrics.count("commits", aggregates.commits)
+            metrics.count("modifications", aggregates.events)
+            metrics.count("modifications_filtered", aggregates.filtered)
+            metrics.count("files_tracked", len(aggregates))
+            metrics.count("authors_seen", len(aggregates.author_names))
+            surviving = self._surviving_lines(repo_path, aggregates.file_paths)
+
+            with metrics.stage("dominance"):
+                if self.windows is not None:
+                    return self._identify_risky_windows(aggregates, repo_identifier, surviving)
+                if isinstance(aggregates, SpillingAggregationStore) and not self._needs_pair_arrays(surviving):
+                    return self._identify_risky_spilled(aggregates, repo_identifier)
+                return self._identify_risky_aggregates(aggregates, repo_identifier, surviving)
+        finally:
+            if isinstance(aggregates, SpillingAggregationStore):
+                metrics.count("pairs_spilled", aggregates.spilled)
+                aggregates.close()
+
+    def _surviving_lines(self, repo_path: str, file_paths: List[str]) -> Optional[SurvivingLines]:
+        """Linhas sobreviventes por autor dos arquivos analisados (só com --ownership blame)."""
+        if self.blame is None:
+            return None
+        with self.metrics.stage("blame"):
+            return self.blame.surviving_lines(repo_path, file_paths, self.metrics)
+
+    def collect_aggregates(self, repo_path: str, commits: List[str] = None) -> AggregationStore:
+        if self.config.max_memory_mb is not None:
+            aggregates = SpillingAggregationStore(self.config.max_memory_mb * 1024 * 1024)
+        else:
+            aggregates = AggregationStore()
+        if commits is not None:
+            history = self.history_backend.iter_commits(repo_path, commits=commits, pathspecs=self.pathspecs)
+        else:
+            history = self.history_backend.iter_commits(repo_path, since=self.since_date, pathspecs=self.pathspecs)
+
+        include_file = self.path_filter.matches
+        add = aggregates.add
+        # Renomeações ligam o caminho novo à identidade do antigo (union-find no store)
+        rename_file = aggregates.rename_file if self.config.follow_renames else None
+        # Com várias janelas, o bucket de tempo do commit vai junto no ID do autor
+        bucket_of = self.windows.bucket_of if self.windows is not None else None
+        commits = filtered = 0
+        with self.metrics.profiling():
+            for commit in history:
+                commits += 1
+                author_id = None
+                for modification in commit.modifications:
+                    file_path = modification.path
 
                     if not file_path:
                         continue
 
-                    if not self.should_include_file(file_path):
+                    if not include_file(file_path):
+                        filtered += 1
                         continue
 
-                    if file_path not in file_stats:
-                        self.include_new_file_in_list(file_path, file_stats, repo_identifier)
+                    if rename_file is not None and modification.old_path and modification.old_path != file_path:
+                        rename_file(modification.old_path, file_path)
 
-                    file_stats[file_path].total_commits += 1
-                    lines_changed = modification.added_lines + modification.deleted_lines
-                    file_stats[file_path].total_lines_changed += lines_changed
+                    if author_id is None:
+                        author_id = aggregates.intern_author(commit.author)
+                        if bucket_of is not None:
+                            author_id |= bucket_of(commit.timestamp) << BUCKET_SHIFT
 
-                    author = commit.author.name
+                    add(file_path, author_id, modification.added_lines + modification.deleted_lines)
 
-                    if author not in file_stats[file_path].commits_by_author:
-                        self.add_new_author(author, file_path, file_stats)
+        aggregates.commits += commits
+        aggregates.filtered += filtered
+        return aggregates
 
-                    file_stats[file_path].commits_by_author[author] += 1
-                    file_stats[file_path].lines_by_author[author] += lines_changed
+    def _collect_sharded_aggregates(self, repo_path: str) -> AggregationStore:
+        commits = list_revisions(repo_path, since=self.since_date, pathspecs=self.pathspecs)
+        shards = split_into_shards(commits, self.config.shards)
 
-            return self._identify_risky_files(list(file_stats.values()))
+        if len(shards) == 1:
+            return self.collect_aggregates(repo_path, commits=commits)
 
-        except Exception as e:
-            raise Exception(f"Erro ao analisar repositório {repo_identifier}: {str(e)}")
+        return collect_sharded_aggregates(repo_path, self.config, shards)
 
-    def add_new_author(self, author: str | None, file_path, file_stats: dict[str, FileAnalysis]):
-        file_stats[file_path].commits_by_author[author] = 0
-        file_stats[file_path].lines_by_author[author] = 0
+    def _collect_cached_file_analyses(self, repo_path: str, repo_identifier: str) -> List[FileAnalysis]:
+        history, since_day = self._update_cached_history(repo_path, repo_identifier)
+        return history.to_file_analyses(self.should_include_file, since_day)
 
-    @staticmethod
-    def include_new_file_in_list(file_path, file_stats: dict[str, FileAnalysis], repo_identifier: str):
-        file_stats[file_path] = FileAnalysis(
-            file_path=file_path,
-            repository=repo_identifier,
-            total_commits=0,
-            total_lines_changed=0,
-            commits_by_author={},
-            lines_by_author={}
-        )
+    def _update_cached_history(self, repo_path: str, repo_identifier: str):
+        """Atualiza o cache incremental até o HEAD e devolve `(histórico, since_day)`."""
+        # A janela é arredondada para o início do dia (UTC) para casar com os buckets do cache
+        since_day = day_of(int(self.since_date.timestamp()))
+        head = resolve_head(repo_path)
+        history = self.cache.load(repo_identifier)
 
+        if (history is None
+                or history.follow_renames != self.config.follow_renames
+                or (self.config.needs_line_stats and not history.line_stats)
+                or history.since_day > since_day
+                or not is_ancestor(repo_path, history.head, head)):
+            # Sem cache, janela maior que a armazenada, outro modo de renomeação, cache sem as linhas
+            # necessárias ou histórico reescrito (force-push): recalcula tudo
+            history = CachedHistory(repo_identifier, since_day, follow_renames=self.config.follow_renames,
+                                    line_stats=self.config.needs_line_stats)
+            since = datetime.fromtimestamp(since_day * SECONDS_PER_DAY)
+            commits = self.history_backend.iter_commits(repo_path, since=since)
+        elif history.head != head:
+            commits = self.history_backend.iter_commits(repo_path, revision_range=f"{history.head}..{head}")
+        else:
+            commits = []
 
-    def _identify_risky_files(self, file_analyses: List[FileAnalysis]) -> List[RiskAnalysisResult]:
+        added = 0
+        with self.metrics.profiling():
+            for commit in commits:
+                history.add_commit(commit)
+                added += 1
+        if added and not self.config.needs_line_stats:
+            # Commits novos sem linhas: uma análise completa posterior refaz o cache
+            history.line_stats = False
+        # Só os commits novos são percorridos; o restante vem do cache
+        self.metrics.count("commits", added)
 
-        risky_files = []
+        if history.head != head:
+            history.head = head
+            self.cache.save(history)
 
-        for analysis in file_analyses:
-            if not analysis.commits_by_author:
+        return history, since_day
+
+    def _cached_window_aggregates(self, history: CachedHistory) -> AggregationStore:
+        """Converte os buckets diários do cache em pares por bucket de janela."""
+        aggregates = AggregationStore()
+        bucket_of_day = self.windows.bucket_of_day
+        outside = len(self.windows)
+        for file_path, authors in history.iter_files():
+            if not self.should_include_file(file_path):
                 continue
+            for author, days in authors.items():
+                author_id = aggregates.intern_author(author)
+                for day, (commits, lines) in days.items():
+                    bucket = bucket_of_day(day)
+                    if bucket < outside:
+                        aggregates.add(file_path, author_id | (bucket << BUCKET_SHIFT), lines, commits=commits)
+        return aggregates
+
+    def _identify_risky_files(self, file_analyses: List[FileAnalysis], repo_identifier: str = None,
+                              surviving: Optional[SurvivingLines] = None) -> List[RiskAnalysisResult]:
+        author_ids: Dict[str, int] = {}
+        author_names: List[str] = []
+        commit_pairs = ([], [], [])
+        line_pairs = ([], [], [])
+
+        def add_pairs(pairs, file_id, counts_by_author):
+            files, authors, values = pairs
+            for author, count in counts_by_author.items():
+                author_id = author_ids.get(author)
+                if author_id is None:
+                    author_id = author_ids[author] = len(author_names)
+                    author_names.append(author)
+                files.append(file_id)
+                authors.append(author_id)
+                values.append(count)
 
-            # Encontra autor dominante por commits
-            total_commits = analysis.total_commits
-            dominant_author_commits = max(
-                analysis.commits_by_author.items(),
-                key=lambda x: x[1]
+        for file_id, analysis in enumerate(file_analyses):
+            add_pairs(commit_pairs, file_id, analysis.commits_by_author)
+            add_pairs(line_pairs, file_id, analysis.lines_by_author)
+
+        if self.config.group_by_depth is not None or surviving is not None or self.config.results_db is not None:
+            # commits_by_author e lines_by_author têm as mesmas chaves, na mesma ordem
+            pairs = tuple(np.array(values, dtype=np.int64) for values in commit_pairs + line_pairs[2:])
+            return self._identify_risky_pairs(
+                pairs, [a.file_path for a in file_analyses], author_names,
+                repo_identifier or (file_analyses[0].repository if file_analyses else ""), surviving)
+        if self.config.truck_factor and repo_identifier is not None:
+            self.truck_factors[repo_identifier] = truck_factor_from_analyses(file_analyses, repo_identifier)
+
+        table = DominanceTable(
+            len(file_analyses),
+            tuple(np.array(values, dtype=np.int64) for values in commit_pairs),
+            tuple(np.array(values, dtype=np.int64) for values in line_pairs),
+            total_commits=np.array([a.total_commits for a in file_analyses], dtype=np.int64),
+            total_lines=np.array([a.total_lines_changed for a in file_analyses], dtype=np.int64),
+        )
+        if repo_identifier is not None:
+            self._save_index(repo_identifier, table, [a.file_path for a in file_analyses], author_names)
+
+        return [
+            self._build_risk_result(
+                table, file_id, author_names,
+                file_path=file_analyses[file_id].file_path,
+                repository=file_analyses[file_id].repository,
+                all_authors=list(file_analyses[file_id].commits_by_author.keys())
             )
-            dominant_author_commits_name, dominant_author_commits_count = dominant_author_commits
-            commits_dominance = dominant_author_commits_count / total_commits
+            for file_id in np.flatnonzero(table.risky_mask(self.config.dominance_threshold)).tolist()
+        ]
+
+    def _identify_risky_aggregates(self, aggregates: AggregationStore, repo_identifier: str,
+                                   surviving: Optional[SurvivingLines] = None) -> List[RiskAnalysisResult]:
+        """Mesmo critério de `_identify_risky_files`, direto dos arrays do AggregationStore.
 
-            total_lines = analysis.total_lines_changed
+        Só os arquivos acima do limiar viram objetos Python.
+        """
+        return self._identify_risky_pairs(
+            aggregates.pairs_in_history_order(), aggregates.file_paths, aggregates.author_names, repo_identifier,
+            surviving)
 
-            def get_commit_count(author_data):
-                _, commit_count = author_data
-                return commit_count
+    def _needs_pair_arrays(self, surviving: Optional[SurvivingLines]) -> bool:
+        # Rollup, truck factor, índice, blame e --results-db trabalham sobre os arrays de pares
+        return (self.config.group_by_depth is not None or self.config.truck_factor
+                or self.index_store is not None or surviving is not None or self.config.results_db is not None)
 
-            dominant_author_lines = max(
-                analysis.lines_by_author.items(),
-                key=get_commit_count
+    def _identify_risky_spilled(self, aggregates: SpillingAggregationStore,
+                                repo_identifier: str) -> List[RiskAnalysisResult]:
+        """Mesmo critério de `_identify_risky_aggregates`, com a dominância calculada no SQLite.
+
+        Só os arquivos em risco voltam para a memória.
+        """
+        author_names = aggregates.author_names
+        risky_files = []
+        for (file_id, commit_author, top_commits, total_commits,
+             line_author, top_lines, total_lines) in aggregates.risky_files(self.config.dominance_threshold):
+            result = RiskAnalysisResult(
+                file_path=aggregates.file_paths[file_id],
+                repository=repo_identifier,
+                dominant_author_commits=author_names[commit_author],
+                dominant_author_lines=author_names[line_author],
+                commits_dominance=top_commits / total_commits if total_commits else 0.0,
+                lines_dominance=top_lines / total_lines if total_lines else 0.0,
+                total_commits=total_commits,
+                total_lines_changed=total_lines,
+                all_authors=[author_names[author_id] for author_id in aggregates.authors_of(file_id)]
             )
-            dominant_author_lines_name, dominant_author_lines_count = dominant_author_lines
-            lines_dominance = dominant_author_lines_count / total_lines if total_lines > 0 else 0
-
-            if (commits_dominance >= self.config.dominance_threshold or
-                    lines_dominance >= self.config.dominance_threshold):
-                risky_files.append(RiskAnalysisResult(
-                    file_path=analysis.file_path,
-                    repository=analysis.repository,
-                    dominant_author_commits=dominant_author_commits_name,
-                    dominant_author_lines=dominant_author_lines_name,
-                    commits_dominance=commits_dominance,
-                    lines_dominance=lines_dominance,
-                    total_commits=total_commits,
-                    total_lines_changed=total_lines,
-                    all_authors=list(analysis.commits_by_author.keys())
-                ))
+            if not self.reports_lines:
+                result.dominant_author_lines = result.lines_dominance = result.total_lines_changed = None
+            risky_files.append(result)
+        return risky_files
+
+    def _identify_risky_pairs(self, pairs: Tuple[np.ndarray, ...], file_paths: List[str], author_names: List[str],
+                              repo_identifier: str, surviving: Optional[SurvivingLines] = None
+                              ) -> List[RiskAnalysisResult]:
+        if surviving is not None:
+            (pairs,), author_names = with_surviving_lines([pairs], file_paths, author_names, surviving)
+        self._record_truck_factor(repo_identifier, pairs, file_paths, author_names)
+        if self.config.group_by_depth is not None:
+            file_paths, (pairs,) = self._rollup_directories(file_paths, pairs)
+        self._record_counters(pairs, file_paths, author_names)
+
+        files, authors, commits, lines = pairs
+        n_files = len(file_paths)
+        table = DominanceTable(n_files, (files, authors, commits), (files, authors, lines))
+        grouped_authors, starts, counts = authors_by_file(files, authors, n_files)
+        self._save_index(repo_identifier, table, file_paths, author_names)
+
+        risky_files = []
+        for file_id in np.flatnonzero(table.risky_mask(self.config.dominance_threshold)).tolist():
+            start = starts[file_id]
+            file_authors = grouped_authors[start:start + counts[file_id]].tolist()
+            risky_files.append(self._build_risk_result(
+                table, file_id, author_names,
+                file_path=file_paths[file_id],
+                repository=repo_identifier,
+                all_authors=[author_names[author_id] for author_id in file_authors]
+            ))
+        return risky_files
+
+    def _identify_risky_windows(self, aggregates: AggregationStore, repo_identifier: str,
+                                surviving: Optional[SurvivingLines] = None) -> List[RiskAnalysisResult]:
+        """Dominância de cada janela a partir dos buckets de tempo, numa única passada.
+
+        Um arquivo entra no relatório se estiver em risco em qualquer janela;
+        os campos principais do resultado são os da maior janela.
+        """
+        if len(aggregates.author_names) > AUTHOR_MASK:
+            raise ValueError(f"Análise multi-janela suporta até {AUTHOR_MASK} autores")
+
+        threshold = self.config.dominance_threshold
+        per_window = window_pairs(*aggregates.pairs_in_history_order(), len(self.windows))
+        file_paths = aggregates.file_paths
+        author_names = aggregates.author_names
+        if surviving is not None:
+            # O blame é uma foto do HEAD: as mesmas linhas valem para todas as janelas
+            per_window, author_names = with_surviving_lines(per_window, file_paths, author_names, surviving)
+        self._record_truck_factor(repo_identifier, per_window[-1], file_paths, author_names)
+        if self.config.group_by_depth is not None:
+            file_paths, per_window = self._rollup_directories(file_paths, *per_window)
+        self._record_counters(per_window[-1], file_paths, author_names)
+        n_files = len(file_paths)
+        tables = [
+            DominanceTable(n_files, (files, authors, commits), (files, authors, lines))
+            for files, authors, commits, lines in per_window
+        ]
+        masks = [table.risky_mask(threshold) for table in tables]
+        self._save_index(repo_identifier, tables[-1], file_paths, author_names)
 
+        files, authors, _, _ = per_window[-1]
+        grouped_authors, starts, counts = authors_by_file(files, authors, n_files)
+
+        def name(author_id: int) -> str:
+            return author_names[author_id] if author_id >= 0 else ""
+
+        risky_files = []
+        for file_id in np.flatnonzero(np.logical_or.reduce(masks)).tolist():
+            start = starts[file_id]
+            file_authors = grouped_authors[start:start + counts[file_id]].tolist()
+            result = self._build_risk_result(
+                tables[-1], file_id, author_names,
+                file_path=file_paths[file_id],
+                repository=repo_identifier,
+                all_authors=[author_names[author_id] for author_id in file_authors]
+            )
+            result.windows = [
+                WindowDominance(
+                    days=days,
+                    dominant_author_commits=name(int(table.top_commit_authors[file_id])),
+                    dominant_author_lines=name(int(table.top_line_authors[file_id])) if self.reports_lines else None,
+                    commits_dominance=float(table.commits_dominance[file_id]),
+                    lines_dominance=float(table.lines_dominance[file_id]) if self.reports_lines else None,
+                    total_commits=int(table.total_commits[file_id]),
+                    total_lines_changed=int(table.total_lines[file_id]) if self.reports_lines else None,
+                    at_risk=bool(mask[file_id])
+                )
+                for days, table, mask in zip(self.windows.days, tables, masks)
+            ]
+            risky_files.append(result)
         return risky_files
+
+    def _rollup_directories(self, file_paths: List[str], *pair_sets) -> Tuple[List[str], List[tuple]]:
+        """Troca os pares por arquivo pelos pares por diretório (--group-by-depth)."""
+        trie = PathTrie(self.config.group_by_depth)
+        file_nodes = trie.add_files(file_paths)
+        return trie.paths, [trie.rollup(file_nodes, pairs) for pairs in pair_sets]
+
+    def _record_truck_factor(self, repo_identifier: str, pairs: Tuple[np.ndarray, ...], file_paths: List[str],
+                             author_names: List[str]):
+        # Sempre sobre os arquivos (antes de --group-by-depth) da maior janela
+        if self.config.truck_factor:
+            files, authors, commits, _ = pairs
+            self.truck_factors[repo_identifier] = truck_factor(
+                files, authors, commits, len(file_paths), author_names, repo_identifier)
+
+    def _save_index(self, repo_identifier: str, table: DominanceTable, file_paths: List[str],
+                    author_names: List[str]):
+        # Com --index-dir, a dominância de todos os arquivos fica salva para consultas por limiar
+        if self.index_store is not None:
+            self.index_store.save(DominanceIndex.from_table(repo_identifier, table, file_paths, author_names))
+
+    def _record_counters(self, pairs: Tuple[np.ndarray, ...], file_paths: List[str], author_names: List[str]):
+        # Com --results-db, os contadores da maior janela (depois do rollup) vão junto dos resultados
+        if self.config.results_db is not None:
+            self._counters = (pairs, file_paths, author_names)
+
+    def _save_results(self, repo_identifier: str, risky_files: List[RiskAnalysisResult]):
+        """Grava os resultados e os contadores da análise como um snapshot no --results-db."""
+        if self.config.results_db is None:
+            return
+        pairs, file_paths, author_names = self._counters or (None, (), ())
+        with self.metrics.stage("results_db"), ResultStore(self.config.results_db) as store:
+            store.save_snapshot(repo_identifier, risky_files, file_paths, author_names, pairs,
+                                config=self.config, with_lines=self.reports_lines, keep=self.config.results_keep)
+        self._counters = None
+
+    def _build_risk_result(self, table: DominanceTable, file_id: int, author_names: List[str],
+                           file_path: str, repository: str, all_authors: List[str]) -> RiskAnalysisResult:
+        def name(author_id: int) -> str:
+            return author_names[author_id] if author_id >= 0 else ""
+
+        result = RiskAnalysisResult(
+            file_path=file_path,
+            repository=repository,
+            dominant_author_commits=name(int(table.top_commit_authors[file_id])),
+            dominant_author_lines=name(int(table.top_line_authors[file_id])),
+            commits_dominance=float(table.commits_dominance[file_id]),
+            lines_dominance=float(table.lines_dominance[file_id]),
+            total_commits=int(table.total_commits[file_id]),
+            total_lines_changed=int(table.total_lines[file_id]),
+            all_authors=all_authors
+        )
+        if not self.reports_lines:
+            result.dominant_author_lines = result.lines_dominance = result.total_lines_changed = None
+        return result
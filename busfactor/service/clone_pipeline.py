@@ -0,0 +1,82 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.mirror_cache import directory_size
+from busfactor.service.repository_manager import RepositoryManager
+
+
+class ClonePrefetcher:
+    """Pipeline produtor/consumidor: clona os próximos repositórios enquanto o atual é analisado.
+
+    Até `depth` clones ficam adiantados em relação ao repositório que está
+    sendo consumido (em uma thread cada; o `git clone` é limitado por rede e
+    disco, não pelo GIL). Os repositórios saem na ordem de entrada e cada
+    clone é liberado assim que o consumidor termina de usá-lo, então o tempo
+    total tende ao do estágio mais lento, e não à soma dos dois.
+
+    `max_bytes` limita o disco ocupado por clones prontos aguardando análise:
+    acima dele nenhum clone novo é iniciado (o próximo necessário sempre é).
+    """
+
+    def __init__(self, repository_manager: RepositoryManager, config: AnalysisConfig,
+                 depth: int = 1, max_bytes: Optional[int] = None):
+        self.repository_manager = repository_manager
+        self.config = config
+        self.depth = max(0, depth)
+        self.max_bytes = max_bytes
+
+    def iterate(self, repos: List[str]) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """Gera `(repo, caminho, erro)`; o clone é liberado quando o consumidor pede o próximo."""
+        pending: Deque[Tuple[str, Future]] = deque()
+        queued = iter(repos)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.depth), thread_name_prefix="clone") as executor:
+            try:
+                while True:
+                    self._fill(executor, pending, queued, current=None)
+                    if not pending:
+                        return
+
+                    repo, future = pending.popleft()
+                    try:
+                        path, error = future.result(), None
+                    except Exception as e:
+                        path, error = None, str(e)
+
+                    # Com o atual pronto, adianta os próximos antes de entregá-lo
+                    self._fill(executor, pending, queued, current=path)
+                    try:
+                        yield repo, path, error
+                    finally:
+                        if path is not None:
+                            self.repository_manager.release_repository(path)
+            finally:
+                # Consumidor interrompido: espera os clones em andamento e apaga todos
+                for _, future in pending:
+                    future.cancel()
+                for _, future in pending:
+                    if not future.cancelled() and future.exception() is None:
+                        self.repository_manager.release_repository(future.result())
+
+    def _fill(self, executor: ThreadPoolExecutor, pending: Deque[Tuple[str, Future]], queued: Iterator[str],
+              current: Optional[str]):
+        # O repositório em análise conta como uma vaga; `depth` é o quanto se adianta além dele
+        limit = self.depth if current is not None else max(1, self.depth)
+        while len(pending) < limit:
+            if (pending or current is not None) and not self._within_budget(pending, current):
+                return
+            repo = next(queued, None)
+            if repo is None:
+                return
+            pending.append((repo, executor.submit(self.repository_manager.clone_repository, repo, self.config)))
+
+    def _within_budget(self, pending: Deque[Tuple[str, Future]], current: Optional[str]) -> bool:
+        if self.max_bytes is None:
+            return True
+        paths = [future.result() for _, future in pending if future.done() and future.exception() is None]
+        if current is not None:
+            paths.append(current)
+        return sum(directory_size(Path(path)) for path in paths) <= self.max_bytes
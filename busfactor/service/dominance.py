@@ -0,0 +1,83 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def _top_per_file(files: np.ndarray, authors: np.ndarray, values: np.ndarray, n_files: int
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Total, máximo e autor do máximo por arquivo, a partir de pares (arquivo, autor, valor).
+
+    Os pares de um mesmo arquivo devem vir na ordem de inserção do
+    dicionário original; o empate é resolvido pelo primeiro par com o valor
+    máximo, exatamente como `max(dict.items(), key=...)`.
+    Retorna também o array de contagem de pares por arquivo.
+    """
+    order = np.argsort(files, kind="stable")
+    files = files[order]
+    authors = authors[order]
+    values = values[order]
+
+    counts = np.bincount(files, minlength=n_files)
+    nonempty = counts > 0
+    starts = (np.cumsum(counts) - counts)[nonempty]
+
+    totals = np.zeros(n_files, dtype=np.int64)
+    maxima = np.zeros(n_files, dtype=np.int64)
+    top_authors = np.full(n_files, -1, dtype=np.int64)
+    if not len(values):
+        return totals, maxima, top_authors, counts
+
+    totals[nonempty] = np.add.reduceat(values, starts)
+    maxima[nonempty] = np.maximum.reduceat(values, starts)
+
+    positions = np.arange(len(values), dtype=np.int64)
+    candidates = np.where(values == maxima[files], positions, len(values))
+    top_authors[nonempty] = authors[np.minimum.reduceat(candidates, starts)]
+    return totals, maxima, top_authors, counts
+
+
+def authors_by_file(files: np.ndarray, authors: np.ndarray, n_files: int
+                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Autores agrupados por arquivo (mantendo a ordem dos pares): (autores, início, quantidade)."""
+    order = np.argsort(files, kind="stable")
+    counts = np.bincount(files, minlength=n_files)
+    return authors[order], np.cumsum(counts) - counts, counts
+
+
+class DominanceTable:
+    """Métricas de dominância de todos os arquivos, calculadas em lote com NumPy.
+
+    Cada linha corresponde a um arquivo (ID interno). `top_*_authors` guarda
+    o ID do autor dominante (-1 para arquivos sem autores) e as razões de
+    dominância seguem a mesma aritmética da versão anterior: commits do
+    autor dominante / total de commits, e linhas / total de linhas (0 quando
+    o arquivo não tem linhas alteradas).
+    """
+
+    __slots__ = (
+        "total_commits", "total_lines", "top_commit_authors", "top_commit_counts",
+        "top_line_authors", "top_line_counts", "commits_dominance", "lines_dominance", "has_authors",
+    )
+
+    def __init__(self, n_files: int,
+                 commit_pairs: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 line_pairs: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 total_commits: Optional[np.ndarray] = None,
+                 total_lines: Optional[np.ndarray] = None):
+        summed_commits, self.top_commit_counts, self.top_commit_authors, author_counts = \
+            _top_per_file(*commit_pairs, n_files)
+        summed_lines, self.top_line_counts, self.top_line_authors, _ = _top_per_file(*line_pairs, n_files)
+
+        self.total_commits = summed_commits if total_commits is None else total_commits
+        self.total_lines = summed_lines if total_lines is None else total_lines
+        self.has_authors = author_counts > 0
+
+        self.commits_dominance = np.divide(
+            self.top_commit_counts, self.total_commits,
+            out=np.zeros(n_files, dtype=np.float64), where=self.total_commits > 0)
+        self.lines_dominance = np.divide(
+            self.top_line_counts, self.total_lines,
+            out=np.zeros(n_files, dtype=np.float64), where=self.total_lines > 0)
+
+    def risky_mask(self, threshold: float) -> np.ndarray:
+        return self.has_authors & ((self.commits_dominance >= threshold) | (self.lines_dominance >= threshold))
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from busfactor.service.dominance import DominanceTable
+
+INDEX_VERSION = 1
+
+
+def risky_counts(sorted_scores: np.ndarray, thresholds: Iterable[float]) -> List[int]:
+    """Arquivos em risco para cada limiar, por busca binária no array ordenado de scores."""
+    thresholds = np.asarray(list(thresholds), dtype=np.float64)
+    return (len(sorted_scores) - np.searchsorted(sorted_scores, thresholds, side="left")).tolist()
+
+
+def cumulative_distribution(sorted_scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Curva (limiar, arquivos em risco) nos pontos onde a contagem muda.
+
+    Para cada score distinto `s`, o número de arquivos com score >= s é o
+    total menos a posição da primeira ocorrência de `s` no array ordenado.
+    """
+    scores, first = np.unique(sorted_scores, return_index=True)
+    return scores, len(sorted_scores) - first
+
+
+def merged_sorted_scores(indexes: Iterable["DominanceIndex"]) -> np.ndarray:
+    """Scores de vários índices (ex.: todos os repositórios) num único array ordenado."""
+    scores = [index.scores for index in indexes]
+    return np.sort(np.concatenate(scores)) if scores else np.empty(0, dtype=np.float64)
+
+
+class DominanceIndex:
+    """Dominância por arquivo de uma análise, consultável para qualquer limiar.
+
+    Um arquivo está em risco no limiar `t` quando a dominância por commits
+    ou por linhas é >= t, ou seja, quando `max(commits, linhas) >= t`. O
+    índice guarda esse score já ordenado (`order`), então a contagem para
+    vários limiares é uma busca binária e a curva cumulativa sai sem
+    refiltrar os arquivos. Arquivos sem autores na janela não entram.
+    """
+
+    FIELDS = (
+        "file_paths", "author_names", "commit_authors", "line_authors",
+        "commits_dominance", "lines_dominance", "total_commits", "total_lines", "order",
+    )
+
+    def __init__(self, repository: str, file_paths: np.ndarray, author_names: np.ndarray,
+                 commit_authors: np.ndarray, line_authors: np.ndarray,
+                 commits_dominance: np.ndarray, lines_dominance: np.ndarray,
+                 total_commits: np.ndarray, total_lines: np.ndarray, order: Optional[np.ndarray] = None):
+        self.repository = repository
+        self.file_paths = file_paths
+        self.author_names = author_names
+        self.commit_authors = commit_authors
+        self.line_authors = line_authors
+        self.commits_dominance = commits_dominance
+        self.lines_dominance = lines_dominance
+        self.total_commits = total_commits
+        self.total_lines = total_lines
+        self.order = np.argsort(self.scores, kind="stable") if order is None else order
+
+    @classmethod
+    def from_table(cls, repository: str, table: DominanceTable, file_paths: List[str],
+                   author_names: List[str]) -> "DominanceIndex":
+        present = np.flatnonzero(table.has_authors)
+        return cls(
+            repository=repository,
+            file_paths=np.array(file_paths, dtype=str)[present],
+            author_names=np.array(author_names, dtype=str),
+            commit_authors=table.top_commit_authors[present].astype(np.int32),
+            line_authors=table.top_line_authors[present].astype(np.int32),
+            commits_dominance=table.commits_dominance[present],
+            lines_dominance=table.lines_dominance[present],
+            total_commits=table.total_commits[present],
+            total_lines=table.total_lines[present],
+        )
+
+    def __len__(self) -> int:
+        return len(self.file_paths)
+
+    @property
+    def scores(self) -> np.ndarray:
+        return np.maximum(self.commits_dominance, self.lines_dominance)
+
+    @property
+    def sorted_scores(self) -> np.ndarray:
+        return self.scores[self.order]
+
+    def risky_counts(self, thresholds: Iterable[float]) -> List[int]:
+        return risky_counts(self.sorted_scores, thresholds)
+
+    def risky_file_ids(self, threshold: float) -> np.ndarray:
+        """IDs (na ordem do histórico) dos arquivos em risco no limiar."""
+        start = np.searchsorted(self.sorted_scores, threshold, side="left")
+        return np.sort(self.order[start:])
+
+    def to_arrays(self) -> dict:
+        meta = {"version": INDEX_VERSION, "repository": self.repository}
+        arrays = {field: getattr(self, field) for field in self.FIELDS}
+        arrays["meta"] = np.array(json.dumps(meta))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> Optional["DominanceIndex"]:
+        meta = json.loads(str(arrays["meta"]))
+        if meta.get("version") != INDEX_VERSION:
+            return None
+        return cls(meta["repository"], **{field: arrays[field] for field in cls.FIELDS})
+
+
+class DominanceIndexStore:
+    """Índices de dominância em disco, um `.npz` por repositório (como o `AnalysisCache`)."""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = Path(index_dir)
+
+    def path_for(self, repo_identifier: str) -> Path:
+        key = hashlib.sha1(repo_identifier.encode("utf-8")).hexdigest()
+        return self.index_dir / f"{key}.npz"
+
+    def save(self, index: DominanceIndex):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(index.repository)
+
+        # Escrita atômica, como no cache de histórico
+        fd, temp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **index.to_arrays())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def load(self, repo_identifier: str) -> Optional[DominanceIndex]:
+        return self._load_path(self.path_for(repo_identifier))
+
+    def load_all(self) -> List[DominanceIndex]:
+        indexes = (self._load_path(path) for path in sorted(self.index_dir.glob("*.npz")))
+        return [index for index in indexes if index is not None]
+
+    @staticmethod
+    def _load_path(path: Path) -> Optional[DominanceIndex]:
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                return DominanceIndex.from_arrays(arrays)
+        except (OSError, ValueError, KeyError):
+            return None
@@ -0,0 +1,333 @@
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from busfactor.models.data_models import CommitRecord, FileModification
+
+# Separadores usados no --format do git log (não aparecem em nomes de autor)
+RECORD_SEPARATOR = "\x1e"
+FIELD_SEPARATOR = "\x1f"
+READ_CHUNK_SIZE = 1 << 16
+
+
+class HistoryBackend:
+    """Fonte do histórico de commits consumida pelo BusFactorAnalyzer."""
+
+    name = "base"
+    # Com False, o backend pode deixar as linhas alteradas zeradas (--metric commits)
+    line_stats = True
+
+    def __init__(self, line_stats: bool = True):
+        self.line_stats = line_stats
+
+    def iter_commits(
+            self,
+            repo_path: str,
+            since: Optional[datetime] = None,
+            revision_range: Optional[str] = None,
+            commits: Optional[List[str]] = None,
+            pathspecs: Optional[List[str]] = None
+    ) -> Iterator[CommitRecord]:
+        raise NotImplementedError
+
+
+class GitLogBackend(HistoryBackend):
+    """Lê o histórico a partir de um único processo `git log --numstat -z`.
+
+    A saída é consumida em blocos e interpretada de forma incremental, então
+    o uso de memória não depende do tamanho do histórico. A ordem (mais
+    antigo primeiro), a detecção de renomeações (-M) e o tratamento de merges
+    (sem arquivos modificados) seguem o comportamento do PyDriller.
+
+    Sem `line_stats`, usa `--name-status`: o git só compara as árvores (e os
+    blobs candidatos a renomeação), sem calcular o diff de cada arquivo. Num
+    clone parcial (blobless, o padrão do `--clone-mode auto` com `--metric
+    commits`) a detecção fica só nas renomeações exatas (`-M100%`, mesmo
+    blob): a aproximada buscaria do remoto os blobs de cada candidato, um
+    `git fetch` por commit. Renomeações com edição no mesmo commit viram
+    remoção do caminho antigo e criação do novo.
+    """
+
+    name = "git"
+
+    def build_command(
+            self,
+            repo_path: str,
+            since: Optional[datetime] = None,
+            revision_range: Optional[str] = None,
+            commits: Optional[List[str]] = None,
+            pathspecs: Optional[List[str]] = None
+    ) -> List[str]:
+        renames = "-M"
+        if not self.line_stats and is_partial_clone(repo_path):
+            renames = "-M100%"
+        command = [
+            "git", "-C", repo_path, "log",
+            "--numstat" if self.line_stats else "--name-status", "-z", renames, "--no-color",
+            f"--format={RECORD_SEPARATOR}%H{FIELD_SEPARATOR}%an{FIELD_SEPARATOR}%ct",
+        ]
+        if commits is not None:
+            # Lista explícita (via stdin), mantida na ordem recebida
+            command.extend(["--no-walk=unsorted", "--stdin"])
+        else:
+            command.append("--reverse")
+            if since is not None:
+                command.append(f"--since=@{int(since.timestamp())}")
+            if revision_range is not None:
+                command.append(revision_range)
+        command.extend(_pathspec_args(pathspecs))
+        return command
+
+    def iter_commits(
+            self,
+            repo_path: str,
+            since: Optional[datetime] = None,
+            revision_range: Optional[str] = None,
+            commits: Optional[List[str]] = None,
+            pathspecs: Optional[List[str]] = None
+    ) -> Iterator[CommitRecord]:
+        if commits is not None and not commits:
+            return
+
+        stdin = None
+        if commits is not None:
+            # Um arquivo temporário evita deadlock entre escrita no stdin e leitura do stdout
+            stdin = tempfile.TemporaryFile()
+            stdin.write("\n".join(commits).encode("ascii") + b"\n")
+            stdin.seek(0)
+
+        process = subprocess.Popen(
+            self.build_command(repo_path, since, revision_range, commits, pathspecs),
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        try:
+            parse = self.parse_stream if self.line_stats else self.parse_name_status_stream
+            yield from parse(self._iter_tokens(process.stdout))
+            stderr = process.stderr.read().decode("utf-8", errors="replace")
+            if process.wait() != 0:
+                raise Exception(f"git log falhou: {stderr.strip()}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+            if stdin is not None:
+                stdin.close()
+
+    @staticmethod
+    def _iter_tokens(stream) -> Iterator[str]:
+        pending = b""
+        while True:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            pending += chunk
+            *tokens, pending = pending.split(b"\0")
+            for token in tokens:
+                yield token.decode("utf-8", errors="replace")
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def parse_stream(tokens: Iterator[str]) -> Iterator[CommitRecord]:
+        current: Optional[CommitRecord] = None
+        tokens = iter(tokens)
+
+        for token in tokens:
+            token = token.lstrip("\n")
+            if not token:
+                continue
+
+            if token.startswith(RECORD_SEPARATOR):
+                if current is not None:
+                    yield current
+                sha, author, timestamp = token[1:].split(FIELD_SEPARATOR)
+                current = CommitRecord(sha=sha, author=author, timestamp=int(timestamp), modifications=[])
+                continue
+
+            added, deleted, path = token.split("\t", 2)
+            if path:
+                old_path = new_path = path
+            else:
+                # Renomeação: "added\tdeleted\t" seguido de origem e destino
+                old_path = next(tokens)
+                new_path = next(tokens)
+
+            current.modifications.append(FileModification(
+                new_path=new_path,
+                old_path=old_path,
+                added_lines=int(added) if added != "-" else 0,
+                deleted_lines=int(deleted) if deleted != "-" else 0,
+            ))
+
+        if current is not None:
+            yield current
+
+    @staticmethod
+    def parse_name_status_stream(tokens: Iterator[str]) -> Iterator[CommitRecord]:
+        """Como `parse_stream`, para a saída de `--name-status` (linhas alteradas ficam zeradas)."""
+        current: Optional[CommitRecord] = None
+        tokens = iter(tokens)
+
+        for token in tokens:
+            token = token.lstrip("\n")
+            if not token:
+                continue
+
+            if token.startswith(RECORD_SEPARATOR):
+                if current is not None:
+                    yield current
+                sha, author, timestamp = token[1:].split(FIELD_SEPARATOR)
+                current = CommitRecord(sha=sha, author=author, timestamp=int(timestamp), modifications=[])
+                continue
+
+            # Status seguido do caminho; renomeação (R) e cópia (C) trazem origem e destino
+            old_path = new_path = next(tokens)
+            if token[0] == "R":
+                new_path = next(tokens)
+            elif token[0] == "C":
+                old_path = new_path = next(tokens)
+
+            current.modifications.append(FileModification(
+                new_path=new_path,
+                old_path=old_path,
+                added_lines=0,
+                deleted_lines=0,
+            ))
+
+        if current is not None:
+            yield current
+
+
+class PyDrillerBackend(HistoryBackend):
+    """Backend original, baseado em `Repository(...).traverse_commits()`.
+
+    Não aplica `pathspecs`: a filtragem de caminhos fica toda no analisador.
+    """
+
+    name = "pydriller"
+
+    def iter_commits(
+            self,
+            repo_path: str,
+            since: Optional[datetime] = None,
+            revision_range: Optional[str] = None,
+            commits: Optional[List[str]] = None,
+            pathspecs: Optional[List[str]] = None
+    ) -> Iterator[CommitRecord]:
+        only_commits = commits
+        if revision_range is not None:
+            only_commits = list_revisions(repo_path, revision_range)
+        from pydriller import Repository
+
+        for commit in Repository(repo_path, since=since, only_commits=only_commits).traverse_commits():
+            yield CommitRecord(
+                sha=commit.hash,
+                author=commit.author.name,
+                timestamp=int(commit.committer_date.timestamp()),
+                modifications=[
+                    FileModification(
+                        new_path=modification.new_path,
+                        old_path=modification.old_path,
+                        added_lines=modification.added_lines,
+                        deleted_lines=modification.deleted_lines,
+                    )
+                    for modification in commit.modified_files
+                ],
+            )
+
+
+def resolve_head(repo_path: str) -> str:
+    return _run_git(repo_path, "rev-parse", "HEAD").strip()
+
+
+def list_revisions(
+        repo_path: str,
+        revision_range: str = "HEAD",
+        since: Optional[datetime] = None,
+        pathspecs: Optional[List[str]] = None
+) -> List[str]:
+    """SHAs de `revision_range`, do mais antigo para o mais recente (mesma ordem do git log --reverse)."""
+    args = ["rev-list", "--reverse"]
+    if since is not None:
+        args.append(f"--since=@{int(since.timestamp())}")
+    return _run_git(repo_path, *args, revision_range, *_pathspec_args(pathspecs)).split()
+
+
+def list_blobs(repo_path: str, revision: str = "HEAD") -> Dict[str, str]:
+    """SHA do blob de cada arquivo em `revision` (submódulos ficam de fora)."""
+    blobs = {}
+    for entry in _run_git(repo_path, "ls-tree", "-r", "-z", revision).split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        _, kind, sha = meta.split(" ")
+        if kind == "blob":
+            blobs[path] = sha
+    return blobs
+
+
+def list_root_commits(repo_path: str, revision: str = "HEAD") -> List[str]:
+    """Commits sem pai alcançáveis a partir de `revision` (a fronteira, num clone raso)."""
+    return sorted(_run_git(repo_path, "rev-list", "--max-parents=0", revision).split())
+
+
+def _pathspec_args(pathspecs: Optional[List[str]]) -> List[str]:
+    if not pathspecs:
+        return []
+    # --full-history: sem ele o git simplifica merges e pode pular commits de branches laterais
+    return ["--full-history", "--", *pathspecs]
+
+
+def is_ancestor(repo_path: str, ancestor: str, descendant: str) -> bool:
+    """Indica se `ancestor` ainda faz parte do histórico de `descendant`.
+
+    Retorna False também quando o commit não existe mais no repositório
+    (ex.: após um force-push seguido de gc).
+    """
+    result = subprocess.run(
+        ["git", "-C", repo_path, "merge-base", "--is-ancestor", ancestor, descendant],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode == 0
+
+
+def is_partial_clone(repo_path: str) -> bool:
+    """Indica se o repositório é um clone parcial (ex.: `--filter=blob:none`), com blobs buscados sob demanda."""
+    # Versões recentes do git marcam o remoto (remote.<nome>.promisor); as antigas, extensions.partialClone
+    result = subprocess.run(
+        ["git", "-C", repo_path, "config", "--get-regexp", r"^(extensions\.partialclone|remote\..*\.promisor)$"],
+        capture_output=True,
+        text=True,
+    )
+    return any(line.split(" ", 1)[-1] != "false" for line in result.stdout.splitlines())
+
+
+def _run_git(repo_path: str, *args: str) -> str:
+    try:
+        result = subprocess.run(
+            ["git", "-C", repo_path, *args],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"git {args[0]} falhou: {e.stderr.strip()}")
+    return result.stdout
+
+
+HISTORY_BACKENDS = {
+    GitLogBackend.name: GitLogBackend,
+    PyDrillerBackend.name: PyDrillerBackend,
+}
+
+
+def get_history_backend(name: str, line_stats: bool = True) -> HistoryBackend:
+    if name not in HISTORY_BACKENDS:
+        raise ValueError(f"Backend de histórico não suportado: {name}")
+    return HISTORY_BACKENDS[name](line_stats=line_stats)
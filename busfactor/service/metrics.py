@@ -0,0 +1,161 @@
+import cProfile
+import json
+import os
+import pstats
+import resource
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    # ru_maxrss é em KiB no Linux
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+def _new_scope() -> dict:
+    return {"stages": {}, "counters": {}}
+
+
+class MetricsRecorder:
+    """Tempo de parede/CPU por estágio e contadores, agrupados por repositório.
+
+    Os estágios são grossos (clone, percurso do histórico, agregação,
+    dominância, relatório), então o custo de medir é desprezível e o
+    recorder fica sempre ativo. O que é medido dentro de `repository(repo)`
+    vai para aquele repositório; o resto, para o escopo da execução. O
+    repositório corrente é por thread (clones em segundo plano não se
+    misturam com a análise em andamento).
+    Com `profile=True`, `profiling()` liga o cProfile no laço de percurso.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.run = _new_scope()
+        self.repos: Dict[str, dict] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.profiler = cProfile.Profile() if profile else None
+        self.profile_parts: List[str] = []
+        self._started = (time.perf_counter(), time.process_time())
+
+    @property
+    def repo(self) -> Optional[str]:
+        return getattr(self._local, "repo", None)
+
+    def _scope(self) -> dict:
+        if self.repo is None:
+            return self.run
+        scope = self.repos.get(self.repo)
+        if scope is None:
+            scope = self.repos[self.repo] = _new_scope()
+        return scope
+
+    @contextmanager
+    def repository(self, repo: str):
+        previous, self._local.repo = self.repo, repo
+        try:
+            yield
+        finally:
+            self._local.repo = previous
+
+    @contextmanager
+    def stage(self, name: str):
+        # CPU da thread: clones em segundo plano não inflam o estágio em andamento
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            with self._lock:
+                stages = self._scope()["stages"]
+                entry = stages.get(name)
+                if entry is None:
+                    entry = stages[name] = {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0}
+                entry["wall_s"] += wall
+                entry["cpu_s"] += cpu
+                entry["calls"] += 1
+
+    @contextmanager
+    def profiling(self):
+        if self.profiler is None:
+            yield
+            return
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            counters = self._scope()["counters"]
+            counters[name] = counters.get(name, 0) + value
+
+    def set_peak_rss(self):
+        """Registra o pico de RSS deste processo no repositório atual."""
+        self._scope()["peak_rss_mb"] = peak_rss_mb()
+
+    def to_dict(self) -> dict:
+        """Forma serializável (e transportável entre processos) das métricas."""
+        data = {"run": self.run, "repos": self.repos}
+        if self.profiler is not None:
+            # Perfis de outros processos chegam como arquivos; este também vira um
+            parts = list(self.profile_parts)
+            self.profiler.create_stats()
+            if self.profiler.stats:
+                fd, path = tempfile.mkstemp(prefix="bus_factor_profile_", suffix=".prof")
+                os.close(fd)
+                self.profiler.dump_stats(path)
+                parts.append(path)
+            data["profile_parts"] = parts
+        return data
+
+    def merge(self, data: dict):
+        """Incorpora métricas de outro processo (ex.: um worker do pool)."""
+        for repo, scope in data["repos"].items():
+            target = self.repos.setdefault(repo, _new_scope())
+            for name, entry in scope["stages"].items():
+                current = target["stages"].setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+                for key in current:
+                    current[key] += entry[key]
+            for name, value in scope["counters"].items():
+                target["counters"][name] = target["counters"].get(name, 0) + value
+            if "peak_rss_mb" in scope:
+                target["peak_rss_mb"] = max(target.get("peak_rss_mb", 0.0), scope["peak_rss_mb"])
+        self.profile_parts.extend(data.get("profile_parts", []))
+
+    def summary(self) -> dict:
+        wall, cpu = self._started
+        return {
+            "total": {
+                "wall_s": time.perf_counter() - wall,
+                "cpu_s": time.process_time() - cpu,
+                "peak_rss_mb": peak_rss_mb(),
+                # Inclui os processos git e os workers já encerrados
+                "peak_rss_children_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+            },
+            "stages": self.run["stages"],
+            "counters": self.run["counters"],
+            "repos": self.repos,
+        }
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+
+    def dump_profile(self, path: str):
+        """Junta os perfis de todos os processos num único arquivo pstats."""
+        parts = self.to_dict().get("profile_parts", [])
+        if not parts:
+            return False
+        try:
+            pstats.Stats(*parts).dump_stats(path)
+            return True
+        finally:
+            for part in parts:
+                try:
+                    os.remove(part)
+                except OSError:
+                    pass
@@ -0,0 +1,218 @@
+import fcntl
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from busfactor.service.history_backend import is_partial_clone
+
+
+class FileLock:
+    """Lock entre processos com `flock` sobre um arquivo de lock.
+
+    O kernel solta o lock quando o processo dono termina, então uma execução
+    interrompida não bloqueia o cache para sempre e não há teste de PID
+    (não atômico) para quebrar locks abandonados. O arquivo é removido ao
+    soltar o lock; quem abriu a versão antiga antes da remoção percebe pelo
+    inode, depois do `flock`, e tenta de novo no arquivo novo. O PID do dono
+    fica gravado só para diagnóstico.
+    """
+
+    def __init__(self, path: str, timeout: float = 600.0, poll_interval: float = 0.1):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.locked = False
+        self._fd: Optional[int] = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                if not blocking:
+                    return False
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Tempo esgotado aguardando o lock {self.path}")
+                time.sleep(self.poll_interval)
+                continue
+
+            if not self._is_current(fd):
+                # O dono anterior removeu o arquivo entre o open e o flock
+                os.close(fd)
+                continue
+
+            os.ftruncate(fd, 0)
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            self._fd = fd
+            self.locked = True
+            return True
+
+    def release(self):
+        if self.locked:
+            # Remove antes de soltar, enquanto ainda é o dono do arquivo
+            self._remove()
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+            self.locked = False
+
+    def _is_current(self, fd: int) -> bool:
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(fd)
+        return (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
+
+    def _remove(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+# Refs copiadas para o mirror (mesmos nomes do remoto)
+MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+class MirrorCache:
+    """Diretório de mirrors bare reutilizados entre execuções.
+
+    Cada repositório é clonado uma vez (`git clone --bare`) e atualizado com
+    `git fetch` nas execuções seguintes. Só branches e tags são copiados
+    (`MIRROR_REFSPECS`): refs como `refs/pull/*` do GitHub não entram no
+    histórico analisado e só ocupariam o orçamento de disco. O mirror fica travado enquanto
+    está em uso; os demais são removidos do menos recentemente usado para o
+    mais recente quando o total passa de `max_bytes`.
+
+    Com `blobless`, o mirror é criado sem blobs (`--filter=blob:none`). Um
+    mirror completo atende a uma execução blobless, mas o contrário não: se
+    um mirror parcial for reutilizado por uma execução que precisa das linhas
+    alteradas, ele é clonado de novo por completo, em vez de o git buscar os
+    blobs sob demanda, um fetch por commit.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, blobless: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.blobless = blobless
+
+    def path_for(self, repo_url: str) -> Path:
+        key = hashlib.sha1(repo_url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.git"
+
+    def lock_for(self, mirror_path: Path) -> FileLock:
+        return FileLock(str(mirror_path) + ".lock")
+
+    def acquire(self, repo_url: str) -> Tuple[str, FileLock]:
+        """Garante o mirror atualizado e devolve o caminho com o lock já adquirido."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        mirror_path = self.path_for(repo_url)
+        lock = self.lock_for(mirror_path)
+        lock.acquire()
+
+        try:
+            if mirror_path.exists() and not self.blobless and is_partial_clone(str(mirror_path)):
+                shutil.rmtree(mirror_path)
+            if mirror_path.exists():
+                self._run_git(["git", "-C", str(mirror_path), "fetch", "-q", "--prune", "origin", *MIRROR_REFSPECS])
+            else:
+                self._clone_mirror(repo_url, mirror_path)
+            self._update_commit_graph(mirror_path)
+            os.utime(mirror_path)
+        except BaseException:
+            lock.release()
+            raise
+
+        self.evict(keep=mirror_path)
+        return str(mirror_path), lock
+
+    def evict(self, keep: Optional[Path] = None) -> List[str]:
+        """Remove mirrors ociosos (LRU) até o cache caber no orçamento de disco."""
+        mirrors = sorted(
+            (path for path in self.cache_dir.glob("*.git") if path.is_dir()),
+            key=lambda path: path.stat().st_mtime,
+        )
+        sizes = {path: directory_size(path) for path in mirrors}
+        total = sum(sizes.values())
+        evicted = []
+
+        for mirror_path in mirrors:
+            if total <= self.max_bytes:
+                break
+            if mirror_path == keep:
+                continue
+
+            lock = self.lock_for(mirror_path)
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                shutil.rmtree(mirror_path, ignore_errors=True)
+            finally:
+                lock.release()
+            total -= sizes[mirror_path]
+            evicted.append(str(mirror_path))
+
+        return evicted
+
+    def _clone_mirror(self, repo_url: str, mirror_path: Path):
+        # Clona em um diretório temporário para não deixar um mirror pela metade
+        partial_path = mirror_path.with_suffix(".partial")
+        shutil.rmtree(partial_path, ignore_errors=True)
+
+        command = ["git", "clone", "-q", "--bare"]
+        if self.blobless:
+            command.append("--filter=blob:none")
+        command.extend([repo_url, str(partial_path)])
+
+        try:
+            self._run_git(command)
+            os.replace(partial_path, mirror_path)
+        finally:
+            shutil.rmtree(partial_path, ignore_errors=True)
+
+    def _update_commit_graph(self, mirror_path: Path):
+        """Mantém o commit-graph com filtros de Bloom de caminhos alterados.
+
+        Com eles, `git log -- <dir>` (um único pathspec sem magia, ver
+        `to_pathspecs`) descarta sem abrir as árvores os commits que não
+        tocam o diretório. `--split` só acrescenta
+        uma camada com os commits novos a cada fetch. É uma otimização: se
+        falhar, o mirror continua utilizável.
+        """
+        try:
+            self._run_git([
+                "git", "-C", str(mirror_path), "commit-graph", "write",
+                "--reachable", "--changed-paths", "--split",
+            ])
+        except subprocess.CalledProcessError:
+            pass
+
+    @staticmethod
+    def _run_git(command: List[str]):
+        subprocess.run(command, check=True, capture_output=True, text=True)
+
+
+def directory_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
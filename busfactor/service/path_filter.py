@@ -0,0 +1,198 @@
+import re
+from fnmatch import translate
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set, Tuple
+
+DEFAULT_CACHE_SIZE = 1 << 16
+_WILDCARDS = set("*?[")
+# fnmatch: o mesmo `fnmatch` do caminho inteiro de sempre (`*` atravessa `/`);
+# git: semântica do pathspec `:(glob)` (`*` fica num segmento, `**/` atravessa diretórios)
+GLOB_SEMANTICS = ("fnmatch", "git")
+# Padrões que casam qualquer caminho em cada semântica
+_MATCH_ALL = {"fnmatch": ("*", "**"), "git": ("**", "**/*")}
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Converte um glob para regex, com a mesma semântica do pathspec `:(glob)` do git.
+
+    - `*` casa qualquer sequência **dentro de um segmento** (não atravessa `/`);
+      diferente do `fnmatch`, em que `*` também casa `/`.
+    - `?` casa um caractere que não seja `/`; `[...]` e `[!...]` são classes.
+    - `**` atravessa diretórios quando ocupa um segmento inteiro:
+      `**/x` casa `x` em qualquer profundidade (inclusive na raiz),
+      `x/**` casa tudo dentro de `x/` e `a/**/b` casa zero ou mais
+      diretórios entre `a` e `b`. Em outra posição, `**` vale como `*`.
+
+    Exemplos: `**/*` casa todos os arquivos; `*.py` só os da raiz
+    (use `**/*.py` para qualquer nível); `docs/**` tudo abaixo de `docs/`.
+    """
+    regex = []
+    i = 0
+    length = len(pattern)
+
+    while i < length:
+        char = pattern[i]
+
+        if pattern.startswith("**", i):
+            at_segment_start = i == 0 or pattern[i - 1] == "/"
+            after = i + 2
+            if at_segment_start and after == length:
+                regex.append(".*")
+                i = after
+                continue
+            if at_segment_start and pattern[after] == "/":
+                regex.append("(?:.*/)?")
+                i = after + 1
+                continue
+            regex.append("[^/]*")
+            i = after
+            continue
+
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "]") else i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                content = pattern[i + 1:end]
+                if content.startswith("!"):
+                    content = "^" + content[1:]
+                regex.append(f"[{content.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        else:
+            regex.append(re.escape(char))
+        i += 1
+
+    return "".join(regex)
+
+
+def literal_prefix(pattern: str) -> str:
+    """Trecho inicial do glob sem curingas: todo caminho que casa com ele começa assim (nas duas semânticas)."""
+    for index, char in enumerate(pattern):
+        if char in _WILDCARDS:
+            return pattern[:index]
+    return pattern
+
+
+def _directory_prefix(pattern: str) -> Optional[str]:
+    """Retorna `dir` para padrões `dir/**` sem curingas no diretório (iguais nas duas semânticas)."""
+    if pattern.endswith("/**"):
+        directory = pattern[:-3]
+        if directory and not _WILDCARDS.intersection(directory):
+            return directory
+    return None
+
+
+def _compile(patterns: Iterable[str], semantics: str) -> Tuple[Set[str], Optional["re.Pattern[str]"], bool]:
+    if semantics not in GLOB_SEMANTICS:
+        raise ValueError(f"Semântica de glob não suportada: {semantics}")
+    to_regex = translate if semantics == "fnmatch" else glob_to_regex
+    prefixes: Set[str] = set()
+    regexes: List[str] = []
+    match_all = False
+
+    for pattern in patterns:
+        if pattern in _MATCH_ALL[semantics]:
+            match_all = True
+            continue
+        prefix = _directory_prefix(pattern)
+        if prefix is not None:
+            prefixes.add(prefix)
+        else:
+            regexes.append(to_regex(pattern))
+
+    combined = None
+    if regexes:
+        combined = re.compile("(?:" + "|".join(f"(?:{r})" for r in regexes) + r")\Z")
+    return prefixes, combined, match_all
+
+
+def to_pathspecs(include_patterns: Iterable[str], exclude_patterns: Iterable[str],
+                 semantics: str = "fnmatch") -> Optional[List[str]]:
+    """Traduz os padrões para pathspecs do git, para que o próprio git descarte diffs irrelevantes.
+
+    O resultado é um pré-filtro: pode deixar passar caminhos a mais (o
+    PathFilter continua sendo aplicado), mas nunca descarta um caminho que o
+    PathFilter aceitaria. Por isso só exclusões `dir/**` são enviadas ao git.
+    Inclusões `dir/**` viram pathspecs literais (`dir`); as demais usam
+    `:(glob)`, que só tem a semântica do filtro com `semantics="git"`. Com
+    `fnmatch`, as inclusões só são enviadas quando todas são `dir/**`.
+
+    O git só consulta os filtros de Bloom do commit-graph quando há um único
+    pathspec sem magia. Quando todas as inclusões são diretórios literais, as
+    exclusões que não se sobrepõem a nenhum deles (como as padrão `docs/**` e
+    `.github/**` com `--include 'src/**'`) são omitidas: não mudam o resultado
+    e impediriam o uso dos filtros.
+    Retorna None quando não há restrição a aplicar.
+    """
+    pathspecs: List[str] = []
+
+    include_patterns = list(include_patterns)
+    prefixes = [_directory_prefix(pattern) for pattern in include_patterns]
+    pushable = semantics == "git" or all(prefix is not None for prefix in prefixes)
+    pushed = pushable and bool(include_patterns) and not any(
+        pattern in _MATCH_ALL[semantics] for pattern in include_patterns)
+    if pushed:
+        for pattern, prefix in zip(include_patterns, prefixes):
+            pathspecs.append(prefix if prefix is not None else f":(glob){pattern}")
+    literal_includes = pushed and all(prefix is not None for prefix in prefixes)
+
+    for pattern in exclude_patterns:
+        excluded = _directory_prefix(pattern)
+        if excluded is None:
+            continue
+        if literal_includes and not any(_overlaps(excluded, prefix) for prefix in prefixes):
+            continue
+        pathspecs.append(f":(exclude,glob){pattern}")
+
+    return pathspecs or None
+
+
+def _overlaps(first: str, second: str) -> bool:
+    # Dois diretórios se sobrepõem quando um contém o outro
+    return first == second or first.startswith(second + "/") or second.startswith(first + "/")
+
+
+class PathFilter:
+    """Filtro de include/exclude compilado uma única vez.
+
+    Padrões `dir/**` viram um conjunto de prefixos de diretório, consultado
+    para cada diretório ancestral do caminho (custo proporcional à
+    profundidade, não ao número de padrões). Os demais são combinados numa
+    única regex. As decisões por caminho ficam em um cache LRU limitado.
+    A exclusão tem precedência sobre a inclusão.
+
+    Por padrão os globs têm a semântica do `fnmatch` sobre o caminho inteiro
+    (`*.py` casa em qualquer nível, `**/*` só fora da raiz); com
+    `semantics="git"`, a do pathspec `:(glob)` (ver `glob_to_regex`).
+    """
+
+    def __init__(self, include_patterns: Iterable[str], exclude_patterns: Iterable[str],
+                 cache_size: int = DEFAULT_CACHE_SIZE, semantics: str = "fnmatch"):
+        self._include = _compile(include_patterns, semantics)
+        self._exclude = _compile(exclude_patterns, semantics)
+        self.matches = lru_cache(maxsize=cache_size)(self._evaluate)
+
+    def __call__(self, file_path: str) -> bool:
+        return self.matches(file_path)
+
+    def _evaluate(self, file_path: str) -> bool:
+        if self._matches_any(file_path, self._exclude):
+            return False
+        return self._matches_any(file_path, self._include)
+
+    @staticmethod
+    def _matches_any(file_path: str, compiled) -> bool:
+        prefixes, regex, match_all = compiled
+        if match_all:
+            return True
+        if prefixes:
+            index = file_path.find("/")
+            while index != -1:
+                if file_path[:index] in prefixes:
+                    return True
+                index = file_path.find("/", index + 1)
+        return regex is not None and regex.match(file_path) is not None
@@ -0,0 +1,95 @@
+from array import array
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from busfactor.service.aggregation import AUTHOR_ID_BITS, AUTHOR_ID_MASK
+
+ROOT_PATH = "."
+
+Pairs = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _sum_by_pair(nodes: np.ndarray, authors: np.ndarray, commits: np.ndarray, lines: np.ndarray) -> Pairs:
+    keys = (nodes << AUTHOR_ID_BITS) | authors
+    keys, inverse = np.unique(keys, return_inverse=True)
+    return (
+        keys >> AUTHOR_ID_BITS,
+        keys & AUTHOR_ID_MASK,
+        np.bincount(inverse, weights=commits, minlength=len(keys)).astype(np.int64),
+        np.bincount(inverse, weights=lines, minlength=len(keys)).astype(np.int64),
+    )
+
+
+class PathTrie:
+    """Árvore de diretórios (até `max_depth` níveis) construída a partir dos caminhos dos arquivos.
+
+    Cada nó é um diretório com ID inteiro; o nó 0 é a raiz do repositório.
+    Os pais sempre têm ID menor que os filhos, e os diretórios são criados
+    na ordem em que aparecem os arquivos. Construir a árvore custa um
+    acesso a dicionário por componente de caminho (no máximo `max_depth`
+    por arquivo), então é linear no número de arquivos.
+    """
+
+    def __init__(self, max_depth: int):
+        self.max_depth = max_depth
+        self.paths: List[str] = [ROOT_PATH]
+        self.parents = array("q", [-1])
+        self.depths = array("q", [0])
+        self._children: Dict[Tuple[int, str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def directory_of(self, file_path: str) -> int:
+        """Nó do diretório mais profundo (limitado a `max_depth`) que contém o arquivo."""
+        components = file_path.split("/")[:-1][:self.max_depth]
+        node = 0
+        for depth, name in enumerate(components, start=1):
+            child = self._children.get((node, name))
+            if child is None:
+                child = self._children[(node, name)] = len(self.paths)
+                self.paths.append("/".join(components[:depth]) + "/")
+                self.parents.append(node)
+                self.depths.append(depth)
+            node = child
+        return node
+
+    def add_files(self, file_paths: List[str]) -> np.ndarray:
+        """Nó do diretório de cada arquivo (indexado pelo ID do arquivo)."""
+        directory_of = self.directory_of
+        return np.array([directory_of(path) for path in file_paths], dtype=np.int64)
+
+    def rollup(self, file_nodes: np.ndarray, pairs: Pairs) -> Pairs:
+        """Soma os contadores (arquivo, autor) em cada diretório, numa passada de baixo para cima.
+
+        Os pares de cada arquivo entram no seu diretório; depois, do nível mais
+        profundo para a raiz, os pares de cada nível são somados por (diretório,
+        autor) e repassados ao pai. Cada nível processa no máximo um par por
+        (diretório, autor) vindo dos filhos, sem voltar aos commits. Os pares
+        saem ordenados por diretório (pais antes dos filhos) e, dentro dele,
+        pelo ID do autor, que segue a ordem de aparição no histórico.
+        Os commits de um diretório são a soma dos commits dos seus arquivos.
+        """
+        parents = np.frombuffer(self.parents, dtype=np.int64)
+        depths = np.frombuffer(self.depths, dtype=np.int64)
+        files, authors, commits, lines = pairs
+        nodes = file_nodes[files]
+
+        # Pares agrupados por profundidade do diretório com uma única ordenação
+        by_depth = np.argsort(depths[nodes], kind="stable")
+        bounds = np.cumsum(np.bincount(depths[nodes], minlength=self.max_depth + 1))
+        pending = [[] for _ in range(self.max_depth + 1)]
+        for depth, chunk in enumerate(np.split(by_depth, bounds[:-1])):
+            pending[depth].append((nodes[chunk], authors[chunk], commits[chunk], lines[chunk]))
+
+        levels = []
+        for depth in range(self.max_depth, -1, -1):
+            level = _sum_by_pair(*(np.concatenate(column) for column in zip(*pending[depth])))
+            levels.append(level)
+            if depth:
+                pending[depth - 1].append((parents[level[0]],) + level[1:])
+
+        rolled = tuple(np.concatenate(column) for column in zip(*levels))
+        order = np.argsort(rolled[0], kind="stable")
+        return tuple(column[order] for column in rolled)
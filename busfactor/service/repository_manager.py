@@ -1,27 +1,49 @@
 import subprocess
 import tempfile
 import shutil
+from datetime import datetime, timedelta
+from typing import List
+
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.metrics import MetricsRecorder
+from busfactor.service.mirror_cache import MirrorCache
+
+SUPPORTED_URL_PREFIXES = ('https://github.com/', 'file://')
 
 
 class RepositoryManager:
-    def __init__(self):
+    def __init__(self, metrics: MetricsRecorder = None):
         self.temp_dirs = []
+        self.mirror_locks = {}
+        self.metrics = metrics or MetricsRecorder()
+
+    def clone_repository(self, repo_url: str, config: AnalysisConfig = None) -> str:
+        with self.metrics.repository(repo_url), self.metrics.stage("clone"):
+            return self._clone_repository(repo_url, config)
+
+    def _clone_repository(self, repo_url: str, config: AnalysisConfig = None) -> str:
+        if not self._is_supported_url(repo_url):
+            raise ValueError(
+                f"URL do repositório inválida: {repo_url}; aceitas apenas urls começando com "
+                f"{' ou '.join(SUPPORTED_URL_PREFIXES)}")
+
+        if config is not None and config.mirror_dir:
+            return self._acquire_mirror(repo_url, config)
 
-    def clone_repository(self, repo_url: str) -> str:
         temp_dir = tempfile.mkdtemp(prefix="bus_factor_")
         self.temp_dirs.append(temp_dir)
 
         try:
-            if not self._is_github_url(repo_url):
-                raise ValueError(
-                    "URL do repositório inválida, apenas urls do github sendo repositórios públicos são validos")
+            try:
+                self._run_git(self.build_clone_command(repo_url, temp_dir, config))
+            except subprocess.CalledProcessError as e:
+                # Nenhum commit dentro da janela: basta o último commit para a análise (vazia)
+                if "no commits selected for shallow requests" not in (e.stderr or ""):
+                    raise
+                self._run_git(self.build_clone_command(repo_url, temp_dir, config, depth=1))
 
-            subprocess.run(
-                ['git', 'clone', repo_url, temp_dir],
-                check=True,
-                capture_output=True,
-                text=True
-            )
+            if self._is_partial_history(config):
+                self._deepen_shallow_boundary(temp_dir)
 
             return temp_dir
 
@@ -29,12 +51,106 @@ class RepositoryManager:
             self._cleanup_temp_dir(temp_dir)
             raise Exception(f"Erro ao clonar repositório {repo_url}: {e.stderr}")
 
+    def release_repository(self, repo_path: str):
+        """Libera o repositório após a análise: apaga o clone temporário ou destrava o mirror."""
+        lock = self.mirror_locks.pop(repo_path, None)
+        if lock is not None:
+            lock.release()
+        else:
+            self._cleanup_temp_dir(repo_path)
+
+    def _acquire_mirror(self, repo_url: str, config: AnalysisConfig) -> str:
+        mirror_cache = MirrorCache(
+            config.mirror_dir,
+            max_bytes=config.mirror_max_mb * 1024 * 1024,
+            blobless=self.resolve_clone_mode(config) == "blobless",
+        )
+        try:
+            mirror_path, lock = mirror_cache.acquire(repo_url)
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Erro ao atualizar mirror de {repo_url}: {e.stderr}")
+
+        self.mirror_locks[mirror_path] = lock
+        return mirror_path
+
+    @staticmethod
+    def build_clone_command(repo_url: str, target_dir: str, config: AnalysisConfig = None, depth: int = None) -> List[str]:
+        """Monta o `git clone` conforme o modo de clonagem da configuração.
+
+        - full: clone completo com checkout (comportamento original);
+        - shallow: só o histórico da janela (`--shallow-since`), sem checkout;
+        - blobless: como shallow, mas sem baixar conteúdo de arquivos
+          (`--filter=blob:none`), para análises que só usam metadados;
+        - auto: blobless quando a análise não precisa de linhas, senão shallow;
+          com `--ownership blame`, full (o blame precisa do histórico inteiro).
+
+        A análise lê apenas o banco de objetos (git log), por isso os modos
+        parciais usam `--no-checkout`.
+        """
+        command = ['git', 'clone']
+        clone_mode = RepositoryManager.resolve_clone_mode(config)
+
+        if clone_mode != "full":
+            command.append('--no-checkout')
+            if depth is not None:
+                command.append(f'--depth={depth}')
+            else:
+                since = datetime.now() - timedelta(days=config.days)
+                command.append(f'--shallow-since={since.strftime("%Y-%m-%d %H:%M:%S")}')
+        if clone_mode == "blobless":
+            command.append('--filter=blob:none')
+
+        command.extend([repo_url, target_dir])
+        return command
+
+    @staticmethod
+    def resolve_clone_mode(config: AnalysisConfig = None) -> str:
+        if config is None:
+            return "full"
+        if config.clone_mode == "auto":
+            if config.ownership == "blame":
+                return "full"
+            return "shallow" if config.needs_line_stats else "blobless"
+        if config.clone_mode not in ("full", "shallow", "blobless"):
+            raise ValueError(f"Modo de clonagem não suportado: {config.clone_mode}")
+        return config.clone_mode
+
+    def _is_partial_history(self, config: AnalysisConfig = None) -> bool:
+        return self.resolve_clone_mode(config) != "full"
+
+    def _deepen_shallow_boundary(self, repo_dir: str):
+        # Sem os pais, os commits de fronteira seriam comparados com a árvore vazia
+        # e contariam o repositório inteiro como adicionado. Um nível a mais de
+        # histórico resolve; esses pais ficam fora da janela e são ignorados pelo --since.
+        result = self._run_git(['git', '-C', repo_dir, 'rev-parse', '--is-shallow-repository'])
+        if result.stdout.strip() == "true":
+            self._run_git(['git', '-C', repo_dir, 'fetch', '-q', '--deepen=1', 'origin'])
+
+    @staticmethod
+    def _run_git(command: List[str]) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            command,
+            check=True,
+            capture_output=True,
+            text=True
+        )
+
     def _is_github_url(self, repo_identifier: str) -> bool:
-        return repo_identifier.index('https://github.com/') != -1
+        return repo_identifier.startswith('https://github.com/')
+
+    def _is_supported_url(self, repo_identifier: str) -> bool:
+        return repo_identifier.startswith(SUPPORTED_URL_PREFIXES)
 
     def _cleanup_temp_dir(self, temp_dir: str):
         if temp_dir in self.temp_dirs:
             self.temp_dirs.remove(temp_dir)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def cleanup(self):
+        for temp_dir in list(self.temp_dirs):
+            self._cleanup_temp_dir(temp_dir)
+        for repo_path in list(self.mirror_locks):
+            self.release_repository(repo_path)
 
     def __del__(self):
-        self.temp_dirs.clear()
+        self.cleanup()
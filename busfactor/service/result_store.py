@@ -0,0 +1,284 @@
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from busfactor.models.data_models import AnalysisConfig, RiskAnalysisResult
+from busfactor.service.path_filter import PathFilter, literal_prefix
+
+RESULT_STORE_VERSION = 2
+
+_SCHEMA = f"""
+    PRAGMA user_version = {RESULT_STORE_VERSION};
+    CREATE TABLE IF NOT EXISTS snapshots (
+        id INTEGER PRIMARY KEY,
+        repository TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        days INTEGER,
+        dominance_threshold REAL,
+        metric TEXT,
+        ownership TEXT
+    );
+    CREATE INDEX IF NOT EXISTS snapshots_repository ON snapshots (repository, id);
+
+    CREATE TABLE IF NOT EXISTS results (
+        snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+        repository TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        dominant_author_commits TEXT,
+        dominant_author_lines TEXT,
+        commits_dominance REAL,
+        lines_dominance REAL,
+        total_commits INTEGER,
+        total_lines_changed INTEGER,
+        PRIMARY KEY (snapshot_id, file_path)
+    );
+    CREATE INDEX IF NOT EXISTS results_repository ON results (repository);
+    CREATE INDEX IF NOT EXISTS results_author_commits ON results (dominant_author_commits);
+    CREATE INDEX IF NOT EXISTS results_author_lines ON results (dominant_author_lines);
+    CREATE INDEX IF NOT EXISTS results_path ON results (file_path);
+
+    -- Caminhos e autores dos contadores ficam internados: cada par guarda só IDs inteiros
+    CREATE TABLE IF NOT EXISTS paths (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+    CREATE TABLE IF NOT EXISTS authors (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+    CREATE TABLE IF NOT EXISTS counters (
+        snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+        path_id INTEGER NOT NULL REFERENCES paths (id),
+        position INTEGER NOT NULL,
+        author_id INTEGER NOT NULL REFERENCES authors (id),
+        commits INTEGER NOT NULL,
+        lines INTEGER,
+        PRIMARY KEY (snapshot_id, path_id, position)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS counters_author ON counters (author_id);
+"""
+
+# Colunas aceitas em --sort (o valor vai direto para o ORDER BY)
+SORT_FIELDS = (
+    "commits_dominance", "lines_dominance", "total_commits", "total_lines_changed", "file_path", "repository",
+)
+# Agrupamentos do `query --group-by`: nome -> coluna
+GROUP_FIELDS = {
+    "author": "dominant_author_commits",
+    "repository": "repository",
+}
+
+# Contadores (arquivo, autor, commits, linhas) de um snapshot, na ordem do histórico
+Counters = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class ResultStore:
+    """Banco SQLite com os resultados de cada análise (`--results-db`) para consultas posteriores.
+
+    Cada análise de um repositório vira um snapshot com os arquivos em risco
+    (`results`) e os contadores por arquivo e autor de todos os arquivos
+    analisados (`counters`). Nos contadores, caminhos e autores são
+    internados (`paths`/`authors`), então cada par custa alguns inteiros.
+    Há índices por repositório, autor dominante e caminho nos resultados e
+    por autor nos contadores, então as consultas do `query` leem só as
+    linhas que interessam, sem voltar ao git. Por padrão as consultas usam
+    o snapshot mais recente de cada repositório; `prune` descarta os antigos.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Vários processos (--jobs) podem gravar no mesmo banco: WAL e espera pelo lock
+        self.connection = sqlite3.connect(path, timeout=60)
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, RESULT_STORE_VERSION):
+            self.connection.close()
+            raise ValueError(f"Banco de resultados {path} tem formato {version} (esperado "
+                             f"{RESULT_STORE_VERSION}); use outro arquivo em --results-db")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def save_snapshot(self, repository: str, results: Iterable[RiskAnalysisResult],
+                      file_paths: Sequence[str] = (), author_names: Sequence[str] = (),
+                      counters: Optional[Counters] = None, config: Optional[AnalysisConfig] = None,
+                      with_lines: bool = True, keep: Optional[int] = None) -> int:
+        """Grava um snapshot (resultados e contadores) numa única transação e devolve o seu ID.
+
+        Com `keep`, os snapshots mais antigos do repositório além dos `keep`
+        mais recentes são removidos na mesma transação.
+        """
+        with self.connection:
+            snapshot_id = self.connection.execute(
+                "INSERT INTO snapshots (repository, created_at, days, dominance_threshold, metric, ownership) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (repository, time.time(),
+                 config.days if config else None, config.dominance_threshold if config else None,
+                 config.metric if config else None, config.ownership if config else None),
+            ).lastrowid
+            self.connection.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((snapshot_id, result.repository, result.file_path, result.dominant_author_commits,
+                  result.dominant_author_lines, result.commits_dominance, result.lines_dominance,
+                  result.total_commits, result.total_lines_changed) for result in results),
+            )
+            if counters is not None:
+                files, authors, commits, lines = (column.tolist() for column in counters)
+                path_ids = self._intern("paths", "path", file_paths)
+                author_ids = self._intern("authors", "name", author_names)
+                self.connection.executemany(
+                    "INSERT INTO counters VALUES (?, ?, ?, ?, ?, ?)",
+                    ((snapshot_id, path_ids[file_id], position, author_ids[author_id], file_commits,
+                      file_lines if with_lines else None)
+                     for position, (file_id, author_id, file_commits, file_lines)
+                     in enumerate(zip(files, authors, commits, lines))),
+                )
+            if keep is not None:
+                self._prune(repository, keep)
+        return snapshot_id
+
+    def _intern(self, table: str, column: str, names: Sequence[str]) -> List[int]:
+        # IDs de `names` na tabela de lookup, na mesma ordem (criando os que faltam)
+        self.connection.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)",
+                                    ((name,) for name in names))
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (position INTEGER PRIMARY KEY, name TEXT)")
+        self.connection.execute("DELETE FROM lookup")
+        self.connection.executemany("INSERT INTO lookup VALUES (?, ?)", enumerate(names))
+        return [row_id for row_id, in self.connection.execute(
+            f"SELECT t.id FROM lookup l JOIN {table} t ON t.{column} = l.name ORDER BY l.position")]
+
+    def prune(self, repository: str, keep: int) -> int:
+        """Remove os snapshots do repositório além dos `keep` mais recentes; devolve quantos saíram."""
+        with self.connection:
+            return self._prune(repository, keep)
+
+    def _prune(self, repository: str, keep: int) -> int:
+        if keep < 1:
+            raise ValueError("keep deve manter ao menos um snapshot")
+        old = [snapshot_id for snapshot_id, in self.connection.execute(
+            "SELECT id FROM snapshots WHERE repository = ? ORDER BY id DESC LIMIT -1 OFFSET ?", (repository, keep))]
+        for table, column in (("counters", "snapshot_id"), ("results", "snapshot_id"), ("snapshots", "id")):
+            self.connection.executemany(f"DELETE FROM {table} WHERE {column} = ?",
+                                        ((snapshot_id,) for snapshot_id in old))
+        return len(old)
+
+    def _filters(self, repositories: Optional[List[str]], author: Optional[str], path: Optional[str],
+                 min_dominance: Optional[float], all_snapshots: bool, glob_semantics: str) -> Tuple[str, list]:
+        clauses, params = [], []
+        if not all_snapshots:
+            clauses.append("snapshot_id IN (SELECT MAX(id) FROM snapshots GROUP BY repository)")
+        if repositories:
+            clauses.append(f"repository IN ({', '.join('?' * len(repositories))})")
+            params.extend(repositories)
+        if author is not None:
+            clauses.append("(dominant_author_commits = ? OR dominant_author_lines = ?)")
+            params.extend([author, author])
+        if path is not None:
+            # O prefixo literal do glob vira um intervalo na chave (snapshot_id, file_path);
+            # o casamento exato é o do --include do analyze (PathFilter), não o GLOB do SQLite
+            prefix = literal_prefix(path)
+            if prefix:
+                clauses.append("file_path >= ? AND file_path < ?")
+                params.extend([prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)])
+            self.connection.create_function(
+                "path_matches", 1, PathFilter([path], [], semantics=glob_semantics).matches, deterministic=True)
+            clauses.append("path_matches(file_path)")
+        if min_dominance is not None:
+            clauses.append("MAX(commits_dominance, COALESCE(lines_dominance, 0)) >= ?")
+            params.append(min_dominance)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, repositories: Optional[List[str]] = None, author: Optional[str] = None,
+              path: Optional[str] = None, min_dominance: Optional[float] = None, all_snapshots: bool = False,
+              sort: str = "commits_dominance", descending: bool = True,
+              limit: Optional[int] = None, glob_semantics: str = "fnmatch") -> List[RiskAnalysisResult]:
+        """Arquivos em risco salvos que passam pelos filtros.
+
+        `path` é um glob com a mesma semântica do `--include` (`glob_semantics`).
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Campo de ordenação não suportado: {sort}")
+        where, params = self._filters(repositories, author, path, min_dominance, all_snapshots, glob_semantics)
+        sql = (
+            "SELECT snapshot_id, repository, file_path, dominant_author_commits, dominant_author_lines, "
+            "commits_dominance, lines_dominance, total_commits, total_lines_changed FROM results"
+            f"{where} ORDER BY {sort} {'DESC' if descending else 'ASC'}, repository, file_path"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self.connection.execute(sql, params).fetchall()
+        authors = self.authors_of([(snapshot_id, fields[1]) for snapshot_id, *fields in rows])
+        return [
+            RiskAnalysisResult(
+                repository=fields[0],
+                file_path=fields[1],
+                dominant_author_commits=fields[2],
+                dominant_author_lines=fields[3],
+                commits_dominance=fields[4],
+                lines_dominance=fields[5],
+                total_commits=fields[6],
+                total_lines_changed=fields[7],
+                all_authors=authors.get((snapshot_id, fields[1]), []),
+            )
+            for snapshot_id, *fields in rows
+        ]
+
+    def authors_of(self, files: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], List[str]]:
+        """Autores de cada (snapshot, arquivo), na ordem em que apareceram no histórico, numa única consulta."""
+        self.connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS wanted (snapshot_id INTEGER, path TEXT, PRIMARY KEY (snapshot_id, path))")
+        self.connection.execute("DELETE FROM wanted")
+        self.connection.executemany("INSERT OR IGNORE INTO wanted VALUES (?, ?)", files)
+        authors: Dict[Tuple[int, str], List[str]] = {}
+        for snapshot_id, path, name in self.connection.execute(
+                # CROSS JOIN fixa a ordem: parte dos arquivos pedidos e busca cada um pela chave de counters
+                "SELECT w.snapshot_id, w.path, a.name FROM wanted w CROSS JOIN paths p ON p.path = w.path "
+                "CROSS JOIN counters c ON c.snapshot_id = w.snapshot_id AND c.path_id = p.id "
+                "JOIN authors a ON a.id = c.author_id ORDER BY w.snapshot_id, w.path, c.position"):
+            authors.setdefault((snapshot_id, path), []).append(name)
+        return authors
+
+    def aggregate(self, group_by: str, repositories: Optional[List[str]] = None, author: Optional[str] = None,
+                  path: Optional[str] = None, min_dominance: Optional[float] = None, all_snapshots: bool = False,
+                  limit: Optional[int] = None, glob_semantics: str = "fnmatch") -> List[dict]:
+        """Arquivos em risco e dominância média por autor dominante ou por repositório."""
+        try:
+            column = GROUP_FIELDS[group_by]
+        except KeyError:
+            raise ValueError(f"Agrupamento não suportado: {group_by}")
+        where, params = self._filters(repositories, author, path, min_dominance, all_snapshots, glob_semantics)
+        sql = (
+            f"SELECT {column}, COUNT(*) AS risky_files, COUNT(DISTINCT repository) AS repositories, "
+            "AVG(commits_dominance) AS commits_dominance, AVG(lines_dominance) AS lines_dominance "
+            f"FROM results{where} GROUP BY {column} ORDER BY risky_files DESC, {column}"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        keys = (group_by, "risky_files", "repositories", "commits_dominance", "lines_dominance")
+        return [dict(zip(keys, row)) for row in self.connection.execute(sql, params)]
+
+    def files_touched_by(self, author: str, repositories: Optional[List[str]] = None, all_snapshots: bool = False,
+                         limit: Optional[int] = None) -> List[Tuple[str, str, int, int]]:
+        """(repositório, arquivo, commits, linhas) dos arquivos com contadores do autor (`query --touched-by`)."""
+        latest = "" if all_snapshots else \
+            " AND c.snapshot_id IN (SELECT MAX(id) FROM snapshots GROUP BY repository)"
+        params: list = [author]
+        if repositories:
+            latest += f" AND s.repository IN ({', '.join('?' * len(repositories))})"
+            params.extend(repositories)
+        sql = (
+            "SELECT s.repository, p.path, c.commits, c.lines FROM counters c "
+            "JOIN snapshots s ON s.id = c.snapshot_id JOIN paths p ON p.id = c.path_id "
+            f"WHERE c.author_id = (SELECT id FROM authors WHERE name = ?){latest} "
+            "ORDER BY c.commits DESC, s.repository, p.path"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.connection.execute(sql, params).fetchall()
@@ -0,0 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.aggregation import AggregationStore
+
+# Abaixo disso o custo de subir processos supera o ganho do paralelismo
+MIN_COMMITS_PER_SHARD = 200
+
+
+def split_into_shards(commits: List[str], shards: int, min_size: Optional[int] = None) -> List[List[str]]:
+    """Divide a lista ordenada de commits em faixas contíguas de tamanho semelhante."""
+    min_size = MIN_COMMITS_PER_SHARD if min_size is None else min_size
+    shards = max(1, min(shards, len(commits) // max(min_size, 1)))
+    size, remainder = divmod(len(commits), shards)
+
+    result = []
+    start = 0
+    for index in range(shards):
+        end = start + size + (1 if index < remainder else 0)
+        result.append(commits[start:end])
+        start = end
+    return result
+
+
+def _collect_shard(repo_path: str, config: AnalysisConfig, commits: List[str]) -> AggregationStore:
+    # Import local: o analisador importa este módulo
+    from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+
+    return BusFactorAnalyzer(config).collect_aggregates(repo_path, commits=commits)
+
+
+def collect_sharded_aggregates(repo_path: str, config: AnalysisConfig, shards: List[List[str]]) -> AggregationStore:
+    """Percorre cada faixa de commits em um processo e mescla os parciais na ordem das faixas."""
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        partials = executor.map(
+            _collect_shard,
+            [repo_path] * len(shards),
+            [config] * len(shards),
+            shards,
+        )
+        merged = next(partials)
+        for partial in partials:
+            merged.merge(partial)
+        return merged
@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from busfactor.service.aggregation import AUTHOR_ID_BITS, AUTHOR_ID_MASK, AggregationStore
+
+# Bytes por par em memória: chave, commits, linhas e primeira aparição (int64 cada)
+PAIR_BYTES = 32
+# Linhas lidas do SQLite por vez ao materializar os pares
+FETCH_ROWS = 1 << 16
+
+_UPSERT = """
+    INSERT INTO pairs (key, commits, lines, first_seen) VALUES (?, ?, ?, ?)
+    ON CONFLICT(key) DO UPDATE SET
+        commits = commits + excluded.commits,
+        lines = lines + excluded.lines,
+        first_seen = MIN(first_seen, excluded.first_seen)
+"""
+
+# Dominância de todos os arquivos em uma consulta: totais por arquivo e o par
+# com mais commits/linhas (empate: o que apareceu primeiro no histórico)
+_DOMINANCE = f"""
+    WITH ranked AS (
+        SELECT key >> {AUTHOR_ID_BITS} AS file, key & {AUTHOR_ID_MASK} AS author, commits, lines,
+               SUM(commits) OVER by_file AS total_commits,
+               SUM(lines) OVER by_file AS total_lines,
+               ROW_NUMBER() OVER (PARTITION BY key >> {AUTHOR_ID_BITS} ORDER BY commits DESC, first_seen)
+                   AS commit_rank,
+               ROW_NUMBER() OVER (PARTITION BY key >> {AUTHOR_ID_BITS} ORDER BY lines DESC, first_seen)
+                   AS line_rank
+        FROM pairs
+        WINDOW by_file AS (PARTITION BY key >> {AUTHOR_ID_BITS})
+    ),
+    top_commits AS (
+        SELECT file, author, commits, total_commits, total_lines FROM ranked WHERE commit_rank = 1
+    ),
+    top_lines AS (
+        SELECT file, author, lines FROM ranked WHERE line_rank = 1
+    )
+    SELECT c.file, c.author, c.commits, c.total_commits, l.author, l.lines, c.total_lines
+    FROM top_commits c JOIN top_lines l ON l.file = c.file
+    WHERE (c.total_commits > 0 AND CAST(c.commits AS REAL) / c.total_commits >= :threshold)
+       OR (c.total_lines > 0 AND CAST(l.lines AS REAL) / c.total_lines >= :threshold)
+    ORDER BY c.file
+"""
+
+# (arquivo, autor dominante por commits, commits dele, total de commits,
+#  autor dominante por linhas, linhas dele, total de linhas)
+DominanceRow = Tuple[int, int, int, int, int, int, int]
+
+
+class SpillingAggregationStore(AggregationStore):
+    """`AggregationStore` com teto de memória para os pares (`--max-memory`).
+
+    Quando os arrays de pares passam do limite, eles são despejados num
+    arquivo SQLite temporário em lote (um upsert por par, na ordem da
+    chave) e a memória é liberada; os contadores de um mesmo par em vários
+    despejos são somados pelo próprio SQLite. A tabela `pairs` tem a chave
+    do par como chave primária (`WITHOUT ROWID`), então arquivo e autor
+    ficam agrupados no disco e a busca dos autores de um arquivo é uma
+    leitura por faixa.
+
+    Continuam em memória só os índices de caminhos/autores (um dicionário
+    por nome) e os eventos ainda não compactados. A dominância pode ser
+    calculada direto no SQLite (`risky_files`), sem trazer os pares de
+    volta. Janelas, truck factor, rollup, índice, blame e `--results-db`
+    usam `pairs_in_history_order`, que traz todos os pares de volta para a
+    memória: nesses modos o limite não vale para o pico (a CLI avisa).
+    """
+
+    __slots__ = ("max_pairs", "spilled", "_spill_path", "_connection")
+
+    def __init__(self, max_bytes: int, spill_dir: Optional[str] = None):
+        super().__init__()
+        # Metade do limite para os pares; a outra metade cobre as cópias da compactação
+        self.max_pairs = max(1, max_bytes // (2 * PAIR_BYTES))
+        self.spilled = 0
+        fd, self._spill_path = tempfile.mkstemp(prefix="bus_factor_spill_", suffix=".sqlite", dir=spill_dir)
+        os.close(fd)
+        self._connection = sqlite3.connect(self._spill_path)
+        # Arquivo descartável: sem journal nem fsync
+        self._connection.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            PRAGMA temp_store = FILE;
+            CREATE TABLE pairs (
+                key INTEGER PRIMARY KEY,
+                commits INTEGER NOT NULL,
+                lines INTEGER NOT NULL,
+                first_seen INTEGER NOT NULL
+            ) WITHOUT ROWID;
+        """)
+
+    def flush(self):
+        super().flush()
+        if len(self.pair_keys) > self.max_pairs:
+            self._spill()
+
+    def _spill(self):
+        if not len(self.pair_keys):
+            return
+        with self._connection:
+            self._connection.executemany(_UPSERT, zip(
+                self.pair_keys.tolist(), self.pair_commits.tolist(),
+                self.pair_lines.tolist(), self.pair_first_seen.tolist()))
+        self.spilled += len(self.pair_keys)
+        self.pair_keys = np.empty(0, dtype=np.int64)
+        self.pair_commits = np.empty(0, dtype=np.int64)
+        self.pair_lines = np.empty(0, dtype=np.int64)
+        self.pair_first_seen = np.empty(0, dtype=np.int64)
+
+    def spill_all(self):
+        """Leva todos os pares para o SQLite e aplica as uniões de renomeação pendentes lá."""
+        self.flush()
+        self._spill()
+        roots = self._file_roots()
+        absorbed = np.flatnonzero(roots != np.arange(len(roots), dtype=np.int64))
+        if not len(absorbed):
+            return
+        with self._connection:
+            self._connection.execute("CREATE TEMP TABLE IF NOT EXISTS roots (file INTEGER PRIMARY KEY, root INTEGER)")
+            self._connection.execute("DELETE FROM roots")
+            self._connection.executemany(
+                "INSERT INTO roots VALUES (?, ?)", zip(absorbed.tolist(), roots[absorbed].tolist()))
+            # Pares de IDs absorvidos passam para a identidade (somando) e saem da tabela
+            self._connection.execute(f"""
+                INSERT INTO pairs (key, commits, lines, first_seen)
+                SELECT (r.root << {AUTHOR_ID_BITS}) | (p.key & {AUTHOR_ID_MASK}), p.commits, p.lines, p.first_seen
+                FROM pairs p JOIN roots r ON r.file = p.key >> {AUTHOR_ID_BITS}
+                WHERE true
+                ON CONFLICT(key) DO UPDATE SET
+                    commits = commits + excluded.commits,
+                    lines = lines + excluded.lines,
+                    first_seen = MIN(first_seen, excluded.first_seen)
+            """)
+            self._connection.execute(
+                f"DELETE FROM pairs WHERE key >> {AUTHOR_ID_BITS} IN (SELECT file FROM roots)")
+
+    def risky_files(self, threshold: float) -> Iterator[DominanceRow]:
+        """Arquivos em risco, calculados no SQLite, em ordem de ID (mesmo critério de `DominanceTable`)."""
+        self.spill_all()
+        yield from self._connection.execute(_DOMINANCE, {"threshold": threshold})
+
+    def authors_of(self, file_id: int) -> List[int]:
+        """IDs dos autores do arquivo, na ordem em que apareceram no histórico."""
+        start = file_id << AUTHOR_ID_BITS
+        rows = self._connection.execute(
+            "SELECT key FROM pairs WHERE key BETWEEN ? AND ? ORDER BY first_seen",
+            (start, start | AUTHOR_ID_MASK))
+        return [key & AUTHOR_ID_MASK for key, in rows]
+
+    def pairs_in_history_order(self):
+        # Lido em blocos direto para os arrays finais: o pico é ~24 bytes por par mais um bloco
+        self.spill_all()
+        n_pairs = self._connection.execute("SELECT COUNT(*) FROM pairs").fetchone()[0]
+        keys = np.empty(n_pairs, dtype=np.int64)
+        commits = np.empty(n_pairs, dtype=np.int64)
+        lines = np.empty(n_pairs, dtype=np.int64)
+        cursor = self._connection.execute("SELECT key, commits, lines FROM pairs ORDER BY first_seen")
+        start = 0
+        while True:
+            rows = cursor.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            block = np.array(rows, dtype=np.int64)
+            end = start + len(block)
+            keys[start:end], commits[start:end], lines[start:end] = block.T
+            start = end
+        return keys >> AUTHOR_ID_BITS, keys & AUTHOR_ID_MASK, commits, lines
+
+    def merge(self, other: AggregationStore) -> AggregationStore:
+        # Os pares já despejados não têm como ser remapeados pelos IDs de outro store
+        raise TypeError("SpillingAggregationStore não mescla faixas do histórico (use um único percurso)")
+
+    def close(self):
+        self._connection.close()
+        if os.path.exists(self._spill_path):
+            os.remove(self._spill_path)
+
+    def __getstate__(self):
+        raise TypeError("SpillingAggregationStore guarda uma conexão SQLite e não pode ser serializado")
@@ -0,0 +1,84 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import numpy as np
+
+from busfactor.service.aggregation import AUTHOR_ID_BITS, AUTHOR_ID_MASK
+from busfactor.service.analysis_cache import day_of
+
+# Numa análise multi-janela o bucket de tempo vai nos bits altos do ID do autor
+BUCKET_SHIFT = 24
+AUTHOR_MASK = (1 << BUCKET_SHIFT) - 1
+MAX_WINDOWS = (1 << (AUTHOR_ID_BITS - BUCKET_SHIFT)) - 1
+
+WindowPairs = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class TimeWindows:
+    """Janelas de análise (em dias) que terminam no mesmo instante.
+
+    O histórico é dividido em buckets delimitados pelos inícios das janelas:
+    o bucket 0 tem os commits da menor janela, o bucket k os que entram na
+    janela k mas não na k-1. Assim a janela k é a soma (prefixa) dos buckets
+    0..k, e todas as janelas saem de um único percurso do histórico.
+    """
+
+    def __init__(self, days: List[int], now: datetime):
+        self.days = sorted(set(days))
+        if len(self.days) > MAX_WINDOWS:
+            raise ValueError(f"No máximo {MAX_WINDOWS} janelas por análise")
+        self.starts = [int((now - timedelta(days=d)).timestamp()) for d in self.days]
+        self._ascending_starts = self.starts[::-1]
+        self._ascending_start_days = [day_of(start) for start in self._ascending_starts]
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def bucket_of(self, timestamp: int) -> int:
+        """Bucket do commit; `len(self)` quando ele é anterior à maior janela."""
+        return len(self.days) - bisect_right(self._ascending_starts, timestamp)
+
+    def bucket_of_day(self, day: int) -> int:
+        """Como `bucket_of`, com as janelas arredondadas para o início do dia (cache incremental)."""
+        return len(self.days) - bisect_right(self._ascending_start_days, day)
+
+
+def window_pairs(files: np.ndarray, tagged_authors: np.ndarray, commits: np.ndarray, lines: np.ndarray,
+                 n_windows: int) -> List[WindowPairs]:
+    """Pares (arquivo, autor, commits, linhas) de cada janela, a partir dos pares por bucket.
+
+    A entrada vem de `AggregationStore.pairs_in_history_order()` com o bucket
+    embutido no autor. Os contadores por bucket viram somas prefixas; a
+    primeira aparição de cada par numa janela é o mínimo acumulado das
+    posições, então a saída de cada janela segue a mesma ordem de histórico
+    que uma análise só daquela janela produziria.
+    """
+    buckets = tagged_authors >> BUCKET_SHIFT
+    keys = (files << AUTHOR_ID_BITS) | (tagged_authors & AUTHOR_MASK)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    shape = (len(unique_keys), n_windows + 1)
+
+    commits_by_bucket = np.zeros(shape, dtype=np.int64)
+    lines_by_bucket = np.zeros(shape, dtype=np.int64)
+    first_seen = np.full(shape, len(keys), dtype=np.int64)
+    np.add.at(commits_by_bucket, (inverse, buckets), commits)
+    np.add.at(lines_by_bucket, (inverse, buckets), lines)
+    np.minimum.at(first_seen, (inverse, buckets), np.arange(len(keys), dtype=np.int64))
+
+    commits_by_window = np.cumsum(commits_by_bucket, axis=1)
+    lines_by_window = np.cumsum(lines_by_bucket, axis=1)
+    first_seen = np.minimum.accumulate(first_seen, axis=1)
+
+    windows = []
+    for window in range(n_windows):
+        present = np.flatnonzero(commits_by_window[:, window] > 0)
+        order = present[np.argsort(first_seen[present, window], kind="stable")]
+        window_keys = unique_keys[order]
+        windows.append((
+            window_keys >> AUTHOR_ID_BITS,
+            window_keys & AUTHOR_ID_MASK,
+            commits_by_window[order, window],
+            lines_by_window[order, window],
+        ))
+    return windows
@@ -0,0 +1,82 @@
+import heapq
+from typing import List, Tuple
+
+import numpy as np
+
+from busfactor.models.data_models import FileAnalysis, TruckFactorResult
+
+# Autor "conhece" o arquivo se tem ao menos essa fração dos commits do autor principal
+# (mesma normalização do grau de autoria usado no cálculo clássico do truck factor)
+AUTHORSHIP_RATIO = 0.75
+# O truck factor é o número de autores removidos até que mais dessa fração dos arquivos fique órfã
+ORPHAN_SHARE = 0.5
+
+
+def file_authorship(files: np.ndarray, authors: np.ndarray, commits: np.ndarray, n_files: int,
+                    ratio: float = AUTHORSHIP_RATIO) -> Tuple[np.ndarray, np.ndarray]:
+    """Pares (arquivo, autor) em que o autor é considerado dono do conhecimento do arquivo."""
+    top = np.zeros(n_files, dtype=np.int64)
+    np.maximum.at(top, files, commits)
+    owners = (commits > 0) & (commits >= ratio * top[files])
+    return files[owners], authors[owners]
+
+
+def truck_factor(files: np.ndarray, authors: np.ndarray, commits: np.ndarray, n_files: int,
+                 author_names: List[str], repository: str = "",
+                 ratio: float = AUTHORSHIP_RATIO, orphan_share: float = ORPHAN_SHARE) -> TruckFactorResult:
+    """Truck factor do repositório pela remoção gulosa do autor que cobre mais arquivos.
+
+    Cada passo retira o autor com mais arquivos (heap de cobertura) e
+    decrementa o número de donos restantes só dos arquivos dele; um arquivo
+    fica órfão quando esse número chega a zero. Um autor ainda presente
+    nunca tem arquivos órfãos, então a cobertura dos demais não muda entre
+    passos e nenhum passo percorre todos os arquivos: o custo total é
+    O(pares + passos × log autores).
+    """
+    owned_files, owners = file_authorship(files, authors, commits, n_files, ratio)
+    n_authors = len(author_names)
+    remaining = np.bincount(owned_files, minlength=n_files)
+    coverage = np.bincount(owners, minlength=n_authors)
+
+    # Arquivos de cada autor, agrupados (CSR)
+    order = np.argsort(owners, kind="stable")
+    files_by_author = owned_files[order]
+    starts = np.cumsum(coverage) - coverage
+
+    covered = int(np.count_nonzero(remaining))
+    limit = orphan_share * covered
+    heap = [(-int(count), author) for author, count in enumerate(coverage.tolist()) if count]
+    heapq.heapify(heap)
+
+    removed: List[str] = []
+    orphaned = 0
+    while heap and orphaned <= limit:
+        _, author = heapq.heappop(heap)
+        author_files = files_by_author[starts[author]:starts[author] + coverage[author]]
+        remaining[author_files] -= 1
+        orphaned += int(np.count_nonzero(remaining[author_files] == 0))
+        removed.append(author_names[author])
+
+    return TruckFactorResult(
+        repository=repository,
+        truck_factor=len(removed),
+        total_files=covered,
+        orphaned_files=orphaned,
+        removed_authors=removed,
+    )
+
+
+def truck_factor_from_analyses(file_analyses: List[FileAnalysis], repository: str = "",
+                               **kwargs) -> TruckFactorResult:
+    """Mesmo cálculo a partir dos `FileAnalysis` (commits por autor de cada arquivo)."""
+    author_ids = {}
+    files, authors, commits = [], [], []
+    for file_id, analysis in enumerate(file_analyses):
+        for author, count in analysis.commits_by_author.items():
+            files.append(file_id)
+            authors.append(author_ids.setdefault(author, len(author_ids)))
+            commits.append(count)
+
+    return truck_factor(
+        np.array(files, dtype=np.int64), np.array(authors, dtype=np.int64), np.array(commits, dtype=np.int64),
+        len(file_analyses), list(author_ids), repository, **kwargs)
@@ -0,0 +1,76 @@
+import os
+import subprocess
+
+import pytest
+
+
+def _git(repo, *args, author="Alice", date=None):
+    env = dict(os.environ)
+    if date is not None:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = date
+    subprocess.run(
+        ["git", "-C", str(repo),
+         "-c", f"user.name={author}", "-c", f"user.email={author.lower()}@example.com",
+         "-c", "commit.gpgsign=false", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+def _commit(repo, author, message, files=None, removed=None, date=None):
+    for path, content in (files or {}).items():
+        target = repo / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            target.write_bytes(content)
+        else:
+            target.write_text(content)
+    for path in removed or []:
+        _git(repo, "rm", "-q", path)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "--allow-empty", "-m", message, author=author, date=date)
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """Repositório git local com vários autores, renomeação, binário e merge."""
+    repo = tmp_path / "sample_repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+
+    _commit(repo, "Alice", "initial", {
+        "src/main.py": "print('a')\n" * 10,
+        "src/utils.py": "x = 1\n",
+        "docs/index.md": "# docs\n",
+        "dir with space/file name.txt": "hello\n",
+    })
+    _commit(repo, "Bob", "utils", {"src/utils.py": "x = 1\ny = 2\nz = 3\n"})
+    _commit(repo, "Alice", "main again", {"src/main.py": "print('b')\n" * 12})
+    _commit(repo, "Carol", "binary", {"assets/logo.bin": b"\x00\x01\x02\x03"})
+
+    _git(repo, "checkout", "-q", "-b", "feature")
+    _commit(repo, "Bob", "feature work", {"src/feature.py": "def f():\n    return 1\n"})
+    _git(repo, "checkout", "-q", "main")
+    _commit(repo, "Alice", "main work", {"src/main.py": "print('c')\n" * 12})
+    _git(repo, "merge", "-q", "--no-ff", "--no-edit", "feature", author="Alice")
+
+    _git(repo, "mv", "src/utils.py", "src/helpers.py")
+    _commit(repo, "Bob", "rename utils")
+    _commit(repo, "Carol", "remove docs", removed=["docs/index.md"])
+    _commit(repo, "Alice", "empty commit")
+
+    return repo
+
+
+@pytest.fixture
+def git_commit():
+    """Helper para criar commits adicionais em repositórios de teste."""
+    return _commit
+
+
+@pytest.fixture
+def git_cmd():
+    """Helper para executar comandos git arbitrários em repositórios de teste."""
+    return _git
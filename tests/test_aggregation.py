@@ -0,0 +1,59 @@
+import pickle
+
+from busfactor.models.data_models import FileAnalysis
+from busfactor.service.aggregation import AggregationStore
+
+
+def _store(events):
+    store = AggregationStore()
+    for path, author, lines in events:
+        store.add(path, store.intern_author(author), lines)
+    return store
+
+
+EVENTS = [
+    ("a.py", "Alice", 10),
+    ("b.py", "Bob", 3),
+    ("a.py", "Bob", 5),
+    ("a.py", "Alice", 1),
+    ("c.py", "Carol", 7),
+]
+
+
+def test_interning_assigns_sequential_ids():
+    store = AggregationStore()
+
+    assert store.intern_author("Alice") == 0
+    assert store.intern_author("Bob") == 1
+    assert store.intern_author("Alice") == 0
+    assert store.intern_file("x.py") == 0
+    assert len(store) == 1
+
+
+def test_to_file_analyses_preserves_first_seen_order():
+    analyses = _store(EVENTS).to_file_analyses("repo")
+
+    assert [a.file_path for a in analyses] == ["a.py", "b.py", "c.py"]
+    assert analyses[0] == FileAnalysis(
+        file_path="a.py",
+        repository="repo",
+        total_commits=3,
+        total_lines_changed=16,
+        commits_by_author={"Alice": 2, "Bob": 1},
+        lines_by_author={"Alice": 11, "Bob": 5},
+    )
+    assert list(analyses[0].commits_by_author) == ["Alice", "Bob"]
+
+
+def test_merge_in_order_matches_single_pass():
+    merged = _store(EVENTS[:2]).merge(_store(EVENTS[2:]))
+
+    assert merged.to_file_analyses("repo") == _store(EVENTS).to_file_analyses("repo")
+
+
+def test_store_is_picklable():
+    store = _store(EVENTS)
+
+    restored = pickle.loads(pickle.dumps(store))
+
+    assert restored.to_file_analyses("repo") == store.to_file_analyses("repo")
@@ -0,0 +1,86 @@
+from busfactor.models.data_models import AnalysisConfig, CommitRecord, FileModification
+from busfactor.service.analysis_cache import AnalysisCache, CachedHistory
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.history_backend import GitLogBackend
+
+
+class RecordingBackend(GitLogBackend):
+    def __init__(self):
+        self.calls = []
+
+    def iter_commits(self, repo_path, since=None, revision_range=None):
+        self.calls.append(revision_range)
+        return super().iter_commits(repo_path, since=since, revision_range=revision_range)
+
+
+def _analyze(repo, cache_dir=None, backend=None):
+    config = AnalysisConfig(dominance_threshold=0.0, cache_dir=cache_dir)
+    return BusFactorAnalyzer(config, history_backend=backend).analyze_repository(str(repo), "sample")
+
+
+def test_cached_history_roundtrip():
+    history = CachedHistory("repo", since_day=0)
+    history.add_commit(CommitRecord("abc", "Alice", 86400 * 3, [FileModification("a.py", None, 2, 1)]))
+    history.add_commit(CommitRecord("def", "Bob", 86400 * 5, [FileModification("a.py", "a.py", 1, 0)]))
+    history.head = "def"
+
+    restored = CachedHistory.from_dict(history.to_dict())
+
+    assert restored.files == history.files
+    analyses = restored.to_file_analyses(lambda path: True, since_day=4)
+    assert len(analyses) == 1
+    assert analyses[0].commits_by_author == {"Bob": 1}
+    assert analyses[0].total_lines_changed == 1
+
+
+def test_cache_ignores_other_repository_and_corrupted_files(tmp_path):
+    cache = AnalysisCache(str(tmp_path))
+    cache.save(CachedHistory("repo", since_day=0, head="abc"))
+
+    assert cache.load("repo").head == "abc"
+    assert cache.load("other") is None
+
+    cache.path_for("repo").write_text("{not json")
+    assert cache.load("repo") is None
+
+
+def test_first_run_populates_cache(git_repo, tmp_path):
+    cache_dir = tmp_path / "cache"
+
+    assert _analyze(git_repo, str(cache_dir)) == _analyze(git_repo)
+    assert AnalysisCache(str(cache_dir)).load("sample") is not None
+
+
+def test_incremental_run_only_traverses_new_commits(git_repo, git_commit, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    _analyze(git_repo, cache_dir)
+    previous_head = AnalysisCache(cache_dir).load("sample").head
+
+    git_commit(git_repo, "Dave", "new work", {"src/main.py": "print('d')\n"})
+    backend = RecordingBackend()
+    results = _analyze(git_repo, cache_dir, backend)
+
+    assert backend.calls == [f"{previous_head}..{AnalysisCache(cache_dir).load('sample').head}"]
+    assert results == _analyze(git_repo)
+
+
+def test_unchanged_head_skips_traversal(git_repo, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    expected = _analyze(git_repo, cache_dir)
+
+    backend = RecordingBackend()
+    assert _analyze(git_repo, cache_dir, backend) == expected
+    assert backend.calls == []
+
+
+def test_rewritten_history_triggers_full_recompute(git_repo, git_commit, git_cmd, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    _analyze(git_repo, cache_dir)
+
+    git_cmd(git_repo, "reset", "-q", "--hard", "HEAD~3")
+    git_commit(git_repo, "Erin", "rewritten", {"src/other.py": "pass\n"})
+    backend = RecordingBackend()
+    results = _analyze(git_repo, cache_dir, backend)
+
+    assert backend.calls == [None]
+    assert results == _analyze(git_repo)
@@ -0,0 +1,95 @@
+import subprocess
+
+import pytest
+
+from busfactor.models import AnalysisConfig
+from busfactor.service import blame_ownership
+from busfactor.service.blame_ownership import BlameOwnership, parse_blame_porcelain
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+
+
+@pytest.fixture
+def blame_calls(monkeypatch):
+    """Registra os arquivos que passaram de fato pelo `git blame`."""
+    calls = []
+    original = blame_ownership.blame_file
+
+    def recording_blame(repo_path, path):
+        calls.append(path)
+        return original(repo_path, path)
+
+    monkeypatch.setattr(blame_ownership, "blame_file", recording_blame)
+    return calls
+
+
+def test_parse_porcelain_reuses_commit_headers():
+    output = "\n".join([
+        f"{SHA_A} 1 1 2", "author Alice", "author-mail <a@x>", "summary one two", "filename f.py", "\tx = 1",
+        f"{SHA_A} 2 2", "\ty = 2",
+        f"{SHA_B} 1 3 1", "author Bob", "previous " + SHA_A + " f.py", "filename f.py", "\tz = 3",
+        f"{SHA_A} 3 4 1", "\tw = 4",
+    ])
+
+    assert parse_blame_porcelain(output) == {"Alice": 3, "Bob": 1}
+
+
+def test_surviving_lines_of_head(git_repo):
+    surviving = BlameOwnership().surviving_lines(str(git_repo), ["src/helpers.py", "src/main.py", "docs/index.md"])
+
+    assert surviving == {"src/helpers.py": {"Alice": 1, "Bob": 2}, "src/main.py": {"Alice": 12}}
+
+
+def test_cache_blames_only_changed_blobs(git_repo, git_commit, tmp_path, blame_calls):
+    paths = ["src/helpers.py", "src/main.py", "src/feature.py"]
+    ownership = BlameOwnership(str(tmp_path / "blame"))
+    first = ownership.surviving_lines(str(git_repo), paths)
+
+    git_commit(git_repo, "Carol", "edit main", {"src/main.py": "print('c')\n" * 12 + "print('d')\n"})
+    second = ownership.surviving_lines(str(git_repo), paths)
+
+    assert sorted(blame_calls) == sorted(paths + ["src/main.py"])
+    assert second["src/helpers.py"] == first["src/helpers.py"]
+    assert second["src/main.py"] == {"Alice": 12, "Carol": 1}
+
+
+def test_forks_reuse_cached_blame(git_repo, tmp_path, blame_calls):
+    fork = tmp_path / "fork"
+    subprocess.run(["git", "clone", "-q", str(git_repo), str(fork)], check=True)
+    ownership = BlameOwnership(str(tmp_path / "blame"))
+
+    original = ownership.surviving_lines(str(git_repo), ["src/main.py"])
+    forked = ownership.surviving_lines(str(fork), ["src/main.py"])
+
+    assert blame_calls == ["src/main.py"]
+    assert forked == original
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"cache_dir": True}, {"windows": [1, 9000]}, {"group_by_depth": 1}])
+def test_analyzer_uses_surviving_lines(git_repo, tmp_path, kwargs):
+    if kwargs.get("cache_dir"):
+        kwargs = {**kwargs, "cache_dir": str(tmp_path / "cache")}
+    config = AnalysisConfig(include_patterns=["src/**"], exclude_patterns=[], dominance_threshold=0.0,
+                            ownership="blame", blame_jobs=2, **kwargs)
+    history = BusFactorAnalyzer(AnalysisConfig(include_patterns=["src/**"], exclude_patterns=[],
+                                                dominance_threshold=0.0, **kwargs))
+
+    results = {r.file_path: r for r in BusFactorAnalyzer(config).analyze_repository(str(git_repo), "repo")}
+    by_history = {r.file_path: r for r in history.analyze_repository(str(git_repo), "repo")}
+
+    key = "src/" if "group_by_depth" in kwargs else "src/helpers.py"
+    # helpers.py (3) + main.py (12) + feature.py (2)
+    expected_lines = 17 if "group_by_depth" in kwargs else 3
+    assert results[key].total_lines_changed == expected_lines
+    assert results[key].total_commits == by_history[key].total_commits
+    assert results[key].commits_dominance == by_history[key].commits_dominance
+    if key == "src/helpers.py":
+        assert results[key].dominant_author_lines == "Bob"
+        assert results[key].lines_dominance == pytest.approx(2 / 3)
+
+
+def test_unknown_ownership_mode():
+    with pytest.raises(ValueError):
+        BusFactorAnalyzer(AnalysisConfig(ownership="survival"))
@@ -2,7 +2,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from busfactor.models.data_models import AnalysisConfig
+from busfactor.models.data_models import AnalysisConfig, FileAnalysis
 from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
 
 
@@ -18,24 +18,19 @@ def test_should_include_file():
     assert analyzer.should_include_file("tests/test_main.py") is False
 
 
-def test_include_new_file_and_add_author_and_identify_risky():
+def test_identify_risky_files():
     cfg = AnalysisConfig(dominance_threshold=0.5)
     analyzer = BusFactorAnalyzer(cfg)
 
-    file_stats = {}
-    analyzer.include_new_file_in_list("a.py", file_stats, "repo1")
-    assert "a.py" in file_stats
-
-    analyzer.add_new_author("Alice", "a.py", file_stats)
-    assert "Alice" in file_stats["a.py"].commits_by_author
-
-    # populate stats to represent dominance by Alice
-    file_stats["a.py"].total_commits = 4
-    file_stats["a.py"].total_lines_changed = 100
-    file_stats["a.py"].commits_by_author["Alice"] = 3
-    file_stats["a.py"].commits_by_author["Bob"] = 1
-    file_stats["a.py"].lines_by_author["Alice"] = 80
-    file_stats["a.py"].lines_by_author["Bob"] = 20
+    # stats representing dominance by Alice
+    file_stats = {"a.py": FileAnalysis(
+        file_path="a.py",
+        repository="repo1",
+        total_commits=4,
+        total_lines_changed=100,
+        commits_by_author={"Alice": 3, "Bob": 1},
+        lines_by_author={"Alice": 80, "Bob": 20},
+    )}
 
     results = analyzer._identify_risky_files(list(file_stats.values()))
     assert len(results) == 1
@@ -54,14 +49,14 @@ def test_analyze_repository_with_invalid_path():
     assert "Erro ao analisar repositório test_repo" in str(exc_info.value)
 
 
-@patch("busfactor.service.bus_factor_analyzer.Repository")
+@patch("pydriller.Repository")
 def test_analyze_repository_with_no_commits(mock_repo):
     # Mock repository with no commits
     mock_repo_instance = MagicMock()
     mock_repo_instance.traverse_commits.return_value = []
     mock_repo.return_value = mock_repo_instance
 
-    cfg = AnalysisConfig(include_patterns=["*.py"])
+    cfg = AnalysisConfig(include_patterns=["*.py"], backend="pydriller")
     analyzer = BusFactorAnalyzer(cfg)
 
     results = analyzer.analyze_repository("/some/path", "test_repo")
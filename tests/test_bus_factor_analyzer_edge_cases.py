@@ -34,7 +34,7 @@ class TestBusFactorAnalyzerEdgeCases:
         assert results[0].commits_dominance == 1.0
         assert results[0].lines_dominance == 1.0
 
-    @patch("busfactor.service.bus_factor_analyzer.Repository")
+    @patch("pydriller.Repository")
     def test_analyze_repository_with_renamed_files(self, mock_repo):
         mock_commit = MagicMock()
         mock_modification = MagicMock()
@@ -49,7 +49,7 @@ class TestBusFactorAnalyzerEdgeCases:
         mock_repo_instance.traverse_commits.return_value = [mock_commit]
         mock_repo.return_value = mock_repo_instance
 
-        cfg = AnalysisConfig(include_patterns=["src/*.py"])
+        cfg = AnalysisConfig(include_patterns=["src/*.py"], backend="pydriller")
         analyzer = BusFactorAnalyzer(cfg)
 
         results = analyzer.analyze_repository("/some/path", "test_repo")
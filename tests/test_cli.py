@@ -1,9 +1,13 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from busfactor.cli import BusFactorCLI
-from busfactor.models.data_models import RiskAnalysisResult
+from busfactor.cli import BusFactorCLI, _analyze_repository_task
+from busfactor.models.data_models import AnalysisConfig, RiskAnalysisResult
 
 
 @pytest.fixture
@@ -30,7 +34,7 @@ class TestBusFactorCLI:
         assert cli.repository_manager is not None
         assert cli.report_generator is not None
 
-    @patch("busfactor.cli.BusFactorAnalyzer")
+    @patch("busfactor.service.bus_factor_analyzer.BusFactorAnalyzer")
     @patch("busfactor.cli.RepositoryManager")
     @patch("busfactor.cli.ReportGenerator")
     def test_analyze_repositories_aggregates_results(
@@ -86,3 +90,69 @@ class TestBusFactorCLI:
         assert len(called_results) == 2
         assert called_results[0].file_path == "src/main.py"
         assert called_results[1].file_path == "src/utils.py"
+
+    @patch("busfactor.cli.ProcessPoolExecutor", ThreadPoolExecutor)
+    @patch("busfactor.service.bus_factor_analyzer.BusFactorAnalyzer")
+    @patch("busfactor.cli.RepositoryManager")
+    @patch("busfactor.cli.ReportGenerator")
+    def test_analyze_repositories_in_pool_keeps_input_order_and_isolates_errors(
+        self, mock_report_gen_class, mock_rm_class, mock_analyzer_class, sample_risky_results
+    ):
+        def clone(repo, config=None):
+            if repo.endswith("broken"):
+                raise Exception("clone failed")
+            if repo.endswith("slow"):
+                time.sleep(0.05)
+            return f"/tmp/{repo.rsplit('/', 1)[-1]}"
+
+        def analyze(repo_path, repo):
+            return [replace(sample_risky_results[0], repository=repo)]
+
+        mock_rm_class.return_value.clone_repository.side_effect = clone
+        mock_analyzer_class.return_value.analyze_repository.side_effect = analyze
+        mock_report_gen = MagicMock()
+        mock_report_gen_class.return_value = mock_report_gen
+
+        repos = [
+            "https://github.com/user/slow",
+            "https://github.com/user/broken",
+            "https://github.com/user/fast",
+        ]
+        cli = BusFactorCLI()
+        cli.analyze_repositories(repos=repos, format="html", jobs=3)
+
+        called_results = mock_report_gen.generate_report.call_args[0][0]
+        assert [r.repository for r in called_results] == [repos[0], repos[2]]
+
+
+def test_analyze_repository_task_returns_error_instead_of_raising():
+    results, error, metrics, truck_factor = _analyze_repository_task("not-a-url", AnalysisConfig())
+
+    assert results == []
+    assert error
+
+
+def test_analyze_repositories_process_pool_survives_failures(capsys):
+    cli = BusFactorCLI()
+    cli.analyze_repositories(repos=["invalid-1", "invalid-2"], jobs=2)
+
+    output = capsys.readouterr().out
+    assert "Erro ao analisar invalid-1" in output
+    assert "Erro ao analisar invalid-2" in output
+
+
+@patch("busfactor.service.bus_factor_analyzer.BusFactorAnalyzer")
+@patch("busfactor.cli.RepositoryManager")
+def test_analyze_repositories_streams_json_to_stdout(mock_rm_class, mock_analyzer_class, sample_risky_results, capsys):
+    mock_rm_class.return_value.clone_repository.side_effect = lambda repo, config=None: "/tmp/repo"
+    mock_analyzer_class.return_value.analyze_repository.side_effect = \
+        lambda repo_path, repo: [replace(sample_risky_results[0], repository=repo)]
+
+    cli = BusFactorCLI()
+    cli.analyze_repositories(repos=["https://github.com/user/a", "https://github.com/user/b"], format="json")
+
+    captured = capsys.readouterr()
+    # stdout contém apenas o relatório; o progresso vai para stderr
+    assert [row["repository"] for row in json.loads(captured.out)] == [
+        "https://github.com/user/a", "https://github.com/user/b"]
+    assert "Relatório Final: 2" in captured.err
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.clone_pipeline import ClonePrefetcher
+from busfactor.service.repository_manager import RepositoryManager
+
+
+class FakeManager:
+    """Registra a ordem de clones e liberações; clones criam diretórios reais."""
+
+    def __init__(self, tmp_path, clone_seconds=0.0, payload=b""):
+        self.tmp_path = tmp_path
+        self.clone_seconds = clone_seconds
+        self.payload = payload
+        self.events = []
+        self.lock = threading.Lock()
+
+    def _log(self, event):
+        with self.lock:
+            self.events.append(event)
+
+    def clone_repository(self, repo, config=None):
+        self._log(("clone-start", repo))
+        time.sleep(self.clone_seconds)
+        if repo.endswith("broken"):
+            raise Exception("clone failed")
+        path = self.tmp_path / repo
+        path.mkdir()
+        (path / "data").write_bytes(self.payload)
+        self._log(("clone-end", repo))
+        return str(path)
+
+    def release_repository(self, path):
+        self._log(("release", path.rsplit("/", 1)[-1]))
+
+
+def _consume(prefetcher, repos, manager, analyze_seconds=0.0):
+    outcomes = []
+    for repo, path, error in prefetcher.iterate(repos):
+        manager._log(("analyze-start", repo))
+        time.sleep(analyze_seconds)
+        manager._log(("analyze-end", repo))
+        outcomes.append((repo, path is not None, error))
+    return outcomes
+
+
+def test_prefetch_overlaps_next_clone_with_current_analysis(tmp_path):
+    manager = FakeManager(tmp_path, clone_seconds=0.05)
+    prefetcher = ClonePrefetcher(manager, AnalysisConfig(), depth=1)
+
+    outcomes = _consume(prefetcher, ["a", "b", "c"], manager, analyze_seconds=0.1)
+
+    assert outcomes == [("a", True, None), ("b", True, None), ("c", True, None)]
+    events = manager.events
+    # "b" começa a ser clonado antes de a análise de "a" terminar
+    assert events.index(("clone-start", "b")) < events.index(("analyze-end", "a"))
+    # Cada clone é liberado antes de a próxima análise começar
+    assert events.index(("release", "a")) < events.index(("analyze-start", "b"))
+    assert events.index(("release", "c")) == len(events) - 1
+
+
+def test_prefetch_zero_is_sequential(tmp_path):
+    manager = FakeManager(tmp_path)
+    prefetcher = ClonePrefetcher(manager, AnalysisConfig(), depth=0)
+
+    _consume(prefetcher, ["a", "b"], manager)
+
+    assert [event for event, _ in manager.events] == [
+        "clone-start", "clone-end", "analyze-start", "analyze-end", "release",
+        "clone-start", "clone-end", "analyze-start", "analyze-end", "release",
+    ]
+
+
+def test_disk_budget_blocks_prefetch(tmp_path):
+    manager = FakeManager(tmp_path, payload=b"x" * 4096)
+    prefetcher = ClonePrefetcher(manager, AnalysisConfig(), depth=2, max_bytes=1024)
+
+    _consume(prefetcher, ["a", "b", "c"], manager)
+
+    events = manager.events
+    assert events.index(("release", "a")) < events.index(("clone-start", "c"))
+
+
+def test_clone_errors_are_reported_in_order(tmp_path):
+    manager = FakeManager(tmp_path)
+    prefetcher = ClonePrefetcher(manager, AnalysisConfig(), depth=2)
+
+    outcomes = _consume(prefetcher, ["a", "broken", "c"], manager)
+
+    assert outcomes == [("a", True, None), ("broken", False, "clone failed"), ("c", True, None)]
+
+
+def test_stopping_early_releases_prefetched_clones(tmp_path):
+    manager = FakeManager(tmp_path)
+    prefetcher = ClonePrefetcher(manager, AnalysisConfig(), depth=2)
+
+    iterator = prefetcher.iterate(["a", "b", "c", "d"])
+    next(iterator)
+    iterator.close()
+
+    cloned = {repo for event, repo in manager.events if event == "clone-end"}
+    released = {repo for event, repo in manager.events if event == "release"}
+    assert cloned == released
+
+
+def test_prefetch_with_real_clones(git_repo):
+    manager = RepositoryManager()
+    prefetcher = ClonePrefetcher(manager, AnalysisConfig(), depth=1)
+    url = f"file://{git_repo}"
+
+    paths = [path for _, path, error in prefetcher.iterate([url, url])]
+
+    assert len(set(paths)) == 2
+    assert manager.temp_dirs == []
@@ -0,0 +1,133 @@
+import csv
+import json
+
+import pytest
+
+from busfactor.models import AnalysisConfig
+from busfactor.reportGenerator.file_report_generator import ReportGenerator
+from busfactor.reportGenerator.html_report_generator import HTMLReportGenerator
+from busfactor.reportGenerator.stream_report_generator import open_report_stream
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.history_backend import GitLogBackend, get_history_backend, is_partial_clone
+
+LINE_FIELDS = ("dominant_author_lines", "lines_dominance", "total_lines_changed")
+
+
+def test_parse_name_status_handles_renames_and_copies():
+    tokens = [
+        "\x1eabc\x1fAlice\x1f100",
+        "\nM", "src/a.py",
+        "D", "gone.py",
+        "R087", "old.py", "new.py",
+        "C100", "src/a.py", "src/copy.py",
+        "\x1edef\x1fBob\x1f200",
+        "",
+    ]
+
+    commits = list(GitLogBackend.parse_name_status_stream(tokens))
+
+    assert [c.sha for c in commits] == ["abc", "def"]
+    assert [(m.old_path, m.new_path, m.added_lines, m.deleted_lines) for m in commits[0].modifications] == [
+        ("src/a.py", "src/a.py", 0, 0),
+        ("gone.py", "gone.py", 0, 0),
+        ("old.py", "new.py", 0, 0),
+        ("src/copy.py", "src/copy.py", 0, 0),
+    ]
+    assert commits[1].modifications == []
+
+
+def test_name_status_backend_touches_same_paths(git_repo):
+    def touched(backend):
+        return [(c.sha, [(m.old_path, m.new_path) for m in c.modifications])
+                for c in backend.iter_commits(str(git_repo))]
+
+    fast = get_history_backend("git", line_stats=False)
+
+    assert "--name-status" in fast.build_command(str(git_repo))
+    assert touched(fast) == touched(GitLogBackend())
+    assert all(m.added_lines == m.deleted_lines == 0 for c in fast.iter_commits(str(git_repo)) for m in c.modifications)
+
+
+def test_blobless_clone_only_detects_exact_renames(git_repo, git_cmd, tmp_path):
+    git_cmd(git_repo, "config", "uploadpack.allowFilter", "true")
+    clone = tmp_path / "blobless"
+    git_cmd(tmp_path, "clone", "-q", "--no-checkout", "--filter=blob:none", f"file://{git_repo}", str(clone))
+    fast = get_history_backend("git", line_stats=False)
+
+    assert is_partial_clone(str(clone)) and not is_partial_clone(str(git_repo))
+    assert "-M100%" in fast.build_command(str(clone))
+    assert "-M" in fast.build_command(str(git_repo))
+    assert "-M" in GitLogBackend().build_command(str(clone))
+    # A renomeação do fixture é exata (git mv), então o resultado é o mesmo do clone completo
+    assert _analyze(clone, metric="commits") == _analyze(git_repo, metric="commits")
+
+
+def _analyze(repo, **kwargs):
+    config = AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], dominance_threshold=0.0, **kwargs)
+    return {r.file_path: r for r in BusFactorAnalyzer(config).analyze_repository(str(repo), "repo")}
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"cache_dir": True}, {"windows": [1, 9000]}, {"shards": 2}])
+def test_commit_metric_matches_commit_fields_and_drops_lines(git_repo, tmp_path, kwargs):
+    if kwargs.get("cache_dir"):
+        kwargs = {**kwargs, "cache_dir": str(tmp_path / "cache")}
+
+    fast = _analyze(git_repo, metric="commits", **kwargs)
+    full = _analyze(git_repo, **{key: value for key, value in kwargs.items() if key != "cache_dir"})
+
+    assert set(fast) == set(full)
+    for path, result in fast.items():
+        assert (result.dominant_author_commits, result.commits_dominance, result.total_commits) == \
+               (full[path].dominant_author_commits, full[path].commits_dominance, full[path].total_commits)
+        assert all(getattr(result, field) is None for field in LINE_FIELDS)
+        assert all(getattr(window, field) is None for window in result.windows for field in LINE_FIELDS)
+
+
+def test_cache_without_lines_is_rebuilt_for_full_metric(git_repo, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    _analyze(git_repo, metric="commits", cache_dir=cache_dir)
+
+    assert _analyze(git_repo, cache_dir=cache_dir) == _analyze(git_repo)
+
+
+def test_blame_still_reports_lines_with_commit_metric(git_repo):
+    result = _analyze(git_repo, metric="commits", ownership="blame")["src/helpers.py"]
+
+    assert result.total_lines_changed == 3
+    assert result.dominant_author_lines == "Bob"
+
+
+def test_unknown_metric():
+    with pytest.raises(ValueError):
+        BusFactorAnalyzer(AnalysisConfig(metric="lines"))
+
+
+@pytest.fixture
+def commit_only_results(git_repo):
+    return list(_analyze(git_repo, metric="commits", windows=[1, 9000]).values())
+
+
+def test_stream_reports_leave_line_fields_empty(commit_only_results, tmp_path):
+    with open_report_stream("json", str(tmp_path / "out.json")) as writer:
+        writer.write_all(commit_only_results)
+    with open_report_stream("csv", str(tmp_path / "out.csv"), windows=[1, 9000]) as writer:
+        writer.write_all(commit_only_results)
+
+    rows = json.loads((tmp_path / "out.json").read_text())
+    assert all(row[field] is None for row in rows for field in LINE_FIELDS)
+    with open(tmp_path / "out.csv", newline="") as f:
+        records = list(csv.DictReader(f))
+    assert all(record[field] == "" for record in records for field in LINE_FIELDS + ("lines_dominance_9000d",))
+
+
+def test_table_and_html_reports_show_dash(commit_only_results, tmp_path, capsys):
+    ReportGenerator().generate_report(commit_only_results, format="table")
+    HTMLReportGenerator().generate_html(commit_only_results, output_path=str(tmp_path / "report.html"))
+
+    assert "Bus Factor Analysis" in capsys.readouterr().out
+    content = (tmp_path / "report.html").read_text()
+    rows = json.loads(content.split('id="bf-rows">')[1].split("</script>")[0])
+    meta = json.loads(content.split('id="bf-meta">')[1].split("</script>")[0])
+    assert all(row[3] is None and row[5] is None and row[7] is None for row in rows)
+    dominance = next(figure for figure in meta["figures"] if figure["id"] == "fig-dominance")
+    assert [trace["name"] for trace in dominance["data"]] == ["Dominância (Commits)"]
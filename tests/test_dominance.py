@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+
+from busfactor.models.data_models import AnalysisConfig, FileAnalysis, RiskAnalysisResult
+from busfactor.service.aggregation import AggregationStore
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.dominance import DominanceTable
+
+
+def _legacy_identify(file_analyses, threshold):
+    # Implementação anterior (laço com max()), usada como referência
+    risky_files = []
+    for analysis in file_analyses:
+        if not analysis.commits_by_author:
+            continue
+        dominant_commits = max(analysis.commits_by_author.items(), key=lambda x: x[1])
+        dominant_lines = max(analysis.lines_by_author.items(), key=lambda x: x[1])
+        commits_dominance = dominant_commits[1] / analysis.total_commits
+        lines_dominance = (dominant_lines[1] / analysis.total_lines_changed
+                           if analysis.total_lines_changed > 0 else 0)
+        if commits_dominance >= threshold or lines_dominance >= threshold:
+            risky_files.append(RiskAnalysisResult(
+                file_path=analysis.file_path,
+                repository=analysis.repository,
+                dominant_author_commits=dominant_commits[0],
+                dominant_author_lines=dominant_lines[0],
+                commits_dominance=commits_dominance,
+                lines_dominance=lines_dominance,
+                total_commits=analysis.total_commits,
+                total_lines_changed=analysis.total_lines_changed,
+                all_authors=list(analysis.commits_by_author.keys())
+            ))
+    return risky_files
+
+
+def _random_store(seed, n_events=2000):
+    rng = random.Random(seed)
+    authors = ["Alice", "Bob", "Carol", "Dave"]
+    store = AggregationStore()
+    for _ in range(n_events):
+        # Poucos valores distintos para forçar empates, inclusive de zero linhas
+        store.add(f"f{rng.randrange(150)}.py", store.intern_author(rng.choice(authors)), rng.choice([0, 0, 1, 2]))
+    return store
+
+
+def test_dominance_table_breaks_ties_by_first_author():
+    files = np.array([0, 0, 0, 1], dtype=np.int64)
+    authors = np.array([2, 0, 1, 1], dtype=np.int64)
+    values = np.array([3, 3, 1, 0], dtype=np.int64)
+
+    table = DominanceTable(3, (files, authors, values), (files, authors, values))
+
+    assert table.top_commit_authors.tolist() == [2, 1, -1]
+    assert table.total_commits.tolist() == [7, 0, 0]
+    assert table.commits_dominance[0] == 3 / 7
+    assert table.lines_dominance[1] == 0.0
+    assert table.risky_mask(0.0).tolist() == [True, True, False]
+
+
+def test_identify_risky_files_matches_legacy_max():
+    for seed in range(5):
+        analyses = _random_store(seed).to_file_analyses("repo")
+        for threshold in (0.3, 0.6, 1.0):
+            analyzer = BusFactorAnalyzer(AnalysisConfig(dominance_threshold=threshold))
+
+            assert analyzer._identify_risky_files(analyses) == _legacy_identify(analyses, threshold)
+
+
+def test_identify_risky_aggregates_matches_file_analyses_path():
+    analyzer = BusFactorAnalyzer(AnalysisConfig(dominance_threshold=0.5))
+    for seed in range(5):
+        store = _random_store(seed)
+        expected = analyzer._identify_risky_files(store.to_file_analyses("repo"))
+
+        assert analyzer._identify_risky_aggregates(store, "repo") == expected
+
+
+def test_identify_risky_files_skips_files_without_authors():
+    analyzer = BusFactorAnalyzer(AnalysisConfig(dominance_threshold=0.0))
+    empty = FileAnalysis("empty.py", "repo", 0, 0, {}, {})
+
+    assert analyzer._identify_risky_files([empty]) == []
+    assert analyzer._identify_risky_files([]) == []
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+import typer
+
+from busfactor.cli import BusFactorCLI, _parse_thresholds
+from busfactor.models import AnalysisConfig
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.dominance_index import (
+    DominanceIndexStore,
+    cumulative_distribution,
+    merged_sorted_scores,
+    risky_counts,
+)
+
+THRESHOLDS = [0.0, 0.3, 0.5, 0.6, 2 / 3, 0.8, 1.0]
+
+
+def _config(**kwargs):
+    return AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], **kwargs)
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_index_counts_match_separate_runs(git_repo, tmp_path, cached):
+    cache_dir = str(tmp_path / "cache") if cached else None
+    store = DominanceIndexStore(str(tmp_path / "index"))
+    BusFactorAnalyzer(_config(index_dir=str(store.index_dir), cache_dir=cache_dir)).analyze_repository(
+        str(git_repo), "repo")
+
+    index = store.load("repo")
+    for threshold, count in zip(THRESHOLDS, index.risky_counts(THRESHOLDS)):
+        results = BusFactorAnalyzer(_config(dominance_threshold=threshold, cache_dir=cache_dir)) \
+            .analyze_repository(str(git_repo), "repo")
+        assert count == len(results)
+        assert index.file_paths[index.risky_file_ids(threshold)].tolist() == [r.file_path for r in results]
+
+
+def test_index_round_trip_and_windows(git_repo, tmp_path):
+    store = DominanceIndexStore(str(tmp_path))
+    BusFactorAnalyzer(_config(windows=[30, 9000], index_dir=str(tmp_path))).analyze_repository(
+        str(git_repo), "repo")
+
+    index = store.load("repo")
+    assert index.repository == "repo"
+    assert len(index) == len(BusFactorAnalyzer(_config()).collect_aggregates(str(git_repo)))
+    assert set(index.author_names[index.commit_authors].tolist()) <= {"Alice", "Bob", "Carol"}
+    assert store.load_all()[0].file_paths.tolist() == index.file_paths.tolist()
+    assert store.load("other") is None
+
+
+def test_cumulative_distribution_from_sorted_scores():
+    scores = np.sort(np.array([0.5, 1.0, 0.5, 0.75, 1.0, 1.0]))
+
+    thresholds, counts = cumulative_distribution(scores)
+
+    assert thresholds.tolist() == [0.5, 0.75, 1.0]
+    assert counts.tolist() == [6, 4, 3]
+    assert risky_counts(scores, [0.0, 0.6, 1.0, 1.1]) == [6, 4, 3, 0]
+    assert merged_sorted_scores([]).tolist() == []
+
+
+def test_cli_threshold_sweep_writes_cdf(git_repo, tmp_path):
+    cdf_file = tmp_path / "cdf.csv"
+
+    BusFactorCLI().analyze_repositories(
+        repos=[f"file://{git_repo}"],
+        format="csv",
+        output=str(tmp_path / "report.csv"),
+        thresholds=[0.5, 0.9],
+        cdf_out=str(cdf_file),
+    )
+
+    header, *rows = cdf_file.read_text().splitlines()
+    assert header == "threshold,risky_files"
+    counts = [int(row.split(",")[1]) for row in rows]
+    assert counts == sorted(counts, reverse=True)
+    # O relatório detalhado usa o menor limiar
+    report_rows = (tmp_path / "report.csv").read_text().splitlines()[1:]
+    expected = BusFactorAnalyzer(AnalysisConfig(dominance_threshold=0.5)).analyze_repository(str(git_repo), "r")
+    assert len(report_rows) == len(expected)
+
+
+def test_parse_thresholds():
+    assert _parse_thresholds(["0.9,0.5", "0.6"]) == [0.5, 0.6, 0.9]
+    with pytest.raises(typer.BadParameter):
+        _parse_thresholds(["1.5"])
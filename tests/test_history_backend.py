@@ -0,0 +1,70 @@
+import pytest
+
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.history_backend import (
+    GitLogBackend,
+    PyDrillerBackend,
+    get_history_backend,
+)
+
+
+def test_get_history_backend():
+    assert isinstance(get_history_backend("git"), GitLogBackend)
+    assert isinstance(get_history_backend("pydriller"), PyDrillerBackend)
+
+    with pytest.raises(ValueError):
+        get_history_backend("svn")
+
+
+def test_parse_stream_handles_renames_and_binaries():
+    tokens = [
+        "\x1eabc\x1fAlice\x1f100",
+        "\n3\t1\tsrc/a.py",
+        "-\t-\tlogo.png",
+        "0\t0\t", "old.py", "new.py",
+        "\x1edef\x1fBob\x1f200",
+        "",
+    ]
+
+    commits = list(GitLogBackend.parse_stream(tokens))
+
+    assert [c.sha for c in commits] == ["abc", "def"]
+    assert commits[0].author == "Alice"
+    assert commits[0].timestamp == 100
+    assert [(m.old_path, m.new_path, m.added_lines, m.deleted_lines) for m in commits[0].modifications] == [
+        ("src/a.py", "src/a.py", 3, 1),
+        ("logo.png", "logo.png", 0, 0),
+        ("old.py", "new.py", 0, 0),
+    ]
+    assert commits[1].modifications == []
+
+
+def test_git_backend_streams_local_repository(git_repo):
+    commits = list(GitLogBackend().iter_commits(str(git_repo)))
+
+    assert commits[0].author == "Alice"
+    assert commits[-1].modifications == []
+    paths = {m.path for c in commits for m in c.modifications}
+    assert "src/helpers.py" in paths
+    assert "dir with space/file name.txt" in paths
+
+
+def test_git_backend_invalid_path_raises():
+    with pytest.raises(Exception):
+        list(GitLogBackend().iter_commits("/invalid/path"))
+
+
+@pytest.mark.parametrize("config_kwargs", [
+    {"dominance_threshold": 0.0},
+    {"dominance_threshold": 0.5, "include_patterns": ["src/**"]},
+    {"dominance_threshold": 0.0, "exclude_patterns": []},
+])
+def test_backends_produce_identical_results(git_repo, config_kwargs):
+    git_results = BusFactorAnalyzer(AnalysisConfig(backend="git", **config_kwargs)) \
+        .analyze_repository(str(git_repo), "sample")
+    pydriller_results = BusFactorAnalyzer(AnalysisConfig(backend="pydriller", **config_kwargs)) \
+        .analyze_repository(str(git_repo), "sample")
+
+    assert git_results
+    assert git_results == pydriller_results
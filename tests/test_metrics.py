@@ -0,0 +1,77 @@
+import json
+import pstats
+
+from busfactor.cli import BusFactorCLI
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.metrics import MetricsRecorder
+
+
+def test_stages_and_counters_are_grouped_by_repository():
+    metrics = MetricsRecorder()
+
+    with metrics.stage("report:csv"):
+        pass
+    with metrics.repository("repo"):
+        with metrics.stage("clone"):
+            pass
+        with metrics.stage("clone"):
+            pass
+        metrics.count("commits", 3)
+
+    summary = metrics.summary()
+    assert summary["stages"]["report:csv"]["calls"] == 1
+    assert summary["repos"]["repo"]["stages"]["clone"]["calls"] == 2
+    assert summary["repos"]["repo"]["counters"] == {"commits": 3}
+    assert summary["total"]["peak_rss_mb"] > 0
+
+
+def test_merge_sums_worker_metrics():
+    parent, worker = MetricsRecorder(), MetricsRecorder()
+    for recorder in (parent, worker):
+        with recorder.repository("repo"), recorder.stage("traverse"):
+            recorder.count("commits", 2)
+
+    parent.merge(worker.to_dict())
+
+    repo = parent.summary()["repos"]["repo"]
+    assert repo["stages"]["traverse"]["calls"] == 2
+    assert repo["counters"]["commits"] == 4
+
+
+def test_analyzer_records_traversal_counters(git_repo):
+    metrics = MetricsRecorder()
+    analyzer = BusFactorAnalyzer(
+        AnalysisConfig(exclude_patterns=["**/*.md"], pathspec_pushdown=False), metrics=metrics)
+
+    risky_files = analyzer.analyze_repository(git_repo, "repo")
+
+    repo = metrics.summary()["repos"]["repo"]
+    assert {"traverse", "aggregate", "dominance"} <= set(repo["stages"])
+    counters = repo["counters"]
+    assert counters["commits"] > 0
+    assert counters["modifications_filtered"] > 0
+    assert counters["files_tracked"] == len(analyzer.collect_aggregates(git_repo))
+    assert counters["authors_seen"] == 3
+    assert counters["risky_files"] == len(risky_files)
+
+
+def test_cli_writes_metrics_and_profile(git_repo, tmp_path):
+    metrics_file = tmp_path / "metrics.json"
+    profile_file = tmp_path / "traverse.prof"
+
+    BusFactorCLI().analyze_repositories(
+        repos=[f"file://{git_repo}"],
+        format="csv",
+        output=str(tmp_path / "report.csv"),
+        metrics_out=str(metrics_file),
+        profile=str(profile_file),
+    )
+
+    data = json.loads(metrics_file.read_text())
+    repo = data["repos"][f"file://{git_repo}"]
+    assert {"clone", "traverse", "dominance"} <= set(repo["stages"])
+    assert "report:csv" in data["stages"]
+    assert repo["counters"]["commits"] > 0
+    functions = {name for _, _, name in pstats.Stats(str(profile_file)).stats}
+    assert "parse_stream" in functions
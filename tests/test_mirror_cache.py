@@ -0,0 +1,178 @@
+import fcntl
+import os
+import subprocess
+import sys
+
+import pytest
+
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.history_backend import is_partial_clone, resolve_head
+from busfactor.service.mirror_cache import FileLock, MirrorCache
+from busfactor.service.repository_manager import RepositoryManager
+
+
+def _clone_count(path):
+    return len(subprocess.run(
+        ["git", "-C", path, "rev-list", "--all"], capture_output=True, text=True, check=True
+    ).stdout.split())
+
+
+class TestFileLock:
+    def test_lock_is_exclusive(self, tmp_path):
+        first = FileLock(str(tmp_path / "x.lock"))
+        second = FileLock(str(tmp_path / "x.lock"))
+
+        assert first.acquire() is True
+        assert second.acquire(blocking=False) is False
+        first.release()
+        assert second.acquire(blocking=False) is True
+        second.release()
+        assert not (tmp_path / "x.lock").exists()
+
+    def test_lock_left_by_dead_process_is_broken(self, tmp_path):
+        process = subprocess.Popen(["true"])
+        process.wait()
+        (tmp_path / "x.lock").write_text(str(process.pid))
+
+        lock = FileLock(str(tmp_path / "x.lock"))
+        assert lock.acquire(blocking=False) is True
+        lock.release()
+
+    def test_lock_held_by_live_process_is_released_when_it_dies(self, tmp_path):
+        path = str(tmp_path / "x.lock")
+        holder = subprocess.Popen(
+            [sys.executable, "-c",
+             "import sys, time; from busfactor.service.mirror_cache import FileLock; "
+             f"FileLock({path!r}).acquire(); print('ok', flush=True); time.sleep(60)"],
+            stdout=subprocess.PIPE, text=True)
+        assert holder.stdout.readline().strip() == "ok"
+
+        lock = FileLock(path)
+        assert lock.acquire(blocking=False) is False
+        holder.kill()
+        holder.wait()
+        holder.stdout.close()
+        assert lock.acquire(blocking=False) is True
+        lock.release()
+
+    def test_lock_retries_when_file_is_replaced_after_open(self, tmp_path, monkeypatch):
+        path = tmp_path / "x.lock"
+        lock = FileLock(str(path))
+        replaced = []
+        real_flock = fcntl.flock
+
+        def flock_then_replace(fd, operation):
+            real_flock(fd, operation)
+            if not replaced:
+                # Simula o dono anterior soltando e outro processo recriando o arquivo
+                replaced.append(True)
+                path.unlink()
+                path.write_text("")
+
+        monkeypatch.setattr("busfactor.service.mirror_cache.fcntl.flock", flock_then_replace)
+        assert lock.acquire(blocking=False) is True
+        assert os.fstat(lock._fd).st_ino == os.stat(path).st_ino
+        lock.release()
+
+    def test_blocking_acquire_times_out(self, tmp_path):
+        holder = FileLock(str(tmp_path / "x.lock"))
+        holder.acquire()
+
+        with pytest.raises(TimeoutError):
+            FileLock(str(tmp_path / "x.lock"), timeout=0.2, poll_interval=0.05).acquire()
+        holder.release()
+
+
+class TestMirrorCache:
+    def test_mirror_is_cloned_once_and_fetched_on_reuse(self, git_repo, git_commit, tmp_path):
+        cache = MirrorCache(str(tmp_path / "mirrors"), max_bytes=1 << 30)
+        url = f"file://{git_repo}"
+
+        path, lock = cache.acquire(url)
+        lock.release()
+        commits_before = _clone_count(path)
+
+        git_commit(git_repo, "Dave", "after mirror", {"src/new.py": "x\n"})
+        same_path, lock = cache.acquire(url)
+        lock.release()
+
+        assert same_path == path
+        assert _clone_count(path) == commits_before + 1
+        assert os.listdir(os.path.join(path, "objects", "info", "commit-graphs"))
+        assert resolve_head(path) == resolve_head(str(git_repo))
+
+    def test_mirror_only_copies_branches_and_tags(self, git_repo, git_cmd, tmp_path):
+        git_cmd(git_repo, "tag", "v1")
+        git_cmd(git_repo, "update-ref", "refs/pull/1/head", "HEAD~1")
+        cache = MirrorCache(str(tmp_path / "mirrors"), max_bytes=1 << 30)
+
+        for _ in range(2):
+            path, lock = cache.acquire(f"file://{git_repo}")
+            lock.release()
+
+        refs = subprocess.run(["git", "-C", path, "for-each-ref", "--format=%(refname)"],
+                              capture_output=True, text=True, check=True).stdout.split()
+        assert "refs/tags/v1" in refs and "refs/heads/main" in refs
+        assert not [ref for ref in refs if ref.startswith("refs/pull/")]
+
+    def test_blobless_mirror_is_recloned_in_full_when_lines_are_needed(self, git_repo, git_cmd, tmp_path):
+        git_cmd(git_repo, "config", "uploadpack.allowFilter", "true")
+        url = f"file://{git_repo}"
+        mirrors = str(tmp_path / "mirrors")
+
+        path, lock = MirrorCache(mirrors, max_bytes=1 << 30, blobless=True).acquire(url)
+        lock.release()
+        assert is_partial_clone(path)
+
+        # Um mirror completo serve para execuções blobless e continua completo
+        for blobless in (False, True):
+            same_path, lock = MirrorCache(mirrors, max_bytes=1 << 30, blobless=blobless).acquire(url)
+            lock.release()
+            assert same_path == path
+            assert not is_partial_clone(path)
+        assert _clone_count(path) == _clone_count(str(git_repo))
+
+    def test_lru_eviction_skips_mirror_in_use(self, git_repo, tmp_path, git_cmd):
+        other_repo = tmp_path / "other"
+        git_cmd(tmp_path, "clone", "-q", str(git_repo), str(other_repo))
+        cache = MirrorCache(str(tmp_path / "mirrors"), max_bytes=1 << 30)
+
+        first, first_lock = cache.acquire(f"file://{git_repo}")
+        first_lock.release()
+        os.utime(first, (1, 1))
+        second, second_lock = cache.acquire(f"file://{other_repo}")
+
+        cache.max_bytes = 0
+        assert cache.evict() == [first]
+        assert not os.path.exists(first)
+        assert os.path.exists(second)
+        second_lock.release()
+
+    def test_clone_failure_releases_lock(self, tmp_path):
+        cache = MirrorCache(str(tmp_path / "mirrors"), max_bytes=1 << 30)
+        url = f"file://{tmp_path}/missing"
+
+        with pytest.raises(subprocess.CalledProcessError):
+            cache.acquire(url)
+        assert cache.lock_for(cache.path_for(url)).acquire(blocking=False) is True
+
+
+class TestRepositoryManagerMirrors:
+    def test_clone_repository_reuses_mirror(self, git_repo, tmp_path):
+        config = AnalysisConfig(mirror_dir=str(tmp_path / "mirrors"))
+        manager = RepositoryManager()
+
+        path = manager.clone_repository(f"file://{git_repo}", config)
+        manager.release_repository(path)
+        assert manager.clone_repository(f"file://{git_repo}", config) == path
+        manager.release_repository(path)
+        assert os.path.isdir(path)
+
+    def test_release_repository_removes_temporary_clone(self, git_repo):
+        manager = RepositoryManager()
+
+        path = manager.clone_repository(f"file://{git_repo}", AnalysisConfig())
+        manager.release_repository(path)
+
+        assert not os.path.exists(path)
+        assert manager.temp_dirs == []
@@ -0,0 +1,175 @@
+import json
+import subprocess
+from fnmatch import fnmatch
+
+import pytest
+
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.history_backend import GitLogBackend
+from busfactor.service.path_filter import PathFilter, glob_to_regex, literal_prefix, to_pathspecs
+
+
+@pytest.mark.parametrize("pattern, path, expected", [
+    ("**/*", "setup.py", True),
+    ("**/*", "src/a/b.py", True),
+    ("*.py", "setup.py", True),
+    ("*.py", "src/main.py", False),
+    ("**/*.py", "src/a/main.py", True),
+    ("**/*.py", "main.py", True),
+    ("src/*.py", "src/main.py", True),
+    ("src/*.py", "src/sub/main.py", False),
+    ("src/**/test_*.py", "src/test_a.py", True),
+    ("src/**/test_*.py", "src/x/y/test_a.py", True),
+    ("docs/**", "docs/index.md", True),
+    ("docs/**", "docs/a/b/c.md", True),
+    ("docs/**", "mydocs/index.md", False),
+    ("docs/**", "docs", False),
+    ("file?.txt", "file1.txt", True),
+    ("file?.txt", "file/.txt", False),
+    ("[ab].py", "a.py", True),
+    ("[!ab].py", "a.py", False),
+    ("[!ab].py", "c.py", True),
+    ("a**b", "axxb", True),
+    ("a**b", "a/b", False),
+    ("name with space.txt", "name with space.txt", True),
+    ("lib+(1).py", "lib+(1).py", True),
+])
+def test_git_glob_semantics(pattern, path, expected):
+    assert PathFilter([pattern], [], semantics="git").matches(path) is expected
+
+
+@pytest.mark.parametrize("pattern, path", [
+    ("**/*", "setup.py"),
+    ("**/*", "src/a/b.py"),
+    ("*", "setup.py"),
+    ("*", "src/a/b.py"),
+    ("*.py", "setup.py"),
+    ("*.py", "src/main.py"),
+    ("**/*.py", "main.py"),
+    ("src/*.py", "src/sub/main.py"),
+    ("src/**/test_*.py", "src/test_a.py"),
+    ("docs/**", "docs/a/b/c.md"),
+    ("docs/**", "mydocs/index.md"),
+    ("file?.txt", "file/.txt"),
+    ("[!ab].py", "c.py"),
+    ("a**b", "a/b"),
+    ("lib+(1).py", "lib+(1).py"),
+])
+def test_default_semantics_is_fnmatch_over_the_whole_path(pattern, path):
+    assert PathFilter([pattern], []).matches(path) is fnmatch(path, pattern)
+
+
+def test_unknown_glob_semantics_is_rejected():
+    with pytest.raises(ValueError):
+        PathFilter(["**/*"], [], semantics="regex")
+
+
+def test_exclude_takes_precedence_over_include():
+    path_filter = PathFilter(["**/*"], ["vendor/**", "**/*.min.js"])
+
+    assert path_filter.matches("vendor/lib.py") is False
+    assert path_filter.matches("static/app.min.js") is False
+    assert path_filter.matches("static/app.js") is True
+
+
+def test_prefix_and_regex_patterns_are_combined():
+    path_filter = PathFilter(["src/**", "**/*.md", "Makefile"], [])
+
+    assert path_filter.matches("src/deep/x.c")
+    assert path_filter.matches("docs/readme.md")
+    assert path_filter.matches("Makefile")
+    assert not path_filter.matches("build/x.c")
+
+
+def test_decisions_are_cached_with_bounded_size():
+    path_filter = PathFilter(["src/**"], [], cache_size=2)
+
+    for path in ["src/a.py", "src/b.py", "src/c.py", "src/a.py"]:
+        path_filter.matches(path)
+
+    info = path_filter.matches.cache_info()
+    assert info.maxsize == 2
+    assert info.currsize == 2
+
+
+def test_glob_to_regex_directory_wildcards():
+    assert glob_to_regex("**/x") == "(?:.*/)?x"
+    assert glob_to_regex("a/**") == "a/.*"
+    assert glob_to_regex("a/**/b") == "a/(?:.*/)?b"
+
+
+@pytest.mark.parametrize("pattern, prefix", [
+    ("src/*.py", "src/"), ("src/**", "src/"), ("**/*.py", ""), ("lib/c.py", "lib/c.py"), ("a?b[0-9]", "a"),
+])
+def test_literal_prefix(pattern, prefix):
+    assert literal_prefix(pattern) == prefix
+
+
+def test_to_pathspecs_translation():
+    assert to_pathspecs(["**/*"], [], "git") is None
+    assert to_pathspecs(["**/*"], ["docs/**", "**/*.min.js"], "git") == [":(exclude,glob)docs/**"]
+    assert to_pathspecs(["src/**", "**/*.py"], ["src/vendor/**"], "git") == [
+        "src",
+        ":(glob)**/*.py",
+        ":(exclude,glob)src/vendor/**",
+    ]
+
+
+def test_to_pathspecs_with_fnmatch_only_pushes_directory_includes():
+    assert to_pathspecs(["*"], ["docs/**"]) == [":(exclude,glob)docs/**"]
+    # `:(glob)` não tem a semântica do fnmatch: com um padrão assim nenhuma inclusão vai ao git
+    assert to_pathspecs(["src/**", "*.py"], []) is None
+    assert to_pathspecs(["**/*"], []) is None
+    assert to_pathspecs(["src/**", "lib/**"], ["src/vendor/**"]) == ["src", "lib", ":(exclude,glob)src/vendor/**"]
+
+
+def test_to_pathspecs_drops_excludes_outside_literal_includes():
+    # As exclusões padrão não se sobrepõem a `src`: sobra um único pathspec sem magia
+    assert to_pathspecs(["src/**"], AnalysisConfig().exclude_patterns) == ["src"]
+    assert to_pathspecs(["src/pkg/**"], ["src/**"]) == ["src/pkg", ":(exclude,glob)src/**"]
+    # Com um `:(glob)` entre as inclusões não há filtro de Bloom a preservar
+    assert to_pathspecs(["src/**", "**/*.py"], ["docs/**"], "git") == [
+        "src", ":(glob)**/*.py", ":(exclude,glob)docs/**"]
+
+
+def test_directory_include_uses_commit_graph_bloom_filters(git_repo, tmp_path, monkeypatch):
+    subprocess.run(["git", "-C", str(git_repo), "commit-graph", "write", "--reachable", "--changed-paths"],
+                   check=True, capture_output=True)
+    trace = tmp_path / "trace2.json"
+    monkeypatch.setenv("GIT_TRACE2_EVENT", str(trace))
+    config = AnalysisConfig(include_patterns=["src/**"])
+
+    list(GitLogBackend().iter_commits(str(git_repo), pathspecs=to_pathspecs(
+        config.include_patterns, config.exclude_patterns)))
+
+    events = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert any(event.get("category") == "bloom" and event.get("key") == "statistics" for event in events)
+
+
+@pytest.mark.parametrize("semantics", ["fnmatch", "git"])
+@pytest.mark.parametrize("include, exclude", [
+    (["src/**"], []),
+    (["**/*.py"], ["src/feature.py"]),
+    (["**/*"], ["docs/**", "assets/**"]),
+    (["src/*.py", "dir with space/**"], ["**/*.bin"]),
+    (["*.py"], []),
+])
+def test_pathspec_pushdown_matches_python_filtering(git_repo, include, exclude, semantics):
+    def analyze(pushdown):
+        config = AnalysisConfig(
+            dominance_threshold=0.0,
+            include_patterns=include,
+            exclude_patterns=exclude,
+            pathspec_pushdown=pushdown,
+            glob_semantics=semantics,
+        )
+        return BusFactorAnalyzer(config).analyze_repository(str(git_repo), "sample")
+
+    assert analyze(True) == analyze(False)
+
+
+def test_git_backend_appends_pathspecs_with_full_history():
+    command = GitLogBackend().build_command("/repo", pathspecs=["src", ":(exclude,glob)docs/**"])
+
+    assert command[-4:] == ["--full-history", "--", "src", ":(exclude,glob)docs/**"]
@@ -0,0 +1,88 @@
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from busfactor.models import AnalysisConfig
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.path_rollup import ROOT_PATH, PathTrie
+
+
+def _naive_rollup(file_paths, pairs, max_depth):
+    """Soma direta por diretório, percorrendo todos os ancestrais de cada arquivo."""
+    totals = defaultdict(lambda: [0, 0])
+    for file_id, author, commits, lines in zip(*(column.tolist() for column in pairs)):
+        components = file_paths[file_id].split("/")[:-1][:max_depth]
+        for depth in range(len(components) + 1):
+            directory = "/".join(components[:depth]) + "/" if depth else ROOT_PATH
+            totals[(directory, author)][0] += commits
+            totals[(directory, author)][1] += lines
+    return {key: tuple(value) for key, value in totals.items()}
+
+
+def test_trie_limits_depth_and_creates_parents_first():
+    trie = PathTrie(max_depth=2)
+
+    nodes = trie.add_files(["a/b/c/x.py", "a/y.py", "z.py", "a/b/w.py", "d/e/f.py"])
+
+    assert trie.paths == [".", "a/", "a/b/", "d/", "d/e/"]
+    assert nodes.tolist() == [2, 1, 0, 2, 4]
+    assert all(parent < node for node, parent in enumerate(trie.parents) if node)
+
+
+@pytest.mark.parametrize("max_depth", [0, 1, 2, 5])
+def test_rollup_matches_naive_sum(max_depth):
+    file_paths = ["src/a/one.py", "src/a/two.py", "src/b/deep/three.py", "README.md", "docs/x.md"]
+    rng = np.random.default_rng(7)
+    files = rng.integers(0, len(file_paths), 60)
+    authors = rng.integers(0, 4, 60)
+    keys = np.unique((files << 32) | authors)
+    pairs = (keys >> 32, keys & 0xFFFFFFFF, rng.integers(1, 5, len(keys)), rng.integers(0, 50, len(keys)))
+
+    trie = PathTrie(max_depth)
+    nodes, authors, commits, lines = trie.rollup(trie.add_files(file_paths), pairs)
+
+    rolled = {(trie.paths[node], author): (c, l)
+              for node, author, c, l in zip(nodes.tolist(), authors.tolist(), commits.tolist(), lines.tolist())}
+    assert rolled == _naive_rollup(file_paths, pairs, max_depth)
+    assert nodes.tolist() == sorted(nodes.tolist())
+
+
+def test_deep_tree_rolls_up_every_level():
+    depth = 300
+    file_paths = ["/".join(f"d{i}" for i in range(depth)) + "/leaf.py"]
+    pairs = tuple(np.array([value], dtype=np.int64) for value in (0, 0, 3, 7))
+
+    trie = PathTrie(depth)
+    nodes, _, commits, _ = trie.rollup(trie.add_files(file_paths), pairs)
+
+    assert len(nodes) == len(trie) == depth + 1
+    assert set(commits.tolist()) == {3}
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_analyzer_reports_directories(git_repo, tmp_path, cached):
+    config = AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], dominance_threshold=0.0,
+                            group_by_depth=1, cache_dir=str(tmp_path / "cache") if cached else None)
+
+    results = {result.file_path: result for result in
+               BusFactorAnalyzer(config).analyze_repository(str(git_repo), "repo")}
+
+    files = BusFactorAnalyzer(AnalysisConfig(include_patterns=["src/**"], exclude_patterns=[],
+                                             dominance_threshold=0.0)).analyze_repository(str(git_repo), "repo")
+    src = results["src/"]
+    assert src.total_commits == sum(result.total_commits for result in files)
+    assert src.total_lines_changed == sum(result.total_lines_changed for result in files)
+    assert set(src.all_authors) == {author for result in files for author in result.all_authors}
+    assert results[ROOT_PATH].total_commits >= src.total_commits
+    assert "src/main.py" not in results
+
+
+def test_directories_with_multiple_windows(git_repo):
+    config = AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], dominance_threshold=0.0,
+                            group_by_depth=1, windows=[1, 9000])
+
+    results = BusFactorAnalyzer(config).analyze_repository(str(git_repo), "repo")
+
+    assert {result.file_path for result in results} >= {ROOT_PATH, "src/"}
+    assert all(result.windows[-1].total_commits == result.total_commits for result in results)
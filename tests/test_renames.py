@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from busfactor.models import AnalysisConfig
+from busfactor.models.data_models import CommitRecord, FileModification
+from busfactor.service.aggregation import AggregationStore
+from busfactor.service.analysis_cache import CachedHistory
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+
+
+def _replay(store, events):
+    """Eventos (caminho, autor, linhas, caminho antigo) na ordem do histórico."""
+    for path, author, lines, old_path in events:
+        if old_path:
+            store.rename_file(old_path, path)
+        store.add(path, store.intern_author(author), lines)
+    return store
+
+
+CHAIN = [
+    ("a.py", "Alice", 10, None),
+    ("b.py", "Bob", 3, "a.py"),
+    ("b.py", "Alice", 1, None),
+    ("c.py", "Carol", 7, "b.py"),
+    ("other.py", "Bob", 2, None),
+]
+
+
+def test_rename_chain_keeps_history_under_latest_path():
+    analyses = {a.file_path: a for a in _replay(AggregationStore(), CHAIN).to_file_analyses("repo")}
+
+    assert set(analyses) == {"c.py", "other.py"}
+    assert analyses["c.py"].commits_by_author == {"Alice": 2, "Bob": 1, "Carol": 1}
+    assert analyses["c.py"].total_lines_changed == 21
+
+
+def test_rename_onto_existing_path_merges_counters():
+    events = [
+        ("a.py", "Alice", 4, None),
+        ("b.py", "Bob", 2, None),
+        ("b.py", "Alice", 1, "a.py"),
+    ]
+
+    analyses = _replay(AggregationStore(), events).to_file_analyses("repo")
+
+    assert [a.file_path for a in analyses] == ["b.py"]
+    assert analyses[0].commits_by_author == {"Alice": 2, "Bob": 1}
+    assert analyses[0].lines_by_author == {"Alice": 5, "Bob": 2}
+
+
+# README.md é renomeado e um novo README.md é criado depois no mesmo caminho
+RECREATED = [
+    ("README.md", "Alice", 5, None),
+    ("docs/README.md", "Alice", 1, "README.md"),
+    ("README.md", "Bob", 3, None),
+    ("guide.md", "Carol", 2, "README.md"),
+    ("README.md", "Dave", 1, None),
+]
+
+
+def test_recreated_path_after_rename_is_a_new_file():
+    analyses = _replay(AggregationStore(), RECREATED).to_file_analyses("repo")
+
+    assert {a.file_path: a.commits_by_author for a in analyses} == {
+        "docs/README.md": {"Alice": 2}, "guide.md": {"Bob": 1, "Carol": 1}, "README.md": {"Dave": 1}}
+
+
+@pytest.mark.parametrize("events", [CHAIN, RECREATED], ids=["chain", "recreated"])
+def test_merge_across_shards_matches_single_pass(events):
+    expected = _replay(AggregationStore(), events).to_file_analyses("repo")
+    for split in range(1, len(events)):
+        merged = _replay(AggregationStore(), events[:split]).merge(_replay(AggregationStore(), events[split:]))
+
+        assert merged.to_file_analyses("repo") == expected, split
+
+
+def _analyze(repo, **kwargs):
+    config = AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], dominance_threshold=0.0, **kwargs)
+    return {result.file_path: result for result in BusFactorAnalyzer(config).analyze_repository(str(repo), "repo")}
+
+
+def test_analyzer_follows_renames(git_repo):
+    results = _analyze(git_repo)
+
+    assert "src/utils.py" not in results
+    assert results["src/helpers.py"].total_commits == 3
+    assert set(results["src/helpers.py"].all_authors) == {"Alice", "Bob"}
+
+
+def test_analyzer_without_follow_renames_keeps_paths_apart(git_repo):
+    results = _analyze(git_repo, follow_renames=False)
+
+    assert results["src/utils.py"].total_commits == 2
+    assert results["src/helpers.py"].total_commits == 1
+
+
+@pytest.mark.parametrize("follow_renames", [True, False])
+def test_cache_matches_uncached_analysis(git_repo, git_commit, git_cmd, tmp_path, follow_renames):
+    git_cmd(git_repo, "mv", "src/helpers.py", "src/tools.py")
+    git_commit(git_repo, "Carol", "rename helpers", {"src/tools.py": "x = 1\ny = 2\nz = 3\nw = 4\n"})
+
+    cached = _analyze(git_repo, cache_dir=str(tmp_path / "cache"), follow_renames=follow_renames)
+
+    assert cached == _analyze(git_repo, follow_renames=follow_renames)
+    assert ("src/tools.py" in cached and "src/utils.py" not in cached) == follow_renames
+
+
+def test_cached_history_roundtrip_keeps_aliases():
+    history = CachedHistory("repo", since_day=0)
+    history.add_commit(CommitRecord("a", "Alice", 86400, [FileModification("x.py", None, 2, 0)]))
+    history.add_commit(CommitRecord("b", "Bob", 86400 * 2, [FileModification("y.py", "x.py", 1, 1)]))
+
+    restored = CachedHistory.from_dict(history.to_dict())
+    restored.add_commit(CommitRecord("c", "Carol", 86400 * 3, [FileModification("z.py", "y.py", 1, 0)]))
+
+    analyses = restored.to_file_analyses(lambda path: True, since_day=0)
+    assert [(a.file_path, a.commits_by_author) for a in analyses] == [
+        ("z.py", {"Alice": 1, "Bob": 1, "Carol": 1})]
+
+
+def test_cached_history_recreated_path_after_rename():
+    history = CachedHistory("repo", since_day=0)
+    for day, (path, author, lines, old_path) in enumerate(RECREATED, start=1):
+        history.add_commit(CommitRecord(str(day), author, 86400 * day, [FileModification(path, old_path, lines, 0)]))
+
+    restored = CachedHistory.from_dict(json.loads(json.dumps(history.to_dict())))
+
+    analyses = restored.to_file_analyses(lambda path: True, since_day=0)
+    assert {a.file_path: a.commits_by_author for a in analyses} == {
+        "docs/README.md": {"Alice": 2}, "guide.md": {"Bob": 1, "Carol": 1}, "README.md": {"Dave": 1}}
@@ -1,10 +1,14 @@
+import csv
+import gzip
+import json
 from unittest.mock import patch
 
 import pytest
 
 from busfactor.models.data_models import RiskAnalysisResult
 from busfactor.reportGenerator.file_report_generator import ReportGenerator
-from busfactor.reportGenerator.html_report_generator import HTMLReportGenerator
+from busfactor.reportGenerator.html_report_generator import TOP_AUTHORS, HTMLReportGenerator
+from busfactor.reportGenerator.stream_report_generator import REPORT_FIELDS, open_report_stream
 
 
 @pytest.fixture
@@ -57,3 +61,106 @@ class TestHTMLReportGenerator:
         assert "Relatório de Análise de Bus Factor" in content
         assert "src/main.py" in content
         assert "Alice" in content
+
+    def test_generate_html_embeds_rows_once_as_json(self, sample_results, tmp_path):
+        output_file = tmp_path / "report.html"
+
+        HTMLReportGenerator().generate_html(iter(sample_results), output_path=str(output_file))
+
+        content = output_file.read_text()
+        rows, meta = _embedded_json(content)
+        names = meta["names"]
+        assert meta["files"] == 2
+        assert [row[1] for row in rows] == ["src/main.py", "src/utils.py"]
+        assert [names[i] for i in rows[0][8]] == ["Alice", "Bob", "Charlie", "David"]
+        assert rows[1][4] == 72.0
+        assert content.count("src/main.py") == 1
+
+    def test_generate_html_caps_figures_with_others_bucket(self, tmp_path):
+        results = [
+            RiskAnalysisResult(f"f{i}.py", "repo", f"Autor {i}", f"Autor {i}", 1.0, 1.0, 2, 10, [f"Autor {i}"])
+            for i in range(TOP_AUTHORS + 10)
+        ]
+        output_file = tmp_path / "report.html"
+
+        HTMLReportGenerator().generate_html(results, output_path=str(output_file))
+
+        _, meta = _embedded_json(output_file.read_text())
+        figures = {figure["id"]: figure for figure in meta["figures"]}
+        bars = figures["fig-authors"]["data"][0]
+        assert len(bars["x"]) == TOP_AUTHORS + 1
+        assert bars["x"][-1] == "Outros (10)"
+        assert bars["y"][-1] == 10
+        assert figures["fig-top"]["data"][0]["values"][-1] == len(results) - 5
+        assert sum(figures["fig-histogram"]["data"][0]["y"]) == len(results)
+
+    def test_generate_html_escapes_script_tags_in_paths(self, sample_results, tmp_path):
+        output_file = tmp_path / "report.html"
+        sample_results[0].file_path = "src/</script><b>x.py"
+
+        HTMLReportGenerator().generate_html(sample_results, output_path=str(output_file))
+
+        content = output_file.read_text()
+        rows, _ = _embedded_json(content)
+        assert "</script><b>" not in content
+        assert rows[0][1] == "src/</script><b>x.py"
+
+
+class TestStreamReportWriters:
+    def test_generate_report_json_writes_array_without_table(self, sample_results, tmp_path):
+        generator = ReportGenerator()
+        output_file = tmp_path / "report.json"
+
+        with patch.object(ReportGenerator, "_generate_table_report") as mock_table:
+            generator.generate_report(sample_results, format="json", output=str(output_file))
+            mock_table.assert_not_called()
+
+        rows = json.loads(output_file.read_text())
+        assert len(rows) == 2
+        assert rows[0]["file_path"] == "src/main.py"
+        assert rows[0]["commits_dominance"] == 0.85
+        assert rows[1]["all_authors"] == ["Bob", "Alice"]
+
+    def test_csv_writer_supports_gzip(self, sample_results, tmp_path):
+        output_file = tmp_path / "report.csv.gz"
+
+        with open_report_stream("csv", str(output_file)) as writer:
+            for result in sample_results:
+                writer.write(result)
+
+        with gzip.open(output_file, "rt", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert writer.rows == 2
+        assert list(rows[0]) == list(REPORT_FIELDS)
+        assert rows[0]["all_authors"] == "Alice;Bob;Charlie;David"
+        assert rows[1]["total_lines_changed"] == "300"
+
+    @pytest.mark.parametrize("count", [0, 1, 2])
+    def test_json_writer_streams_a_valid_array(self, sample_results, tmp_path, count):
+        output_file = tmp_path / "report.json.gz"
+
+        with open_report_stream("json", str(output_file)) as writer:
+            writer.write_all(sample_results[:count])
+
+        with gzip.open(output_file, "rt") as f:
+            rows = json.load(f)
+        assert [row["file_path"] for row in rows] == [result.file_path for result in sample_results[:count]]
+
+    def test_writer_defaults_to_stdout(self, sample_results, capsys):
+        with open_report_stream("jsonl") as writer:
+            writer.write_all(sample_results)
+
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line)["repository"] for line in lines] == ["repo1", "repo1"]
+
+    def test_unknown_format_raises(self, sample_results):
+        with pytest.raises(ValueError):
+            ReportGenerator().generate_report(sample_results, format="xml")
+
+
+def _embedded_json(content):
+    def script(element_id):
+        start = content.index(f'id="{element_id}">') + len(f'id="{element_id}">')
+        return json.loads(content[start:content.index("</script>", start)])
+
+    return script("bf-rows"), script("bf-meta")
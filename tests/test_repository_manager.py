@@ -3,6 +3,8 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
 from busfactor.service.repository_manager import RepositoryManager
 
 
@@ -40,3 +42,80 @@ class TestRepositoryManager:
 
         assert "Erro ao clonar repositório" in str(exc_info.value)
         assert "/tmp/test_repo" not in manager.temp_dirs
+
+
+@pytest.fixture
+def dated_repo(tmp_path, git_cmd, git_commit):
+    """Repositório com histórico antigo (2015) e commits recentes."""
+    repo = tmp_path / "dated_repo"
+    repo.mkdir()
+    git_cmd(repo, "init", "-q", "-b", "main")
+    git_cmd(repo, "config", "uploadpack.allowFilter", "true")
+    old = "2015-01-01T12:00:00"
+    git_commit(repo, "Alice", "old 1", {"src/a.py": "a\n" * 50, "src/b.py": "b\n"}, date=old)
+    git_commit(repo, "Alice", "old 2", {"src/a.py": "a\n" * 60}, date=old)
+    git_commit(repo, "Bob", "recent 1", {"src/b.py": "b\nc\n"})
+    git_commit(repo, "Carol", "recent 2", {"src/a.py": "a\n" * 61})
+    return repo
+
+
+def _is_shallow(path):
+    return subprocess.run(
+        ["git", "-C", path, "rev-parse", "--is-shallow-repository"],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip() == "true"
+
+
+class TestCloneModes:
+    def test_build_clone_command_full_without_config(self):
+        assert RepositoryManager.build_clone_command("https://github.com/u/r", "/tmp/x") == [
+            "git", "clone", "https://github.com/u/r", "/tmp/x"
+        ]
+
+    def test_build_clone_command_shallow_and_blobless(self):
+        shallow = RepositoryManager.build_clone_command(
+            "https://github.com/u/r", "/tmp/x", AnalysisConfig(days=90, clone_mode="shallow"))
+        blobless = RepositoryManager.build_clone_command(
+            "https://github.com/u/r", "/tmp/x", AnalysisConfig(days=90, clone_mode="blobless"))
+
+        assert "--no-checkout" in shallow
+        assert any(arg.startswith("--shallow-since=") for arg in shallow)
+        assert "--filter=blob:none" not in shallow
+        assert "--filter=blob:none" in blobless
+
+    def test_auto_mode_keeps_blobs_when_lines_are_needed(self):
+        assert RepositoryManager.resolve_clone_mode(AnalysisConfig()) == "shallow"
+
+    def test_auto_mode_is_blobless_for_commit_metric(self):
+        assert RepositoryManager.resolve_clone_mode(AnalysisConfig(metric="commits")) == "blobless"
+
+    def test_auto_mode_clones_full_history_for_blame(self):
+        assert RepositoryManager.resolve_clone_mode(AnalysisConfig(ownership="blame")) == "full"
+
+    def test_unsupported_url_lists_accepted_prefixes(self):
+        with pytest.raises(ValueError, match="https://github.com/ ou file://"):
+            RepositoryManager().clone_repository("https://gitlab.com/user/repo")
+
+    def test_invalid_clone_mode(self):
+        with pytest.raises(ValueError):
+            RepositoryManager.resolve_clone_mode(AnalysisConfig(clone_mode="sparse"))
+
+    @pytest.mark.parametrize("clone_mode", ["full", "shallow", "blobless"])
+    def test_file_url_clone_matches_source_analysis(self, dated_repo, clone_mode):
+        config = AnalysisConfig(days=30, dominance_threshold=0.0, clone_mode=clone_mode)
+        manager = RepositoryManager()
+
+        clone_path = manager.clone_repository(f"file://{dated_repo}", config)
+
+        expected = BusFactorAnalyzer(config).analyze_repository(str(dated_repo), "dated")
+        assert BusFactorAnalyzer(config).analyze_repository(clone_path, "dated") == expected
+        assert _is_shallow(clone_path) is (clone_mode != "full")
+
+    def test_shallow_clone_with_empty_window(self, dated_repo, git_cmd, tmp_path):
+        git_cmd(dated_repo, "reset", "-q", "--hard", "HEAD~2")
+        config = AnalysisConfig(days=30, clone_mode="shallow")
+
+        manager = RepositoryManager()
+        clone_path = manager.clone_repository(f"file://{dated_repo}", config)
+
+        assert BusFactorAnalyzer(config).analyze_repository(clone_path, "dated") == []
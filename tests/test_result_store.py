@@ -0,0 +1,175 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from busfactor.cli import app
+from busfactor.models import AnalysisConfig, RiskAnalysisResult
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.result_store import ResultStore
+
+
+def _result(repository, file_path, author, commits_dominance, lines_dominance=0.5):
+    return RiskAnalysisResult(
+        file_path=file_path,
+        repository=repository,
+        dominant_author_commits=author,
+        dominant_author_lines=author,
+        commits_dominance=commits_dominance,
+        lines_dominance=lines_dominance,
+        total_commits=10,
+        total_lines_changed=100,
+        all_authors=[],
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    store.save_snapshot("r1", [_result("r1", "src/a.py", "Alice", 0.9), _result("r1", "old.py", "Bob", 0.6)])
+    # Snapshot mais recente de r1: old.py saiu do relatório
+    store.save_snapshot("r1", [_result("r1", "src/a.py", "Alice", 0.8), _result("r1", "src/b.py", "Bob", 0.7)])
+    store.save_snapshot("r2", [_result("r2", "lib/c.py", "Alice", 1.0), _result("r2", "src/d.py", "Carol", 0.55)])
+    yield store
+    store.close()
+
+
+def _paths(results):
+    return [(result.repository, result.file_path) for result in results]
+
+
+def test_query_uses_latest_snapshot_of_each_repository(store):
+    assert _paths(store.query()) == [("r2", "lib/c.py"), ("r1", "src/a.py"), ("r1", "src/b.py"), ("r2", "src/d.py")]
+    assert ("r1", "old.py") in _paths(store.query(all_snapshots=True))
+    assert len(store.query(all_snapshots=True)) == 6
+
+
+def test_query_filters_and_sorting(store):
+    assert _paths(store.query(author="Alice")) == [("r2", "lib/c.py"), ("r1", "src/a.py")]
+    assert _paths(store.query(repositories=["r1"], path="src/*", sort="file_path", descending=False)) == [
+        ("r1", "src/a.py"), ("r1", "src/b.py")]
+    assert _paths(store.query(min_dominance=0.75)) == [("r2", "lib/c.py"), ("r1", "src/a.py")]
+    assert _paths(store.query(limit=1)) == [("r2", "lib/c.py")]
+    with pytest.raises(ValueError):
+        store.query(sort="commits_dominance; DROP TABLE results")
+
+
+def test_aggregate_by_author_and_repository(store):
+    by_author = store.aggregate("author")
+    assert [(row["author"], row["risky_files"], row["repositories"]) for row in by_author] == [
+        ("Alice", 2, 2), ("Bob", 1, 1), ("Carol", 1, 1)]
+    assert by_author[0]["commits_dominance"] == pytest.approx(0.9)
+
+    assert [(row["repository"], row["risky_files"]) for row in store.aggregate("repository")] == [
+        ("r1", 2), ("r2", 2)]
+    with pytest.raises(ValueError):
+        store.aggregate("file_path")
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"windows": [1, 9000]}, {"group_by_depth": 1}, {"metric": "commits"}])
+def test_analyzer_saves_results_and_counters(git_repo, tmp_path, kwargs):
+    def analyze(**extra):
+        config = AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], dominance_threshold=0.6,
+                                **kwargs, **extra)
+        return BusFactorAnalyzer(config).analyze_repository(str(git_repo), "repo")
+
+    db = str(tmp_path / "results.sqlite")
+    expected = analyze()
+
+    assert analyze(results_db=db) == expected
+    with ResultStore(db) as store:
+        saved = store.query(sort="file_path", descending=False)
+        touched = store.files_touched_by("Bob")
+
+    for result in expected:
+        result.windows = []
+    assert saved == sorted(expected, key=lambda result: result.file_path)
+    assert touched and all(repository == "repo" for repository, *_ in touched)
+    if kwargs.get("metric") == "commits":
+        assert all(lines is None for *_, lines in touched)
+
+
+def test_query_command(git_repo, tmp_path):
+    db = str(tmp_path / "results.sqlite")
+    runner = CliRunner()
+    analyzed = runner.invoke(app, ["analyze", f"file://{git_repo}", "--include", "**/*", "--results-db", db,
+                                   "--format", "jsonl", "--output", str(tmp_path / "report.jsonl")])
+    assert analyzed.exit_code == 0, analyzed.output
+    report = [json.loads(line) for line in (tmp_path / "report.jsonl").read_text().splitlines()]
+
+    queried = runner.invoke(app, ["query", "--results-db", db, "--format", "jsonl",
+                                  "--output", str(tmp_path / "query.jsonl")])
+    assert queried.exit_code == 0, queried.output
+    rows = [json.loads(line) for line in (tmp_path / "query.jsonl").read_text().splitlines()]
+    assert sorted(row["file_path"] for row in rows) == sorted(row["file_path"] for row in report)
+
+    grouped = runner.invoke(app, ["query", "--results-db", db, "--group-by", "author", "--format", "csv"])
+    assert grouped.exit_code == 0, grouped.output
+    header, *lines = grouped.output.splitlines()
+    assert header == "author,risky_files,repositories,commits_dominance,lines_dominance"
+    assert sum(int(line.split(",")[1]) for line in lines) == len(report)
+
+    touched = runner.invoke(app, ["query", "--results-db", db, "--touched-by", "Bob", "--format", "csv"])
+    assert touched.exit_code == 0, touched.output
+    header, *lines = touched.output.splitlines()
+    assert header == "repository,file_path,commits,lines"
+    assert lines and all(line.startswith(f"file://{git_repo},") for line in lines)
+
+    missing = runner.invoke(app, ["query", "--results-db", str(tmp_path / "missing.sqlite")])
+    assert missing.exit_code == 1
+
+
+def test_counters_intern_paths_and_authors(tmp_path):
+    file_paths, author_names = ["a.py", "b.py"], ["Alice", "Bob"]
+    counters = tuple(np.array(column) for column in ([0, 0, 1], [0, 1, 1], [3, 1, 2], [30, 10, 20]))
+    with ResultStore(str(tmp_path / "results.sqlite")) as store:
+        for _ in range(3):
+            store.save_snapshot("r1", [], file_paths, author_names, counters)
+        assert store.connection.execute("SELECT COUNT(*) FROM paths").fetchone() == (2,)
+        assert store.connection.execute("SELECT COUNT(*) FROM authors").fetchone() == (2,)
+        latest = store.connection.execute("SELECT MAX(id) FROM snapshots").fetchone()[0]
+        assert store.authors_of([(latest, "a.py"), (latest, "b.py")]) == {
+            (latest, "a.py"): ["Alice", "Bob"], (latest, "b.py"): ["Bob"]}
+        assert store.files_touched_by("Bob") == [("r1", "b.py", 2, 20), ("r1", "a.py", 1, 10)]
+
+
+def test_keep_prunes_older_snapshots_of_the_repository(store):
+    store.save_snapshot("r1", [_result("r1", "src/e.py", "Dave", 0.9)], keep=1)
+    assert _paths(store.query(all_snapshots=True)) == [
+        ("r2", "lib/c.py"), ("r1", "src/e.py"), ("r2", "src/d.py")]
+    assert store.prune("r2", 1) == 0
+    with pytest.raises(ValueError):
+        store.prune("r1", 0)
+
+
+@pytest.mark.parametrize("semantics, expected", [
+    ("fnmatch", [("r2", "lib/c.py"), ("r1", "src/a.py"), ("r1", "src/b.py"), ("r2", "src/d.py")]),
+    ("git", []),
+])
+def test_query_path_uses_analyzer_glob_semantics(store, semantics, expected):
+    # Como no --include: com fnmatch `*` atravessa `/`; no pathspec :(glob) fica na raiz
+    assert _paths(store.query(path="*.py", glob_semantics=semantics)) == expected
+
+
+def test_query_path_negated_class_follows_fnmatch(store):
+    # No GLOB do SQLite a negação é `[^...]`; `[!s]` casaria `s` em vez de excluí-lo
+    assert _paths(store.query(path="[!s]*")) == [("r2", "lib/c.py")]
+
+
+def test_query_path_seeks_the_literal_prefix_on_the_primary_key(store):
+    where, params = store._filters(None, None, "src/*", None, False, "fnmatch")
+    plan = " ".join(row[-1] for row in store.connection.execute(
+        f"EXPLAIN QUERY PLAN SELECT file_path FROM results{where}", params))
+    assert "file_path>? AND file_path<?" in plan
+    assert _paths(store.query(path="src/*")) == [("r1", "src/a.py"), ("r1", "src/b.py"), ("r2", "src/d.py")]
+
+
+def test_rejects_database_of_another_format(tmp_path):
+    db = tmp_path / "results.sqlite"
+    connection = sqlite3.connect(str(db))
+    connection.execute("PRAGMA user_version = 1")
+    connection.close()
+    with pytest.raises(ValueError):
+        ResultStore(str(db))
@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from busfactor.models.data_models import AnalysisConfig
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.history_backend import GitLogBackend, PyDrillerBackend, list_revisions
+from busfactor.service.sharded_analysis import split_into_shards
+
+
+def test_split_into_shards_is_contiguous_and_balanced():
+    commits = [str(i) for i in range(10)]
+
+    shards = split_into_shards(commits, 3, min_size=1)
+
+    assert [len(s) for s in shards] == [4, 3, 3]
+    assert sum(shards, []) == commits
+
+
+def test_split_into_shards_respects_minimum_size():
+    commits = [str(i) for i in range(10)]
+
+    assert split_into_shards(commits, 8, min_size=5) == [commits[:5], commits[5:]]
+    assert split_into_shards(commits, 4, min_size=100) == [commits]
+    assert split_into_shards([], 4, min_size=1) == [[]]
+
+
+def test_backends_accept_explicit_commit_list(git_repo):
+    commits = list_revisions(str(git_repo))[2:6]
+
+    git_commits = list(GitLogBackend().iter_commits(str(git_repo), commits=commits))
+    pydriller_commits = list(PyDrillerBackend().iter_commits(str(git_repo), commits=commits))
+
+    def summary(records):
+        return [
+            (c.sha, c.author, [(m.path, m.added_lines, m.deleted_lines) for m in c.modifications])
+            for c in records
+        ]
+
+    assert [c.sha for c in git_commits] == commits
+    assert summary(git_commits) == summary(pydriller_commits)
+
+
+@patch("busfactor.service.sharded_analysis.MIN_COMMITS_PER_SHARD", 1)
+def test_sharded_analysis_matches_single_pass(git_repo):
+    single = BusFactorAnalyzer(AnalysisConfig(dominance_threshold=0.0)) \
+        .analyze_repository(str(git_repo), "sample")
+    sharded = BusFactorAnalyzer(AnalysisConfig(dominance_threshold=0.0, shards=3)) \
+        .analyze_repository(str(git_repo), "sample")
+
+    assert sharded == single
+
+
+@patch("busfactor.service.sharded_analysis.MIN_COMMITS_PER_SHARD", 1)
+def test_sharded_analysis_with_pathspecs_matches_single_pass(git_repo):
+    def analyze(**kwargs):
+        config = AnalysisConfig(dominance_threshold=0.0, include_patterns=["src/**"], **kwargs)
+        return BusFactorAnalyzer(config).analyze_repository(str(git_repo), "sample")
+
+    assert analyze(shards=2) == analyze(pathspec_pushdown=False)
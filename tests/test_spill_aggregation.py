@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pytest
+
+from busfactor.cli import BusFactorCLI, _max_memory_bypassed_by
+from busfactor.models import AnalysisConfig
+from busfactor.service.aggregation import AggregationStore
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.dominance import DominanceTable
+from busfactor.service.spill_aggregation import PAIR_BYTES, SpillingAggregationStore
+
+
+def _events(seed, n_events=3_000, n_files=120, n_authors=9):
+    rng = np.random.default_rng(seed)
+    events = []
+    for _ in range(n_events):
+        old_path = f"f{rng.integers(n_files)}.py" if rng.random() < 0.02 else None
+        events.append((f"f{rng.integers(n_files)}.py", f"a{rng.integers(n_authors)}", int(rng.integers(0, 30)),
+                       old_path))
+    return events
+
+
+def _replay(store, events):
+    for path, author, lines, old_path in events:
+        if old_path and old_path != path:
+            store.rename_file(old_path, path)
+        store.add(path, store.intern_author(author), lines)
+    store.flush()
+    return store
+
+
+@pytest.fixture
+def spill_store():
+    # Limite mínimo: cada flush despeja os pares no SQLite
+    store = SpillingAggregationStore(max_bytes=2 * PAIR_BYTES)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_spilled_pairs_match_in_memory_store(spill_store, seed, monkeypatch):
+    monkeypatch.setattr("busfactor.service.aggregation.FLUSH_EVENTS", 64)
+    events = _events(seed)
+
+    _replay(spill_store, events)
+
+    assert spill_store.spilled > 0
+    assert spill_store.to_file_analyses("repo") == _replay(AggregationStore(), events).to_file_analyses("repo")
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.5, 0.6, 0.9])
+def test_sql_dominance_matches_dominance_table(spill_store, threshold):
+    events = _events(7)
+    memory = _replay(AggregationStore(), events)
+    files, authors, commits, lines = memory.pairs_in_history_order()
+    table = DominanceTable(len(memory), (files, authors, commits), (files, authors, lines))
+    expected = np.flatnonzero(table.risky_mask(threshold)).tolist()
+
+    rows = list(_replay(spill_store, events).risky_files(threshold))
+
+    assert [row[0] for row in rows] == expected
+    for file_id, commit_author, top_commits, total_commits, line_author, top_lines, total_lines in rows:
+        assert commit_author == table.top_commit_authors[file_id]
+        assert line_author == table.top_line_authors[file_id]
+        assert (total_commits, total_lines) == (table.total_commits[file_id], table.total_lines[file_id])
+
+
+def test_spill_store_refuses_merge(spill_store):
+    with pytest.raises(TypeError):
+        spill_store.merge(AggregationStore())
+
+
+def test_spill_file_is_removed_on_close():
+    store = SpillingAggregationStore(max_bytes=PAIR_BYTES)
+    path = store._spill_path
+
+    store.close()
+
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"windows": [1, 9000]}, {"truck_factor": True}, {"metric": "commits"}])
+def test_analyzer_with_max_memory_matches_in_memory(git_repo, kwargs):
+    def analyze(**extra):
+        config = AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], dominance_threshold=0.0,
+                                **kwargs, **extra)
+        analyzer = BusFactorAnalyzer(config)
+        return analyzer.analyze_repository(str(git_repo), "repo"), analyzer.truck_factors
+
+    assert analyze(max_memory_mb=16) == analyze()
+
+
+def test_pairs_in_history_order_reads_spilled_pairs_in_blocks(spill_store, monkeypatch):
+    monkeypatch.setattr("busfactor.service.spill_aggregation.FETCH_ROWS", 7)
+    events = _events(3)
+
+    spilled = _replay(spill_store, events).pairs_in_history_order()
+
+    for column, expected in zip(spilled, _replay(AggregationStore(), events).pairs_in_history_order()):
+        assert column.dtype == np.int64
+        assert column.tolist() == expected.tolist()
+
+
+def test_options_that_bypass_max_memory_are_reported(git_repo, tmp_path, capsys):
+    assert _max_memory_bypassed_by(AnalysisConfig()) == []
+    assert _max_memory_bypassed_by(AnalysisConfig(truck_factor=True, windows=[30, 90])) == [
+        "--days com várias janelas", "--truck-factor"]
+
+    BusFactorCLI().analyze_repositories(
+        repos=[f"file://{git_repo}"], format="csv", output=str(tmp_path / "report.csv"),
+        max_memory=16, truck_factor=True)
+
+    assert "--truck-factor" in capsys.readouterr().err
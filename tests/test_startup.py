@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+# Orçamento (em µs) para importar o CLI; hoje fica em torno de 150 ms,
+# contra ~630 ms quando pandas/plotly/pydriller eram carregados no import.
+IMPORT_BUDGET_US = 400_000
+HEAVY_MODULES = ("pandas", "plotly", "pydriller", "git", "numpy")
+
+
+def _import_times(module: str) -> dict:
+    """Tempo cumulativo de import (µs) por módulo, medido com `python -X importtime`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    times = _import_times("busfactor.cli")
+
+    loaded = sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES)
+    assert loaded == []
+
+
+def test_cli_import_fits_startup_budget():
+    times = _import_times("busfactor.cli")
+
+    assert times["busfactor.cli"] < IMPORT_BUDGET_US
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import typer
+
+from busfactor.cli import _parse_days
+from busfactor.models import AnalysisConfig
+from busfactor.reportGenerator.stream_report_generator import open_report_stream
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.time_windows import BUCKET_SHIFT, TimeWindows, window_pairs
+
+WINDOWS = [30, 90, 365]
+
+
+@pytest.fixture
+def dated_repo(tmp_path, git_cmd, git_commit):
+    """Autoria que muda com o tempo: Alice antiga, Bob recente."""
+    repo = tmp_path / "dated_repo"
+    repo.mkdir()
+    git_cmd(repo, "init", "-q", "-b", "main")
+
+    def ago(days):
+        return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S")
+
+    git_commit(repo, "Alice", "ancient", {"d.py": "d\n"}, date=ago(2000))
+    git_commit(repo, "Alice", "old", {"a.py": "a\n" * 50, "b.py": "b\n" * 5, "c.py": "c\n"}, date=ago(300))
+    git_commit(repo, "Alice", "old again", {"a.py": "A\n" * 50, "c.py": "C\n"}, date=ago(200))
+    git_commit(repo, "Bob", "middle", {"b.py": "B\n" * 5, "c.py": "cc\n"}, date=ago(60))
+    git_commit(repo, "Carol", "middle too", {"b.py": "bb\n" * 5}, date=ago(50))
+    git_commit(repo, "Bob", "recent", {"a.py": "x\n", "b.py": "y\n"}, date=ago(10))
+    git_commit(repo, "Bob", "recent again", {"a.py": "z\n"}, date=ago(5))
+    return repo
+
+
+def _config(cache_dir=None, **kwargs):
+    # Os arquivos do repositório ficam na raiz: `*` (fnmatch) casa todos, `**/*` não
+    return AnalysisConfig(dominance_threshold=0.6, include_patterns=["*"], exclude_patterns=[],
+                          cache_dir=cache_dir, **kwargs)
+
+
+def _single(result):
+    return (result.file_path, result.dominant_author_commits, result.dominant_author_lines,
+            result.commits_dominance, result.lines_dominance, result.total_commits,
+            result.total_lines_changed)
+
+
+def _window(file_path, window):
+    return (file_path, window.dominant_author_commits, window.dominant_author_lines,
+            window.commits_dominance, window.lines_dominance, window.total_commits,
+            window.total_lines_changed)
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_multi_window_matches_separate_runs(dated_repo, tmp_path, cached):
+    cache_dir = str(tmp_path / "cache") if cached else None
+    multi = BusFactorAnalyzer(_config(cache_dir, windows=WINDOWS)).analyze_repository(str(dated_repo), "repo")
+
+    assert [window.days for window in multi[0].windows] == WINDOWS
+    for index, days in enumerate(WINDOWS):
+        single = BusFactorAnalyzer(_config(cache_dir, days=days)).analyze_repository(str(dated_repo), "repo")
+        expected = sorted(_single(result) for result in single)
+        at_risk = sorted(
+            _window(result.file_path, result.windows[index]) for result in multi if result.windows[index].at_risk)
+        assert at_risk == expected
+
+    # Os campos principais são os da maior janela
+    largest = BusFactorAnalyzer(_config(cache_dir, days=WINDOWS[-1])).analyze_repository(str(dated_repo), "repo")
+    main_fields = {result.file_path: (_single(result), result.all_authors) for result in multi}
+    for result in largest:
+        assert main_fields[result.file_path] == (_single(result), result.all_authors)
+
+
+def test_file_outside_small_window_has_no_commits_there(dated_repo):
+    results = BusFactorAnalyzer(_config(windows=WINDOWS)).analyze_repository(str(dated_repo), "repo")
+
+    c_file = next(result for result in results if result.file_path == "c.py")
+    assert [window.total_commits for window in c_file.windows] == [0, 1, 3]
+    assert c_file.windows[0].dominant_author_commits == ""
+    assert "d.py" not in {result.file_path for result in results}
+
+
+def test_bucket_of_uses_window_edges():
+    now = datetime(2024, 1, 1)
+    windows = TimeWindows([365, 30, 90], now)
+
+    def ts(days):
+        return int((now - timedelta(days=days)).timestamp())
+
+    assert windows.days == WINDOWS
+    assert [windows.bucket_of(ts(d)) for d in (1, 29, 31, 89, 91, 364, 366)] == [0, 0, 1, 1, 2, 2, 3]
+
+
+def test_window_pairs_accumulates_buckets_in_history_order():
+    files = np.array([0, 1, 0, 0], dtype=np.int64)
+    tagged = np.array([2 << BUCKET_SHIFT, 1 << BUCKET_SHIFT, 5, 1 << BUCKET_SHIFT], dtype=np.int64)
+    commits = np.array([1, 2, 3, 4], dtype=np.int64)
+    lines = np.array([10, 20, 30, 40], dtype=np.int64)
+
+    per_window = window_pairs(files, tagged, commits, lines, 3)
+
+    assert [pairs[0].tolist() for pairs in per_window] == [[0], [1, 0, 0], [0, 1, 0]]
+    assert [pairs[1].tolist() for pairs in per_window] == [[5], [0, 5, 0], [0, 0, 5]]
+    assert [pairs[2].tolist() for pairs in per_window] == [[3], [2, 3, 4], [5, 2, 3]]
+
+
+def test_csv_has_columns_per_window(dated_repo, tmp_path):
+    results = BusFactorAnalyzer(_config(windows=WINDOWS)).analyze_repository(str(dated_repo), "repo")
+    output = tmp_path / "report.csv"
+
+    with open_report_stream("csv", str(output), WINDOWS) as writer:
+        writer.write_all(results)
+
+    header, *rows = output.read_text().splitlines()
+    assert header.endswith(",at_risk_365d")
+    assert "commits_dominance_30d" in header
+    assert all(len(row.split(",")) == len(header.split(",")) for row in rows)
+
+
+def test_days_option_accepts_repeated_and_comma_separated_values():
+    assert _parse_days(["30,90", "365"]) == [30, 90, 365]
+    with pytest.raises(typer.BadParameter):
+        _parse_days(["30,abc"])
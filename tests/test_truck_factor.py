@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from busfactor.cli import BusFactorCLI
+from busfactor.models import AnalysisConfig, FileAnalysis
+from busfactor.service.bus_factor_analyzer import BusFactorAnalyzer
+from busfactor.service.truck_factor import truck_factor, truck_factor_from_analyses
+
+
+def _naive_truck_factor(commits_by_file, ratio=0.75):
+    """Remoção gulosa recalculando a cobertura sobre todos os arquivos a cada passo."""
+    owners = [
+        {author for author, count in counts.items() if count >= ratio * max(counts.values())}
+        for counts in commits_by_file
+    ]
+    owners = [authors for authors in owners if authors]
+    order = list(dict.fromkeys(author for counts in commits_by_file for author in counts))
+    removed = []
+    while sum(1 for authors in owners if not authors - set(removed)) <= len(owners) / 2:
+        coverage = {author: 0 for author in order if author not in removed}
+        for authors in owners:
+            if authors - set(removed):
+                for author in authors - set(removed):
+                    coverage[author] += 1
+        removed.append(max(coverage, key=lambda author: (coverage[author], -order.index(author))))
+    return removed
+
+
+def _analyses(commits_by_file):
+    return [
+        FileAnalysis(file_path=f"f{i}.py", repository="repo", total_commits=sum(counts.values()),
+                     total_lines_changed=0, commits_by_author=counts, lines_by_author=dict.fromkeys(counts, 0))
+        for i, counts in enumerate(commits_by_file)
+    ]
+
+
+def test_single_owner_for_most_files_has_truck_factor_one():
+    commits_by_file = [{"Alice": 10}, {"Alice": 5, "Bob": 1}, {"Alice": 3}, {"Bob": 4}]
+
+    result = truck_factor_from_analyses(_analyses(commits_by_file), "repo")
+
+    assert result.truck_factor == 1
+    assert result.removed_authors == ["Alice"]
+    assert (result.orphaned_files, result.total_files) == (3, 4)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_naive_greedy(seed):
+    rng = np.random.default_rng(seed)
+    names = [f"autor{i}" for i in range(12)]
+    commits_by_file = []
+    for _ in range(80):
+        authors = rng.choice(len(names), size=rng.integers(1, 5), replace=False)
+        commits_by_file.append({names[a]: int(rng.integers(1, 6)) for a in sorted(authors)})
+
+    result = truck_factor_from_analyses(_analyses(commits_by_file))
+
+    assert result.removed_authors == _naive_truck_factor(commits_by_file)
+    assert result.orphaned_files > result.total_files / 2
+
+
+def test_scales_to_large_repositories():
+    rng = np.random.default_rng(0)
+    n_files, n_authors = 100_000, 5_000
+    keys = np.unique((rng.integers(0, n_files, 500_000) << 32) | rng.integers(0, n_authors, 500_000))
+
+    result = truck_factor(keys >> 32, keys & 0xFFFFFFFF, rng.integers(1, 10, len(keys)), n_files,
+                          [f"a{i}" for i in range(n_authors)])
+
+    assert 0 < result.truck_factor < n_authors
+    assert result.orphaned_files > result.total_files / 2
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_analyzer_computes_truck_factor(git_repo, tmp_path, cached):
+    config = AnalysisConfig(include_patterns=["**/*"], exclude_patterns=[], truck_factor=True,
+                            cache_dir=str(tmp_path / "cache") if cached else None)
+    analyzer = BusFactorAnalyzer(config)
+
+    analyzer.analyze_repository(str(git_repo), "repo")
+
+    result = analyzer.truck_factors["repo"]
+    assert result.repository == "repo"
+    assert result.truck_factor >= 1
+    assert set(result.removed_authors) <= {"Alice", "Bob", "Carol"}
+
+
+def test_cli_prints_truck_factor(git_repo, capsys):
+    BusFactorCLI().analyze_repositories(repos=[f"file://{git_repo}"], truck_factor=True)
+
+    assert "Truck Factor" in capsys.readouterr().out